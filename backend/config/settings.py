@@ -7,7 +7,7 @@ load_dotenv()
 
 # Base paths
 BASE_DIR = Path(__file__).parent.parent.parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("DATA_DIR", BASE_DIR / "data"))  # database, caches and stored captures
 STATIC_DIR = BASE_DIR / "static"
 CAPTURES_DIR = STATIC_DIR / "captures"
 LOG_DIR = BASE_DIR / "logs"
@@ -16,8 +16,17 @@ LOG_DIR = BASE_DIR / "logs"
 for dir_path in [DATA_DIR, STATIC_DIR, CAPTURES_DIR, LOG_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
-# Database settings
+# Database settings (postgresql:// URLs need psycopg2 and asyncpg installed)
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR}/cymatics.db")
+DATABASE_CONFIG = {
+    'DB_BATCH_SIZE': 100,  # most writes committed in one transaction
+    'DB_FLUSH_INTERVAL': 0.05,  # seconds a batch waits for more writes
+    'DB_QUEUE_SIZE': 10000,  # queued writes before producers block
+    'DB_POOL_SIZE': int(os.getenv("DB_POOL_SIZE", 5)),  # connections kept open per engine
+    'DB_MAX_OVERFLOW': int(os.getenv("DB_MAX_OVERFLOW", 10)),  # extra connections under load
+    'DB_POOL_TIMEOUT': 30,  # seconds to wait for a free connection
+    'DB_POOL_RECYCLE': 1800  # seconds before server connections are replaced
+}
 
 # Audio settings
 AUDIO_CONFIG = {
@@ -27,17 +36,49 @@ AUDIO_CONFIG = {
     'BUFFER': 512,
     'MAX_FREQUENCY': 2000,
     'MIN_FREQUENCY': 20,
+    'COVERAGE_RESOLUTION': 0.1,  # Hz; frequencies closer than this count as the same test
     'DEFAULT_VOLUME': 0.9,
-    'DEFAULT_DURATION': 1.0
+    'DEFAULT_DURATION': 1.0,
+    'LOOP_MAX_SECONDS': 2.0,  # longest looped tone buffer
+    'LOOP_TOLERANCE_HZ': 0.01,  # allowed pitch error from whole-cycle looping
+    'CACHE_MAX_BYTES': 64 * 1024 * 1024,  # 64MB of cached tone buffers
+    'SYNTH_QUALITY': os.getenv('SYNTH_QUALITY', 'polyblep'),  # naive, polyblep or additive
+    'MAX_HARMONICS': 256,  # partial limit for additive synthesis
+    'MODE': os.getenv('AUDIO_MODE', 'loop'),  # 'loop' (cached Sound) or 'stream' (block synthesis)
+    'SINK': os.getenv('AUDIO_SINK', 'pygame'),  # 'pygame', or 'null'/'wav' for headless runs (stream mode)
+    'WAV_PATH': DATA_DIR / "audio_out.wav",
+    'RING_BLOCKS': 2  # blocks rendered ahead of playback in stream mode
 }
 
 # Camera settings
 CAMERA_CONFIG = {
     'DEVICE_ID': 0,
-    'FRAME_WIDTH': 1280,
-    'FRAME_HEIGHT': 720,
-    'FPS': 30,
-    'CAPTURE_FORMAT': 'MJPG'
+    'FRAME_WIDTH': int(os.getenv('CAMERA_WIDTH', '1280')),
+    'FRAME_HEIGHT': int(os.getenv('CAMERA_HEIGHT', '720')),
+    'FPS': int(os.getenv('CAMERA_FPS', '30')),
+    'CAPTURE_FORMAT': 'MJPG',
+    'SOURCE': os.getenv('CAMERA_SOURCE', 'device'),  # 'device' or 'synthetic' (no camera attached)
+    'FRAME_BUFFERS': 3  # shared frame buffers in the camera reader
+}
+
+# Startup settings
+STARTUP_CONFIG = {
+    'EAGER_DEVICES': os.getenv('EAGER_DEVICES', 'true').lower() == 'true',  # open devices in the background at startup
+    'DEVICE_RETRY_SECONDS': 30  # minimum wait before retrying a device that failed to open
+}
+
+# Live stream settings
+STREAM_CONFIG = {
+    'TIERS': {'thumb': 180, '480p': 480, 'full': None},  # output height per tier
+    'DEFAULT_TIER': 'full',  # until the client subscribes to a tier
+    'QUALITY_LEVELS': [70, 50, 35],  # JPEG qualities a congested client steps down through
+    'ENCODE_WORKERS': 2,  # threads encoding frames off the event loop
+    'CLIENT_QUEUE_SIZE': 2,  # frames buffered per client before dropping the oldest
+    'MIN_FPS': 2,
+    'MAX_FPS': 30,
+    'SLOW_SEND_MS': 50,  # average send time that counts as congested
+    'FAST_SEND_MS': 15,  # average send time that allows stepping back up
+    'ADAPT_INTERVAL': 1.0  # seconds between rate/quality adjustments
 }
 
 # Media settings
@@ -46,7 +87,54 @@ MEDIA_CONFIG = {
     'VIDEO_CODEC': 'mp4v',
     'VIDEO_FPS': 30,
     'IMAGE_QUALITY': 95,
-    'MAX_FILE_SIZE': 100 * 1024 * 1024  # 100MB
+    'MAX_FILE_SIZE': 100 * 1024 * 1024,  # 100MB
+    'CAPTURE_WORKERS': 2,  # threads encoding and writing captured stills
+    'CAPTURE_QUEUE_SIZE': 16,  # captures waiting to be written before new ones are refused
+    'CAPTURE_HISTORY': 1000,  # capture records kept for status lookups
+    'CAPTURE_FSYNC': True,  # fsync each still before renaming it into place
+    'CAPTURE_STORE_DIR': DATA_DIR / "captures",  # content-addressed still files, sharded by hash prefix
+    'CAPTURE_DEDUP_DISTANCE': 3,  # perceptual-hash bits within which single stills share one file; None: exact copies only
+    'CAPTURE_GC_GRACE': 86400,  # seconds an unreferenced stored file is kept before collection
+    'BURST_MAX_FRAMES': 90,  # frames in the preallocated burst ring (3s at 30fps)
+    'BURST_MAX_SECONDS': 600,  # longest time-lapse
+    'BURST_WORKERS': None,  # encoder processes; None uses every CPU
+    'BURST_HISTORY': 100,  # burst records (with their frame lists) kept for status lookups
+    'RECORD_QUEUE_SIZE': 8,  # session video frames buffered ahead of the writer before dropping
+    'RECORD_NICE': 10,  # niceness of the video writer thread (Linux), so the live stream keeps priority
+    'THUMBNAIL_DIR': DATA_DIR / "thumbnails",
+    'THUMBNAIL_WIDTH': 320,  # pixels; height keeps the capture's aspect ratio
+    'THUMBNAIL_QUALITY': 80,
+    'THUMBNAIL_CACHE_BYTES': 256 * 1024 * 1024,  # least recently used thumbnails are deleted beyond this
+    'THUMBNAIL_MAX_AGE': 86400,  # seconds browsers may reuse a thumbnail before revalidating
+    'COLLECTION_PAGE_SIZE': 24,  # recordings per collection page by default
+    'COLLECTION_MAX_PAGE_SIZE': 100,
+    'PUBLIC_URL': os.getenv('PUBLIC_URL', ''),  # base URL of this server, for links to originals in emails
+    'EMAIL_MEDIA_DIR': DATA_DIR / "email_media",  # cached email renditions of captures
+    'EMAIL_ATTACHMENT_BYTES': 10 * 1024 * 1024,  # attachments per email; larger originals are linked
+    'EMAIL_INLINE_BYTES': 512 * 1024,  # stills up to this size are attached unchanged
+    'EMAIL_IMAGE_WIDTH': 1280,  # pixels; larger stills are attached resized
+    'EMAIL_IMAGE_QUALITY': 85,
+    'EMAIL_CLIP_SECONDS': 5,  # videos are attached as a clip of their start
+    'EMAIL_CLIP_WIDTH': 640,
+    'EMAIL_MEDIA_CACHE_BYTES': 256 * 1024 * 1024,  # least recently used renditions are deleted beyond this
+    'DIGEST_COLUMNS': 4,  # thumbnails per row on a digest email's contact sheet
+    'DIGEST_QUALITY': 85
+}
+
+# Pattern analysis settings
+ANALYSIS_CONFIG = {
+    'SIZE': 128,  # captures are analyzed as SIZE x SIZE grayscale (centre square)
+    'BATCH_SIZE': 16,  # captures per worker task
+    'WORKERS': int(os.getenv('ANALYSIS_WORKERS', 0)) or None,  # analysis processes; None: all CPUs but one
+    'NODAL_THRESHOLD': 0.5  # standard deviations above the mean brightness that count as sand
+}
+
+# "Looks like this one" search over pattern embeddings
+SIMILARITY_CONFIG = {
+    'INDEX_DIR': DATA_DIR / "similarity",  # memory-mapped embedding and id files
+    'QUANTIZE': os.getenv('SIMILARITY_QUANTIZE') or None,  # None (float32) or 'int8' (4x smaller)
+    'DEFAULT_K': 12,  # similar patterns returned when no k is given
+    'MAX_K': 100  # largest k a request may ask for
 }
 
 # Email settings (if needed)
@@ -56,7 +144,37 @@ EMAIL_CONFIG = {
     'SMTP_USERNAME': os.getenv('SMTP_USERNAME', ''),
     'SMTP_PASSWORD': os.getenv('SMTP_PASSWORD', ''),
     'FROM_EMAIL': os.getenv('FROM_EMAIL', ''),
-    'USE_TLS': True
+    'USE_TLS': True,
+    'SMTP_TIMEOUT': 30,  # seconds per SMTP command
+    'SMTP_POOL_SIZE': 2,  # authenticated connections kept open and reused
+    'SMTP_IDLE_TIMEOUT': 30,  # seconds idle before a pooled connection is checked with NOOP
+    'SMTP_MAX_MESSAGES': 100,  # messages per connection before it is replaced
+    'DIGEST_MINUTES': float(os.getenv('EMAIL_DIGEST_MINUTES', '5'))  # a recipient's recordings within this window share one email; 0 sends each at once
+}
+
+# SMS settings
+TWILIO_CONFIG = {
+    'ENABLED': os.getenv('TWILIO_ENABLED', 'false').lower() == 'true',
+    'ACCOUNT_SID': os.getenv('TWILIO_ACCOUNT_SID', ''),
+    'AUTH_TOKEN': os.getenv('TWILIO_AUTH_TOKEN', ''),
+    'FROM_NUMBER': os.getenv('TWILIO_FROM_NUMBER', ''),
+    'TRANSPORT': os.getenv('SMS_TRANSPORT', 'twilio'),  # 'twilio', or 'fake' to keep messages in memory
+    'FAKE_LATENCY': 0.2,  # seconds the fake transport takes per message, like an API call
+    'SMS_CONCURRENCY': 4,  # provider requests in progress at once
+    'SMS_RATE': float(os.getenv('SMS_RATE', '1.0')),  # messages per second (Twilio long codes allow 1)
+    'SMS_BURST': 1,  # messages that may start back to back before the rate applies
+    'SMS_QUEUE_SIZE': 100,  # messages waiting to be sent before new ones are refused
+    'SMS_TIMEOUT': 15  # seconds per provider request
+}
+
+# Outgoing notifications: rows in the outbox table, sent by a background worker
+OUTBOX_CONFIG = {
+    'WORKERS': 2,  # threads handing out deliveries; emails send on them, texts on the SMS dispatcher
+    'BATCH_SIZE': 20,  # due messages claimed per poll
+    'POLL_INTERVAL': 5.0,  # seconds between checks for due retries
+    'MAX_ATTEMPTS': 6,  # deliveries tried before a message is marked failed
+    'RETRY_BASE': 30.0,  # seconds before the first retry; doubles with each attempt
+    'RETRY_MAX': 3600.0  # longest wait between retries
 }
 
 # Session settings
@@ -64,5 +182,11 @@ SESSION_CONFIG = {
     'DEFAULT_DURATION': 20,  # seconds
     'MIN_DURATION': 5,
     'MAX_DURATION': 60,
-    'COUNTDOWN_DURATION': 3  # seconds for countdown
+    'COUNTDOWN_DURATION': 3,  # seconds for countdown
+    'SWEEP_CAPTURE_INTERVAL': 0.5,  # seconds between frames during a chirp
+    'SWEEP_RETUNE_INTERVAL': 0.5,  # chirp step size when audio is looped, not streamed (each step is a new tone)
+    'SWEEP_SETTLE_FRACTION': 0.8,  # capture point within each stepped dwell
+    'SWEEP_HISTORY': 100,  # sweep records (with their capture lists) kept for status lookups
+    'SESSION_TTL': 1800,  # seconds after its last start/record/stop/save before a session is forgotten
+    'MAX_SESSIONS': 500  # sessions kept in memory; starting another expires the stalest
 }
\ No newline at end of file
@@ -1,23 +1,104 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from pathlib import Path
 import os
 
+from ..config.settings import DATABASE_URL, DATABASE_CONFIG
 from .base import Base
-from .models import Recording, Pattern, Analytics
+from .models import Recording, Pattern, Analytics, Experiment, AudioSetting, CaptureBlob, CaptureName
 
-# Build database URL
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "cymatics.db"
-DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# SQLite tuning: WAL lets readers run alongside the single writer, and
+# synchronous=NORMAL only fsyncs at checkpoints (safe in WAL mode)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms to wait for a lock instead of failing
+    'temp_store': 'MEMORY',
+    'cache_size': -16000,  # KiB (16MB page cache per connection)
+    'foreign_keys': 'ON'
+}
+
+# asyncio drivers for the synchronous URL schemes we support
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg'
+}
+
+def async_database_url(url: str) -> str:
+    """The asyncio-driver equivalent of a synchronous database URL."""
+    scheme, separator, rest = url.partition("://")
+    dialect, _, driver = scheme.partition("+")
+    if driver in ("aiosqlite", "asyncpg"):
+        return url
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database URL scheme: {scheme}")
+    return f"{ASYNC_DRIVERS[dialect]}{separator}{rest}"
+
+def pool_options(url: str, config=DATABASE_CONFIG) -> dict:
+    """Connection pool sizing from ``DATABASE_CONFIG``; in-memory SQLite keeps its default pool."""
+    if url.startswith("sqlite") and ":memory:" in url:
+        return {}
+    options = {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30)
+    }
+    if not url.startswith("sqlite"):
+        # Server connections can be closed under us; SQLite files cannot
+        options['pool_recycle'] = config.get('DB_POOL_RECYCLE', 1800)
+        options['pool_pre_ping'] = True
+    return options
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+def create_db_engine(url: str = DATABASE_URL, config=DATABASE_CONFIG) -> Engine:
+    """Create an engine; SQLite connections get ``SQLITE_PRAGMAS`` as they open."""
+    options = pool_options(url, config)
+    if not url.startswith("sqlite"):
+        return create_engine(url, **options)
+    
+    # SQLite file databases default to no pooling; keep connections (and their pragmas) open
+    if options:
+        options['poolclass'] = QueuePool
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        **options
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+def create_async_db_engine(url: str = DATABASE_URL, config=DATABASE_CONFIG) -> AsyncEngine:
+    """Create an asyncio engine (aiosqlite or asyncpg) for the same database as ``url``."""
+    url = async_database_url(url)
+    options = pool_options(url, config)
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, **options)
+    
+    if options:
+        options['poolclass'] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return engine
+
+# Create engines: the sync one serves the background writer and startup,
+# the async one serves request handlers without blocking the event loop
+engine = create_db_engine()
+async_engine = create_async_db_engine()
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 def init_db():
     """Initialize the database, creating all tables."""
@@ -26,6 +107,11 @@ def init_db():
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips existing tables, so add indexes declared since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     """Dependency for database sessions."""
@@ -33,4 +119,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Dependency for async database sessions."""
+    async with AsyncSessionLocal() as db:
+        yield db
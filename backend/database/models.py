@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -7,8 +7,8 @@ class Recording(Base):
     __tablename__ = "recordings"
     
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    frequency = Column(Float)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    frequency = Column(Float, index=True)
     waveform = Column(String)
     volume = Column(Float)
     duration = Column(Float)
@@ -42,4 +42,70 @@ class Analytics(Base):
     pattern_metrics = Column(JSON, nullable=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     
-    recording = relationship("Recording", back_populates="analytics")
\ No newline at end of file
+    recording = relationship("Recording", back_populates="analytics")
+
+class Experiment(Base):
+    __tablename__ = "experiments"
+    
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String, unique=True, index=True)
+    frequency = Column(Float)
+    start_time = Column(DateTime, default=datetime.utcnow)
+    end_time = Column(DateTime, nullable=True)
+    name = Column(String, nullable=True)
+    email = Column(String, nullable=True)
+    phone = Column(String, nullable=True)
+    opt_in = Column(Boolean, default=False)
+    image_path = Column(String, nullable=True)
+    video_path = Column(String, nullable=True)
+    recording_id = Column(Integer, ForeignKey('recordings.id'), nullable=True)
+    
+    recording = relationship("Recording")
+
+class AudioSetting(Base):
+    __tablename__ = "audio_settings"
+    
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    frequency = Column(Float)
+    waveform = Column(String)
+    volume = Column(Float)
+    mode = Column(String)
+
+class CaptureBlob(Base):
+    __tablename__ = "capture_blobs"
+    
+    id = Column(Integer, primary_key=True)
+    digest = Column(String, unique=True, index=True)  # sha256 of the file
+    path = Column(String)  # relative to the capture store
+    size = Column(Integer)
+    phash = Column(Integer, nullable=True)  # 64-bit difference hash, stored signed
+    refcount = Column(Integer, default=0)  # Recording/Pattern rows using one of its names
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used = Column(DateTime, default=datetime.utcnow)
+
+class CaptureName(Base):
+    __tablename__ = "capture_names"
+    
+    name = Column(String, primary_key=True)  # filename under /static/captures
+    digest = Column(String, ForeignKey('capture_blobs.digest'), index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox"
+    
+    id = Column(Integer, primary_key=True)
+    channel = Column(String, default='email')  # transport that delivers it
+    recipient = Column(String)
+    subject = Column(String, nullable=True)
+    body = Column(Text)
+    attachments = Column(JSON, nullable=True)  # file paths, read when the message is sent
+    state = Column(String, default='pending')  # pending, sent or failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    # The worker's poll: pending messages that are due, oldest first
+    __table_args__ = (Index('ix_outbox_state_next_attempt_at', 'state', 'next_attempt_at'),)
@@ -1,19 +1,57 @@
 from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, JSONResponse, Response
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from concurrent.futures import Future
 import numpy as np
-import pygame
 import cv2
 import logging
 import sys
 import os
 import random
+import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Literal
+from typing import Optional, Literal, List, Union
+import time
+
+from backend.config.settings import (
+    ANALYSIS_CONFIG, AUDIO_CONFIG, CAMERA_CONFIG, DATABASE_CONFIG, EMAIL_CONFIG, MEDIA_CONFIG,
+    OUTBOX_CONFIG, SESSION_CONFIG, SIMILARITY_CONFIG, STARTUP_CONFIG, STREAM_CONFIG, TWILIO_CONFIG
+)
+from backend.services.audio_engine import AudioEngine
+from backend.database.database import (
+    AsyncSessionLocal, SessionLocal, async_engine, engine, get_async_db, init_db
+)
+from backend.database.models import Analytics, AudioSetting, Experiment, Pattern, Recording
+from backend.services.audio_stream import AudioStreamer
+from backend.services.burst_service import BurstBusy, BurstService
+from backend.services.camera_service import CameraReader
+from backend.services.db_writer import DatabaseWriter
+from backend.services.digest import ContactSheets
+from backend.services.email_service import SmtpPool
+from backend.services.frequency_coverage import FrequencyCoverage
+from backend.services.capture_service import CaptureQueueFull, CaptureService
+from backend.services.capture_store import CaptureStore
+from backend.services.collection_service import page_etag, page_items, page_statement, static_path
+from backend.services.media_backends import audio_sink_factory, camera_factory
+from backend.services.media_service import MediaService
+from backend.services.notification_media import NotificationMedia
+from backend.services.notification_service import NotificationService
+from backend.services.outbox import Outbox
+from backend.services.pattern_analysis import PatternAnalyzer, summarize
+from backend.services.similarity_index import SimilarityIndex
+from backend.services.session_manager import SessionManager, SessionNotFound, SessionStateError
+from backend.services.sms_service import create_sms_dispatcher
+from backend.services.streaming_service import StreamingService
+from backend.services.sweep_service import SweepPlan, SweepService
+from backend.services.thumbnail_cache import ThumbnailCache
+from backend.services.video_recorder import RecorderBusy, VideoRecorder
+from backend.services.waveform_cache import WaveformCache
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -25,7 +63,41 @@ STATIC_DIR = BASE_DIR / "static"
 CAPTURES_DIR = STATIC_DIR / "captures"
 CAPTURES_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Serve immediately; devices open in the background (or on first use)"""
+    await asyncio.to_thread(init_db)
+    await frequency_coverage.load_from_async_db(AsyncSessionLocal)
+    await asyncio.to_thread(capture_store.load, SessionLocal)
+    await asyncio.to_thread(similarity_index.open)
+    await asyncio.to_thread(similarity_index.sync, SessionLocal)
+    db_writer.start()
+    capture_store.collect()
+    outbox.start()
+    session_manager.start_expiry()
+    startup = None
+    if STARTUP_CONFIG['EAGER_DEVICES']:
+        startup = asyncio.create_task(media_service.start())
+    yield
+    
+    await sweep_service.stop_all()
+    await asyncio.to_thread(video_recorder.stop)
+    await burst_service.close()
+    await streaming_service.close()
+    if startup:
+        await startup
+    await asyncio.to_thread(audio_streamer.stop)
+    await asyncio.to_thread(media_service.close)
+    await asyncio.to_thread(capture_service.drain)
+    await asyncio.to_thread(session_manager.close)
+    await asyncio.to_thread(pattern_analyzer.close)
+    await asyncio.to_thread(outbox.close)
+    await asyncio.to_thread(notification_service.close)
+    await asyncio.to_thread(db_writer.close)
+    await asyncio.to_thread(similarity_index.close)
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -36,30 +108,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Captures live in the content-addressed store; this route must come before the static mount
+@app.get("/static/captures/{name}")
+async def get_capture_file(name: str):
+    """Serve a capture by its filename; files not in the store come from the captures directory"""
+    path = capture_store.resolve(name)
+    if path is not None:
+        return FileResponse(path, media_type="image/jpeg",
+                            headers={"Cache-Control": "public, max-age=31536000, immutable"})
+    path = static_path(f"/static/captures/{name}", STATIC_DIR)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return FileResponse(path)
+
 # Mount static files directory
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-# Initialize camera
-try:
-    camera = cv2.VideoCapture(0)
-    if not camera.isOpened():
-        logger.error("Could not open camera")
-    else:
-        camera.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        camera.set(cv2.CAP_PROP_FPS, 30)
-        logger.info("Camera initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize camera: {e}")
-    camera = None
-
-# Initialize audio
-try:
-    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-    logger.info("Audio system initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize audio: {e}")
-
 # Global state
 class GlobalState:
     def __init__(self):
@@ -67,10 +131,192 @@ class GlobalState:
         self.current_sound = None
         self.current_volume = 0.9
         self.current_waveform = "sine"
-        self.active_sessions = {}  # Store active experiment sessions
 
 state = GlobalState()
 
+# Camera and audio: MediaService owns both devices, the camera through a single
+# reader thread whose newest frame is shared with every endpoint. Nothing is
+# opened at import time; see lifespan() and require_audio()/require_camera()
+camera_reader = CameraReader(
+    CAMERA_CONFIG,
+    capture_factory=camera_factory(CAMERA_CONFIG, frequency_source=lambda: state.current_frequency)
+)
+media_service = MediaService({**AUDIO_CONFIG, **CAMERA_CONFIG, **STARTUP_CONFIG},
+                             camera_reader=camera_reader)
+
+# Shared synthesis engine and looped tone buffers, reused across repeated frequency changes
+audio_engine = AudioEngine(AUDIO_CONFIG)
+waveform_cache = WaveformCache(AUDIO_CONFIG, sound_factory=media_service.make_sound,
+                               engine=audio_engine)
+audio_streamer = AudioStreamer(AUDIO_CONFIG, engine=audio_engine,
+                               sink_factory=audio_sink_factory(AUDIO_CONFIG))
+
+# Looped Sounds need the pygame mixer; headless sinks always stream
+audio_mode = AUDIO_CONFIG['MODE'] if AUDIO_CONFIG['SINK'] == 'pygame' else 'stream'
+
+# Database writes are queued and committed in batches by one background thread
+db_writer = DatabaseWriter(DATABASE_CONFIG, SessionLocal)
+
+# Tested frequencies, loaded once at startup and updated as recordings are saved
+frequency_coverage = FrequencyCoverage(AUDIO_CONFIG)
+
+# Pattern metrics are computed in worker processes once a recording is committed
+pattern_analyzer = PatternAnalyzer(ANALYSIS_CONFIG)
+
+# Their embeddings are appended to an on-disk index once the metrics are committed
+similarity_index = SimilarityIndex(SIMILARITY_CONFIG, SIMILARITY_CONFIG['INDEX_DIR'])
+
+def save_recording(recording: Recording, patterns: List[Pattern] = ()) -> Future:
+    """Queue a Recording row and its Pattern rows; resolves to the recording id"""
+    images = []
+    def job(session):
+        session.add(recording)
+        session.flush()
+        for pattern in patterns:
+            pattern.recording_id = recording.id
+        session.add_all(patterns)
+        session.flush()
+        images[:] = [(pattern.id, pattern.image_path) for pattern in patterns if pattern.image_path]
+        return recording.id
+    
+    frequency = recording.frequency
+    future = db_writer.submit(job)
+    future.add_done_callback(lambda f: f.exception() is None and frequency_coverage.add(frequency))
+    future.add_done_callback(lambda f: f.exception() is None and analyze_patterns(f.result(), images))
+    return future
+
+def analyze_patterns(recording_id: int, images: List[tuple]):
+    """Analyze a recording's pattern images, then store per-pattern and summary metrics"""
+    files = [(pattern_id, capture_file(url)) for pattern_id, url in images]
+    items = [(pattern_id, str(path)) for pattern_id, path in files if path is not None]
+    if items:
+        pattern_analyzer.submit(items).add_done_callback(
+            lambda f: f.result() and save_analysis(recording_id, f.result())
+        )
+
+def save_analysis(recording_id: int, results: List[tuple]) -> Future:
+    """Queue metrics into Pattern.analysis_data and an Analytics summary row"""
+    def job(session):
+        for pattern_id, metrics in results:
+            pattern = session.get(Pattern, pattern_id)
+            if pattern is not None:
+                pattern.analysis_data = {**(pattern.analysis_data or {}), **metrics}
+        session.add(Analytics(recording_id=recording_id,
+                              pattern_metrics=summarize([metrics for _, metrics in results])))
+    
+    embeddings = [(pattern_id, metrics.get('embedding')) for pattern_id, metrics in results]
+    future = db_writer.submit(job)
+    future.add_done_callback(lambda f: f.exception() is None and similarity_index.add(embeddings))
+    return future
+
+def update_experiment(session_id: str, **values) -> Future:
+    """Queue an update of a persisted experiment session"""
+    return db_writer.submit(
+        lambda session: session.query(Experiment).filter_by(session_id=session_id).update(values)
+    )
+
+# Notifications are outbox rows, sent in the background: emails over pooled SMTP
+# connections with size-capped attachments, texts through a bounded, rate-limited
+# dispatcher (when SMS is enabled). A recipient's recording emails within
+# DIGEST_MINUTES are coalesced into one digest with a contact sheet.
+smtp_pool = SmtpPool(EMAIL_CONFIG)
+notification_media = NotificationMedia(MEDIA_CONFIG, MEDIA_CONFIG['EMAIL_MEDIA_DIR'])
+thumbnail_cache = ThumbnailCache(MEDIA_CONFIG, MEDIA_CONFIG['THUMBNAIL_DIR'])
+contact_sheets = ContactSheets(MEDIA_CONFIG, MEDIA_CONFIG['EMAIL_MEDIA_DIR'] / "sheets", thumbnail_cache)
+sms_dispatcher = create_sms_dispatcher(TWILIO_CONFIG)
+
+def deliver_email(message: dict):
+    """Outbox transport: attach cached renditions (or links) in place of the originals"""
+    smtp_pool.deliver(notification_media.prepare(message))
+
+def deliver_digest(message: dict):
+    """Outbox transport: one email for all of a recipient's coalesced recordings"""
+    deliver_email(notification_service.digest_message(message))
+
+outbox = Outbox(OUTBOX_CONFIG, SessionLocal, db_writer.submit,
+                {'email': deliver_email, 'digest': deliver_digest,
+                 **({'sms': sms_dispatcher.deliver} if sms_dispatcher else {})},
+                coalesce=['digest'])
+notification_service = NotificationService(EMAIL_CONFIG, TWILIO_CONFIG, outbox=outbox,
+                                           smtp_pool=smtp_pool, sms=sms_dispatcher, media=notification_media,
+                                           contact_sheets=contact_sheets)
+
+def persist_capture(capture: dict):
+    """Log a saved still as a Recording row (session stills are linked on stop instead)"""
+    if capture.get('email') or capture.get('phone'):
+        image = capture_file(capture['url'])
+        notification_service.queue_recording(capture.get('email'), capture['frequency'],
+                                             image_path=(str(image), capture['filename']) if image else None,
+                                             notes=capture.get('notes'), phone_number=capture.get('phone'))
+    if capture.get('session_id'):
+        return
+    save_recording(Recording(
+        timestamp=capture['captured_at'],
+        frequency=capture['frequency'],
+        waveform=capture.get('waveform'),
+        volume=capture.get('volume'),
+        image_path=capture['url'],
+        settings={key: capture[key] for key in ('capture_id', 'sweep_id', 'index') if key in capture}
+    ), [Pattern(image_path=capture['url'], timestamp=capture['captured_at'])])
+
+# Stills are encoded and written behind the request by a small worker pool,
+# into a content-addressed store that shares files between near-identical frames
+capture_store = CaptureStore(MEDIA_CONFIG, MEDIA_CONFIG['CAPTURE_STORE_DIR'], db_writer.submit)
+capture_service = CaptureService(MEDIA_CONFIG, CAPTURES_DIR, on_saved=persist_capture,
+                                 store=capture_store)
+
+def capture_file(url: Optional[str]) -> Optional[Path]:
+    """File behind a capture URL: the content store first, then the static directory"""
+    return capture_store.resolve_url(url) or static_path(url, STATIC_DIR)
+
+# Experiment sessions live in memory until SESSION_TTL after their last event;
+# the hooks keep the persisted Experiment row in step
+def persist_session(session: dict):
+    db_writer.add(Experiment(session_id=session['session_id'], frequency=session['frequency'],
+                             start_time=session['start_time']))
+
+def end_session(session: dict):
+    update_experiment(session['session_id'], end_time=datetime.now(), image_path=session.get('image_path'),
+                      video_path=session.get('video_path'), recording_id=session.get('recording_id'))
+
+def save_session(session: dict):
+    """Store the visitor's details and queue their image and video by email and text"""
+    update_experiment(session['session_id'], name=session.get('name'), email=session.get('email'),
+                      phone=session.get('phone'), opt_in=session.get('opt_in', False))
+    media = {}
+    for key, wanted in (('image_path', 'send_image'), ('video_path', 'send_video')):
+        path = capture_file(session.get(key)) if session.get(wanted) else None
+        if path is not None and path.is_file():
+            media[key] = (str(path), Path(session[key]).name)
+    notification_service.queue_recording(session.get('email'), session['frequency'],
+                                         phone_number=session.get('phone'), **media)
+
+def abandon_session(session: dict):
+    if 'stop' not in session['events']:
+        update_experiment(session['session_id'], end_time=datetime.now())
+
+session_manager = SessionManager(SESSION_CONFIG, on_start=persist_session, on_stop=end_session,
+                                 on_save=save_session, on_expire=abandon_session)
+
+streaming_service = StreamingService(media_service, STREAM_CONFIG,
+                                     frequency_source=lambda: state.current_frequency,
+                                     sessions=session_manager)
+
+async def require_audio() -> bool:
+    """Open the audio system if startup has not done so yet"""
+    if media_service.status['audio'] != 'ready':
+        return await asyncio.to_thread(media_service.ensure_audio)
+    return True
+
+async def require_camera() -> bool:
+    """Open the camera if startup has not done so yet"""
+    if not camera_reader.available:
+        await asyncio.to_thread(media_service.ensure_camera)
+    if camera_reader.available and not camera_reader.sequence:
+        # Freshly opened (here or by startup): give the reader thread time to deliver its first frame
+        await asyncio.to_thread(camera_reader.wait_for_frame, 0, 2.0)
+    return camera_reader.available
+
 # Models
 class AudioRequest(BaseModel):
     frequency: float
@@ -82,25 +328,60 @@ class CaptureRequest(BaseModel):
     phone: Optional[str] = None
     notes: Optional[str] = None
 
-class ExperimentSession(BaseModel):
-    session_id: str
+class BurstRequest(BaseModel):
+    frames: int = 30
+    interval: float = 0.0  # seconds between frames; 0 records every camera frame
+    output: Literal["jpeg", "mp4"] = "jpeg"
+
+class StartRequest(BaseModel):
     frequency: float
-    start_time: datetime
+    waveform: Optional[Literal["sine", "square", "triangle", "sawtooth"]] = None
+
+class RecordRequest(BaseModel):
+    session_id: str
+    duration: Optional[float] = None
+
+class SweepRequest(BaseModel):
+    mode: Literal["linear", "log", "stepped"] = "log"
+    start_frequency: Optional[float] = None
+    end_frequency: Optional[float] = None
+    duration: Optional[float] = None
+    frequencies: Optional[List[float]] = None
+    dwell: Optional[Union[float, List[float]]] = None
+    steps: Optional[int] = None
+    capture_interval: Optional[float] = None
+    volume: Optional[float] = 0.9
+    waveform: Optional[Literal["sine", "square", "triangle", "sawtooth"]] = "sine"
+
+class SaveRequest(BaseModel):
+    session_id: str
     name: Optional[str] = None
-    email: Optional[str] = None
+    email: Optional[EmailStr] = None
     phone: Optional[str] = None
-    opt_in: bool = False
-    image_path: Optional[str] = None
+    opt_in: bool = Field(False, alias="optIn")
+    send_image: bool = Field(True, alias="sendImage")
+    send_video: bool = Field(False, alias="sendVideo")
+
+    @field_validator('name', 'email', 'phone', mode='before')
+    @classmethod
+    def blank_as_missing(cls, value):
+        # The collection form sends fields left empty as ""
+        return None if isinstance(value, str) and not value.strip() else value
 
 # Frequency Management Endpoints
+async def require_coverage():
+    """Load frequency coverage if startup has not done so yet"""
+    if not frequency_coverage.loaded:
+        await frequency_coverage.load_from_async_db(AsyncSessionLocal)
+
 @app.get("/api/frequencies/used")
 async def get_used_frequencies():
     """Get list of frequencies that have been used"""
     try:
-        # For now, return empty list until we implement database
+        await require_coverage()
         return {
             "status": "success",
-            "frequencies": []
+            "frequencies": frequency_coverage.used()
         }
     except Exception as e:
         logger.error(f"Error getting used frequencies: {e}")
@@ -108,70 +389,84 @@ async def get_used_frequencies():
 
 @app.get("/api/frequencies/suggest")
 async def suggest_frequency():
-    """Suggest an unused frequency"""
+    """Suggest the centre of the widest untested frequency range"""
     try:
-        suggested_freq = random.randint(20, 2000)
+        await require_coverage()
+        suggested_freq = frequency_coverage.suggest()
+        if suggested_freq is None:
+            # Every frequency has been tested at the configured resolution
+            return {
+                "status": "success",
+                "frequency": random.randint(AUDIO_CONFIG['MIN_FREQUENCY'], AUDIO_CONFIG['MAX_FREQUENCY']),
+                "is_new": False
+            }
         return {
             "status": "success",
             "frequency": suggested_freq,
-            "is_new": True
+            "is_new": True,
+            "gap": frequency_coverage.largest_gap()
         }
     except Exception as e:
         logger.error(f"Error suggesting frequency: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/frequencies/coverage")
+async def get_frequency_coverage():
+    """Get how much of the frequency range has been tested"""
+    await require_coverage()
+    return {"status": "success", "coverage": frequency_coverage.stats()}
+
 # Root endpoint
 @app.get("/")
 async def read_root():
     """Root endpoint returning system status"""
     return {
         "status": "Cymatics backend is running",
+        "ready": media_service.ready,
+        "devices": media_service.readiness(),
         "current_frequency": state.current_frequency,
         "current_waveform": state.current_waveform,
         "current_volume": state.current_volume,
-        "camera_available": camera is not None and camera.isOpened()
+        "camera_available": camera_reader.available
     }
 
+def play_tone(frequency: float, waveform: str, volume: float):
+    """Switch the audio output to a new tone in the configured audio mode"""
+    state.current_frequency = frequency
+    state.current_waveform = waveform
+    state.current_volume = volume
+    
+    if audio_mode == 'stream':
+        # Retune the running stream; takes effect on the next block
+        audio_streamer.set_params(frequency=frequency, volume=volume, waveform=waveform)
+        audio_streamer.start()
+        logger.info(f"Streaming {waveform} wave at {frequency}Hz")
+        return
+    
+    # Fetch looped tone (synthesized only on cache miss)
+    start = time.perf_counter()
+    sound = waveform_cache.get_sound(frequency, waveform, volume, AUDIO_CONFIG['SAMPLE_RATE'])
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    # Stop any current sound
+    media_service.stop_sounds()
+    
+    # Play new sound
+    state.current_sound = sound
+    state.current_sound.play(-1)  # Loop indefinitely
+    
+    logger.info(f"Playing {waveform} wave at {frequency}Hz (tone ready in {elapsed_ms:.2f}ms)")
+
 # Audio control endpoints
 @app.post("/api/audio")
 async def set_audio(audio_req: AudioRequest):
     """Set and play audio with specified parameters"""
     try:
-        # Update global state
-        state.current_frequency = audio_req.frequency
-        state.current_volume = audio_req.volume
-        state.current_waveform = audio_req.waveform
-        
-        # Generate tone
-        sample_rate = 44100
-        duration = 1.0
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        
-        # Generate waveform
-        if state.current_waveform == "sine":
-            wave = np.sin(2 * np.pi * state.current_frequency * t)
-        elif state.current_waveform == "square":
-            wave = np.sign(np.sin(2 * np.pi * state.current_frequency * t))
-        elif state.current_waveform == "triangle":
-            wave = 2 * np.abs(2 * (t * state.current_frequency - np.floor(0.5 + t * state.current_frequency))) - 1
-        elif state.current_waveform == "sawtooth":
-            wave = 2 * (t * state.current_frequency - np.floor(0.5 + t * state.current_frequency))
-        
-        # Apply volume and convert to 16-bit integers
-        wave = wave * state.current_volume
-        audio_data = (wave * 32767).astype(np.int16)
-        
-        # Create stereo data
-        stereo_data = np.column_stack([audio_data, audio_data])
-        
-        # Stop any current sound
-        pygame.mixer.stop()
-        
-        # Create and play new sound
-        state.current_sound = pygame.sndarray.make_sound(stereo_data)
-        state.current_sound.play(-1)  # Loop indefinitely
-        
-        logger.info(f"Playing {state.current_waveform} wave at {state.current_frequency}Hz")
+        if not await require_audio():
+            raise HTTPException(status_code=500, detail="Audio not available")
+        play_tone(audio_req.frequency, audio_req.waveform, audio_req.volume)
+        db_writer.add(AudioSetting(frequency=audio_req.frequency, waveform=audio_req.waveform,
+                                   volume=audio_req.volume, mode=audio_mode))
         return {
             "status": "success",
             "message": f"Playing {state.current_waveform} wave at {state.current_frequency}Hz"
@@ -180,11 +475,32 @@ async def set_audio(audio_req: AudioRequest):
         logger.error(f"Error setting audio: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/audio/cache")
+async def get_audio_cache_stats():
+    """Get waveform cache hit/miss counters and memory usage"""
+    return {
+        "status": "success",
+        "cache": waveform_cache.stats()
+    }
+
+@app.get("/api/audio/stream")
+async def get_audio_stream_stats():
+    """Get streaming synthesis timing and underrun counters"""
+    return {
+        "status": "success",
+        "mode": audio_mode,
+        "stream": audio_streamer.stats()
+    }
+
 @app.post("/api/stop")
 async def stop_audio():
     """Stop audio playback"""
     try:
-        pygame.mixer.stop()
+        # A running sweep would otherwise retune the output again
+        await sweep_service.stop_all()
+        if audio_streamer.running:
+            await asyncio.to_thread(audio_streamer.stop)
+        media_service.stop_sounds()
         state.current_sound = None
         return {"status": "success", "message": "Audio stopped"}
     except Exception as e:
@@ -193,55 +509,121 @@ async def stop_audio():
 
 @app.post("/api/capture")
 async def capture_image(capture_req: Optional[CaptureRequest] = None):
-    """Capture image from camera"""
-    if not camera or not camera.isOpened():
+    """Capture image from camera; the JPEG is written in the background"""
+    if not await require_camera():
         raise HTTPException(status_code=500, detail="Camera not available")
         
     try:
-        # Capture frame
-        ret, frame = camera.read()
-        if not ret:
-            raise HTTPException(status_code=500, detail="Failed to capture image")
-        
-        # Generate filename with timestamp and frequency
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        freq_str = f"{state.current_frequency}Hz" if state.current_frequency else "no_freq"
-        filename = f"cymatics_{freq_str}_{timestamp}.jpg"
-        
-        # Save image
-        image_path = CAPTURES_DIR / filename
-        cv2.imwrite(str(image_path), frame)
+        # Pin the newest frame from the shared buffer (no device read here)
+        with camera_reader.acquire(timeout=0) as frame:
+            if frame is None:
+                raise HTTPException(status_code=500, detail="Failed to capture image")
+            contact = {key: value for key, value in (capture_req.dict() if capture_req else {}).items()
+                       if key in ('email', 'phone', 'notes') and value}
+            capture = capture_service.submit(frame.image, frequency=state.current_frequency,
+                                             waveform=state.current_waveform,
+                                             volume=state.current_volume, **contact)
         
         return {
             "status": "success",
-            "message": "Image captured successfully",
-            "filename": filename,
-            "url": f"/static/captures/{filename}"
+            "message": "Image captured, saving",
+            "capture_id": capture["capture_id"],
+            "state": capture["state"],
+            "filename": capture["filename"],
+            "url": capture["url"]
         }
+    except CaptureQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error capturing image: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/capture/stats")
+async def get_capture_stats():
+    """Get capture write queue depth and counters"""
+    return {"status": "success", "captures": capture_service.stats(), "store": capture_store.stats()}
+
+@app.get("/api/capture/{capture_id}")
+async def get_capture(capture_id: str, wait: float = 0):
+    """Get capture state; with ``wait`` > 0, hold the request until the file is durable"""
+    capture = await capture_service.wait(capture_id, min(wait, 10.0)) if wait > 0 \
+        else capture_service.get(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return {"status": "success", "capture": capture}
+
+def save_burst_recording(burst: dict) -> int:
+    """Link a finished burst to one Recording row, with a Pattern row per still (blocking)"""
+    frames = burst['frames']
+    for frame in frames:
+        if 'filename' in frame:
+            # Exact copies only: consecutive frames of a slow pattern must not collapse into one file
+            frame['stored'] = capture_store.adopt(frame['filename'], CAPTURES_DIR / frame['filename'])['kind']
+    return save_recording(
+        Recording(
+            timestamp=burst['start_time'],
+            frequency=burst['frequency'],
+            waveform=state.current_waveform,
+            volume=state.current_volume,
+            duration=frames[-1]['timestamp'] - frames[0]['timestamp'],
+            image_path=frames[0].get('url'),
+            video_path=burst.get('video', {}).get('url'),
+            settings={'burst_id': burst['burst_id'], 'frames': len(frames),
+                      'interval': burst['interval'], 'output': burst['output']}
+        ),
+        [
+            Pattern(image_path=frame['url'], timestamp=datetime.fromtimestamp(frame['timestamp']),
+                    analysis_data={'index': frame['index'], 'sequence': frame['sequence'],
+                                   'frequency': frame['frequency']})
+            for frame in frames if 'url' in frame
+        ]
+    ).result()
+
+burst_service = BurstService(MEDIA_CONFIG, camera_reader, CAPTURES_DIR,
+                             frequency_source=lambda: state.current_frequency,
+                             on_complete=save_burst_recording)
+
+@app.post("/api/capture/burst")
+async def start_burst(burst_req: BurstRequest):
+    """Record a burst (every frame) or time-lapse into memory, then encode it in the background"""
+    if not await require_camera():
+        raise HTTPException(status_code=500, detail="Camera not available")
+    try:
+        burst = await burst_service.start(burst_req.frames, burst_req.interval, burst_req.output)
+        return {"status": "success", "burst": burst}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BurstBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting burst: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/capture/burst/{burst_id}")
+async def get_burst(burst_id: str):
+    """Get burst progress, frame files and the linked recording"""
+    burst = burst_service.get(burst_id)
+    if burst is None:
+        raise HTTPException(status_code=404, detail="Burst not found")
+    return {"status": "success", "burst": burst}
+
 # Experiment endpoints
+video_recorder = VideoRecorder(MEDIA_CONFIG, camera_reader, CAPTURES_DIR)
+
 @app.post("/api/experiment/start")
-async def start_experiment(frequency: float):
-    """Start a new cymatics experiment"""
+async def start_experiment(start_req: Optional[StartRequest] = None, frequency: Optional[float] = None):
+    """Start a new cymatics experiment; record, result and save name it by the returned session_id"""
+    if start_req is None and frequency is None:
+        raise HTTPException(status_code=422, detail="A frequency is required")
     try:
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Create new session
-        session = ExperimentSession(
-            session_id=session_id,
-            frequency=frequency,
-            start_time=datetime.now()
-        )
-        
-        # Store session
-        state.active_sessions[session_id] = session
+        if start_req is not None:
+            frequency = start_req.frequency
+        waveform = start_req.waveform if start_req is not None and start_req.waveform else state.current_waveform
+        session = session_manager.start(frequency, waveform=waveform)
         
         return {
             "status": "success",
-            "session_id": session_id,
+            "session_id": session['session_id'],
             "frequency": frequency,
             "duration": 20,  # 20 seconds experiment
             "message": "Experiment session initialized"
@@ -250,9 +632,371 @@ async def start_experiment(frequency: float):
         logger.error(f"Error starting experiment: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/experiment/record")
+async def start_recording(record_req: RecordRequest):
+    """Start recording the camera to video for an experiment session"""
+    if not await require_camera():
+        raise HTTPException(status_code=500, detail="Camera not available")
+    try:
+        session = session_manager.get(record_req.session_id)
+        if session is None:
+            raise SessionNotFound(record_req.session_id)
+        
+        duration = min(max(record_req.duration or SESSION_CONFIG['DEFAULT_DURATION'],
+                           SESSION_CONFIG['MIN_DURATION']), SESSION_CONFIG['MAX_DURATION'])
+        recording = await asyncio.to_thread(video_recorder.start, session['session_id'], duration)
+        session_manager.record(session['session_id'], duration=duration)
+        return {
+            "status": "success",
+            "session_id": session['session_id'],
+            "duration": duration,
+            "recording": recording
+        }
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    except RecorderBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting recording: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/experiment/stop")
+async def stop_recording(session_id: Optional[str] = None):
+    """Stop the session recording, take a final still and link both to a Recording row"""
+    current = video_recorder.current
+    if session_id and current is not None and current['session_id'] != session_id:
+        raise HTTPException(status_code=409, detail="Another session is recording")
+    recording = await asyncio.to_thread(video_recorder.stop)
+    if recording is None:
+        raise HTTPException(status_code=404, detail="No recording in progress")
+    try:
+        session = session_manager.get(recording['session_id'])
+        frequency = session['frequency'] if session else state.current_frequency
+        
+        # Final still of the settled pattern
+        still = None
+        with camera_reader.acquire(timeout=0) as frame:
+            if frame is not None:
+                still = capture_service.submit(frame.image, frequency=frequency,
+                                               session_id=recording['session_id'])
+        if still is not None:
+            still = await capture_service.wait(still['capture_id'], timeout=2.0)
+        image_path = still['url'] if still and still['state'] == 'saved' else None
+        video_path = recording['url'] if recording['state'] == 'saved' else None
+        
+        recording['db_id'] = await asyncio.wrap_future(save_recording(Recording(
+            timestamp=recording['start_time'],
+            frequency=frequency,
+            waveform=state.current_waveform,
+            volume=state.current_volume,
+            duration=recording.get('duration'),
+            image_path=image_path,
+            video_path=video_path,
+            settings={key: recording.get(key) for key in (
+                'session_id', 'recording_id', 'fps', 'frames_written', 'frames_dropped', 'frames_repeated'
+            )}
+        ), [Pattern(image_path=image_path, timestamp=still['captured_at'])] if image_path else []))
+        values = {'image_path': image_path, 'video_path': video_path, 'recording_id': recording['db_id']}
+        try:
+            timings = session_manager.stop(recording['session_id'], **values)['timings']
+        except SessionNotFound:
+            # Expired while recording (or recorded without a session): update the row directly
+            end_session({'session_id': recording['session_id'], **values})
+            timings = None
+        return {
+            "status": "success",
+            "session_id": recording['session_id'],
+            "imagePath": image_path,
+            "videoPath": video_path,
+            "recording": recording,
+            "timings": timings
+        }
+    except Exception as e:
+        logger.error(f"Error stopping recording: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/experiment/result")
+async def get_experiment_result(session_id: str):
+    """Get the image and video of a stopped session"""
+    session = session_manager.get(session_id)
+    if session is None or 'stop' not in session['events']:
+        raise HTTPException(status_code=404, detail="No experiment result")
+    return {
+        "status": "success",
+        "session_id": session['session_id'],
+        "frequency": session['frequency'],
+        "imagePath": session.get('image_path'),
+        "videoPath": session.get('video_path'),
+        "timings": session['timings']
+    }
+
+@app.post("/api/experiment/save")
+async def save_experiment(save_req: SaveRequest):
+    """Save the visitor's details on a stopped session and send them their creation"""
+    if not save_req.email and not save_req.phone:
+        raise HTTPException(status_code=400, detail="An email address or phone number is required")
+    session = session_manager.get(save_req.session_id)
+    if session is None or 'stop' not in session['events']:
+        raise HTTPException(status_code=404, detail="No experiment result to save")
+    if session['state'] == 'saved':
+        raise HTTPException(status_code=409, detail="This experiment has already been saved")
+    try:
+        session = await asyncio.to_thread(
+            session_manager.save, session['session_id'], name=save_req.name, email=save_req.email,
+            phone=save_req.phone, opt_in=save_req.opt_in, send_image=save_req.send_image,
+            send_video=save_req.send_video
+        )
+        return {"status": "success", "session_id": session['session_id'], "timings": session['timings']}
+    except SessionNotFound:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    except SessionStateError:
+        raise HTTPException(status_code=409, detail="This experiment has already been saved")
+    except Exception as e:
+        logger.error(f"Error saving experiment: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/experiment/sessions/stats")
+async def get_session_stats():
+    """Get open sessions by state, expiry counters and mean setup/recording/review times"""
+    return {"status": "success", "sessions": session_manager.stats()}
+
+async def capture_sweep_frame(frequency: float, sweep_id: str, index: int) -> dict:
+    """Capture one sweep frame, tagged with the instantaneous frequency"""
+    state.current_frequency = frequency
+    if not await require_camera():
+        return {"error": "Camera not available"}
+    
+    with camera_reader.acquire(timeout=0) as frame:
+        if frame is None:
+            return {"error": "Failed to capture image"}
+        try:
+            capture = capture_service.submit(
+                frame.image, frequency=frequency,
+                filename=f"cymatics_{frequency:.2f}Hz_sweep_{sweep_id}_{index:03d}.jpg",
+                waveform=state.current_waveform, volume=state.current_volume,
+                sweep_id=sweep_id, index=index, near_duplicates=False
+            )
+        except CaptureQueueFull as e:
+            return {"error": str(e)}
+    return {"capture_id": capture["capture_id"], "filename": capture["filename"], "url": capture["url"]}
+
+sweep_service = SweepService(
+    SESSION_CONFIG,
+    play_tone=play_tone,
+    capture_frame=capture_sweep_frame,
+    streamer=audio_streamer if audio_mode == 'stream' else None,
+    frequency_range=(AUDIO_CONFIG['MIN_FREQUENCY'], AUDIO_CONFIG['MAX_FREQUENCY'])
+)
+
+@app.post("/api/experiment/sweep")
+async def start_sweep(sweep_req: SweepRequest):
+    """Start a frequency sweep or chirp with frames captured along the way"""
+    try:
+        plan = SweepPlan(
+            sweep_req.mode,
+            start_frequency=sweep_req.start_frequency,
+            end_frequency=sweep_req.end_frequency,
+            duration=sweep_req.duration,
+            frequencies=sweep_req.frequencies,
+            dwell=sweep_req.dwell,
+            steps=sweep_req.steps
+        )
+        if not await require_audio():
+            raise HTTPException(status_code=500, detail="Audio not available")
+        sweep = await sweep_service.start(
+            plan,
+            waveform=sweep_req.waveform,
+            volume=sweep_req.volume,
+            capture_interval=sweep_req.capture_interval
+        )
+        return {"status": "success", "sweep": sweep}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting sweep: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/experiment/sweep/{sweep_id}")
+async def get_sweep(sweep_id: str):
+    """Get sweep progress and the frames captured so far"""
+    sweep = sweep_service.get(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    return {"status": "success", "sweep": sweep}
+
+@app.post("/api/experiment/sweep/{sweep_id}/stop")
+async def stop_sweep(sweep_id: str):
+    """Stop a running sweep"""
+    sweep = await sweep_service.stop(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    return {"status": "success", "sweep": sweep}
+
+@app.websocket("/ws/stream")
+async def stream_websocket(websocket: WebSocket):
+    """Live camera stream as binary JPEG frame messages; JSON for control messages"""
+    await streaming_service.connect(websocket)
+    await streaming_service.start_stream()
+    await require_camera()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            await streaming_service.handle_client_message(websocket, message)
+    except WebSocketDisconnect:
+        await streaming_service.disconnect(websocket)
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+        await streaming_service.disconnect(websocket)
+
+@app.get("/api/experiments")
+async def list_experiments(limit: int = 50, db: AsyncSession = Depends(get_async_db)):
+    """Get the most recent experiment sessions, newest first"""
+    try:
+        limit = max(1, min(limit, 200))
+        result = await db.execute(
+            select(Experiment).order_by(Experiment.start_time.desc()).limit(limit)
+        )
+        return {
+            "status": "success",
+            "experiments": [
+                {
+                    "session_id": experiment.session_id,
+                    "frequency": experiment.frequency,
+                    "start_time": experiment.start_time,
+                    "end_time": experiment.end_time,
+                    "name": experiment.name,
+                    "imagePath": experiment.image_path,
+                    "videoPath": experiment.video_path,
+                    "recording_id": experiment.recording_id
+                }
+                for experiment in result.scalars()
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error listing experiments: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Collection: every saved capture, paged newest first with cached thumbnails
+# (thumbnail_cache is defined with the notifications, which tile digest contact sheets from it)
+
+@app.get("/api/collection")
+async def get_collection(request: Request, limit: int = MEDIA_CONFIG['COLLECTION_PAGE_SIZE'],
+                         cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get a page of captured recordings; pass back next_cursor for the following page"""
+    try:
+        limit = max(1, min(limit, MEDIA_CONFIG['COLLECTION_MAX_PAGE_SIZE']))
+        result = await db.execute(page_statement(limit, cursor))
+        items, next_cursor = page_items(result.scalars().all(), limit)
+        payload = {"status": "success", "items": items, "next_cursor": next_cursor}
+        
+        etag = page_etag(payload)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(payload, headers=headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing collection: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/collection/{recording_id}/thumbnail")
+async def get_thumbnail(recording_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get a small JPEG of a recording's capture, generated on first request"""
+    recording = await db.get(Recording, recording_id)
+    source = capture_file(recording.image_path) if recording else None
+    if source is None or not source.is_file():
+        raise HTTPException(status_code=404, detail="Capture not found")
+    try:
+        headers = {"Cache-Control": f"public, max-age={MEDIA_CONFIG['THUMBNAIL_MAX_AGE']}"}
+        etag = await asyncio.to_thread(thumbnail_cache.etag, source)
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={**headers, "ETag": etag})
+        
+        path, etag = await asyncio.to_thread(thumbnail_cache.get, source)
+        return FileResponse(path, media_type="image/jpeg", headers={**headers, "ETag": etag})
+    except Exception as e:
+        logger.error(f"Error creating thumbnail for recording {recording_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/collection/stats")
+async def get_collection_stats():
+    """Get thumbnail cache size and hit rate"""
+    return {"status": "success", "thumbnails": thumbnail_cache.stats()}
+
+@app.get("/api/analysis/stats")
+async def get_analysis_stats():
+    """Get pattern analysis throughput counters"""
+    return {"status": "success", "analysis": pattern_analyzer.stats(), "index": similarity_index.stats()}
+
+@app.get("/api/patterns/{pattern_id}/similar")
+async def get_similar_patterns(pattern_id: int, k: int = SIMILARITY_CONFIG['DEFAULT_K'],
+                               db: AsyncSession = Depends(get_async_db)):
+    """Get the captured patterns that look most like this one, most similar first"""
+    k = max(1, min(k, SIMILARITY_CONFIG['MAX_K']))
+    matches = await asyncio.to_thread(similarity_index.similar, pattern_id, k)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Pattern not analyzed yet")
+    try:
+        result = await db.execute(select(Pattern).where(Pattern.id.in_([i for i, _ in matches])))
+        patterns = {pattern.id: pattern for pattern in result.scalars()}
+        return {
+            "status": "success",
+            "pattern_id": pattern_id,
+            "similar": [
+                {
+                    "pattern_id": match_id,
+                    "score": score,
+                    "recording_id": patterns[match_id].recording_id,
+                    "imagePath": patterns[match_id].image_path,
+                    "timestamp": patterns[match_id].timestamp
+                }
+                for match_id, score in matches if match_id in patterns
+            ]
+        }
+    except Exception as e:
+        logger.error(f"Error finding patterns similar to {pattern_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/notifications/stats")
+async def get_notification_stats():
+    """Get outbox backlog, delivery counters, SMTP connection reuse, attachment renditions, digests and SMS throughput"""
+    return {
+        "status": "success",
+        "outbox": outbox.stats(),
+        "smtp": smtp_pool.stats(),
+        "media": notification_media.stats(),
+        "contact_sheets": contact_sheets.stats(),
+        "sms": sms_dispatcher.stats() if sms_dispatcher else None
+    }
+
+@app.get("/api/db/stats")
+async def get_db_stats():
+    """Get database write queue depth, batch sizes and commit times"""
+    return {
+        "status": "success",
+        "db": db_writer.stats(),
+        "pool": {"sync": engine.pool.status(), "async": async_engine.pool.status()}
+    }
+
+@app.get("/api/stream/stats")
+async def get_stream_stats():
+    """Get per-client frame rate, JPEG quality and drop counters"""
+    return {"status": "success", "stream": streaming_service.stats()}
+
 @app.get("/api/experiment/current")
-async def get_current_experiment():
-    """Get current experiment data"""
+async def get_current_experiment(session_id: Optional[str] = None):
+    """Get current experiment data, or a started session's frequency and waveform"""
+    if session_id:
+        session = session_manager.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        return {
+            "status": "success",
+            "session_id": session_id,
+            "frequency": session['frequency'],
+            "waveform": session.get('waveform')
+        }
     try:
         if state.current_frequency is None:
             raise HTTPException(status_code=404, detail="No active experiment")
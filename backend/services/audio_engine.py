@@ -0,0 +1,190 @@
+from typing import Optional, Tuple, Union
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WAVEFORMS = ("sine", "square", "triangle", "sawtooth")
+QUALITY_LEVELS = ("naive", "polyblep", "additive")
+
+ArrayLike = Union[float, np.ndarray]
+
+# Partials rendered per vectorized pass in additive mode
+_HARMONIC_CHUNK = 16
+
+
+def _polyblep(t: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    """Two-sample polynomial band-limited step residual at phase wrap ``t == 0``."""
+    dt = np.broadcast_to(dt, t.shape)
+    out = np.zeros_like(t)
+    head = t < dt
+    x = t[head] / dt[head]
+    out[head] = x + x - x * x - 1.0
+    tail = t > 1.0 - dt
+    x = (t[tail] - 1.0) / dt[tail]
+    out[tail] = x * x + x + x + 1.0
+    return out
+
+
+def _polyblamp(t: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    """Two-sample polynomial band-limited ramp residual at phase wrap ``t == 0``."""
+    dt = np.broadcast_to(dt, t.shape)
+    out = np.zeros_like(t)
+    head = t < dt
+    x = t[head] / dt[head] - 1.0
+    out[head] = -x * x * x / 3.0
+    tail = t > 1.0 - dt
+    x = (t[tail] - 1.0) / dt[tail] + 1.0
+    out[tail] = x * x * x / 3.0
+    return out
+
+
+class AudioEngine:
+    """Vectorized oscillator bank shared by tone playback, streaming and sweeps.
+
+    Frequencies may be a scalar, a 1-D array of partials rendered in one pass
+    and mixed down, or a 2-D ``(partials, samples)`` array of per-sample
+    frequency trajectories (chirps). Phases are tracked in cycles so callers
+    can render consecutive blocks without discontinuities.
+    """
+
+    def __init__(self, config):
+        self.sample_rate = config.get('SAMPLE_RATE', 44100)
+        self.channels = config.get('CHANNELS', 2)
+        self.quality = config.get('SYNTH_QUALITY', 'polyblep')
+        self.max_harmonics = config.get('MAX_HARMONICS', 256)
+        if self.quality not in QUALITY_LEVELS:
+            raise ValueError(f"Unknown synthesis quality: {self.quality}")
+
+    def phase(self, frequency: ArrayLike, n_samples: int,
+              phase: ArrayLike = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute per-sample phase (cycles, wrapped to [0, 1)) for each partial.
+
+        Returns ``(phase, increment, next_phase)`` where ``phase`` has shape
+        ``(partials, n_samples)`` and ``next_phase`` continues the next block.
+        """
+        freq = np.asarray(frequency, dtype=np.float64)
+        if freq.ndim == 0:
+            freq = freq.reshape(1, 1)
+        elif freq.ndim == 1:
+            freq = freq[:, None]
+        start = np.asarray(phase, dtype=np.float64).reshape(-1, 1)
+
+        increment = freq / self.sample_rate
+        if increment.shape[1] == 1:
+            # Constant frequency: exact multiply instead of a running sum
+            ramp = np.arange(n_samples, dtype=np.float64) * increment
+            next_phase = start[:, 0] + n_samples * increment[:, 0]
+        else:
+            ramp = np.cumsum(increment, axis=1)
+            next_phase = start[:, 0] + ramp[:, -1]
+            ramp -= increment
+        ramp += start
+        np.mod(ramp, 1.0, out=ramp)
+        return ramp, np.broadcast_to(increment, ramp.shape), np.mod(next_phase, 1.0)
+
+    def oscillate(self, phase: np.ndarray, increment: np.ndarray, waveform: str,
+                  quality: Optional[str] = None) -> np.ndarray:
+        """Evaluate a waveform in [-1, 1] at the given phases."""
+        quality = quality or self.quality
+        if waveform not in WAVEFORMS:
+            raise ValueError(f"Unknown waveform: {waveform}")
+        if quality not in QUALITY_LEVELS:
+            raise ValueError(f"Unknown synthesis quality: {quality}")
+
+        if waveform == "sine":
+            return np.sin(2 * np.pi * phase)
+        if quality == "additive":
+            return self._additive(phase, increment, waveform)
+
+        if waveform == "sawtooth":
+            shifted = np.mod(phase + 0.5, 1.0)
+            wave = 2.0 * shifted - 1.0
+            if quality == "polyblep":
+                wave -= _polyblep(shifted, np.minimum(increment, 0.5))
+            return wave
+        if waveform == "square":
+            wave = np.where(phase < 0.5, 1.0, -1.0)
+            if quality == "polyblep":
+                dt = np.minimum(increment, 0.5)
+                wave += _polyblep(phase, dt)
+                wave -= _polyblep(np.mod(phase + 0.5, 1.0), dt)
+            return wave
+        # Triangle: -1 at phase 0, +1 at phase 0.5; slope flips by 8 per cycle at each corner
+        wave = 2.0 * np.abs(2.0 * np.mod(phase + 0.5, 1.0) - 1.0) - 1.0
+        if quality == "polyblep":
+            dt = np.minimum(increment, 0.5)
+            wave += 4.0 * dt * (_polyblamp(phase, dt) - _polyblamp(np.mod(phase + 0.5, 1.0), dt))
+        return wave
+
+    def _additive(self, phase: np.ndarray, increment: np.ndarray, waveform: str) -> np.ndarray:
+        """Fourier-series synthesis keeping only partials below Nyquist."""
+        if waveform == "sawtooth":
+            harmonics = np.arange(1, self.max_harmonics + 1)
+            amplitudes = (2 / np.pi) * np.where(harmonics % 2, 1.0, -1.0) / harmonics
+            offset = 0.0
+        elif waveform == "square":
+            harmonics = np.arange(1, self.max_harmonics + 1, 2)
+            amplitudes = (4 / np.pi) / harmonics
+            offset = 0.0
+        else:
+            harmonics = np.arange(1, self.max_harmonics + 1, 2)
+            amplitudes = -(8 / np.pi ** 2) / harmonics ** 2
+            offset = np.pi / 2  # cosine series
+
+        # Drop partials that alias for every sample before doing any work
+        top = harmonics * increment.max() < 0.5
+        harmonics, amplitudes = harmonics[top], amplitudes[top]
+
+        wave = np.zeros(phase.shape, dtype=np.float64)
+        angle = 2 * np.pi * phase
+        for i in range(0, len(harmonics), _HARMONIC_CHUNK):
+            k = harmonics[i:i + _HARMONIC_CHUNK, None, None]
+            a = amplitudes[i:i + _HARMONIC_CHUNK, None, None]
+            # Per-sample mask also band-limits chirps as they rise
+            audible = (k * increment) < 0.5
+            wave += (a * np.sin(k * angle + offset) * audible).sum(axis=0)
+        return wave
+
+    def render(self, frequency: ArrayLike, waveform: str, n_samples: int,
+               volume: ArrayLike = 1.0, phase: ArrayLike = 0.0,
+               weights: Optional[np.ndarray] = None, quality: Optional[str] = None,
+               out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Render int16 samples, mixing all partials into ``out``.
+
+        ``volume`` may be a scalar or a per-sample gain ramp. ``out`` is a
+        preallocated int16 array of shape ``(n_samples,)`` or
+        ``(n_samples, channels)``; it is allocated when omitted. Returns
+        ``(out, next_phase)``.
+        """
+        ramp, increment, next_phase = self.phase(frequency, n_samples, phase)
+        partials = self.oscillate(ramp, increment, waveform, quality)
+
+        if partials.shape[0] == 1:
+            mono = partials[0]
+        else:
+            if weights is None:
+                weights = np.full(partials.shape[0], 1.0 / partials.shape[0])
+            mono = np.asarray(weights, dtype=np.float64) @ partials
+
+        return self.write(mono, volume, out), next_phase
+
+    def write(self, mono: np.ndarray, volume: ArrayLike = 1.0,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scale a float signal in [-1, 1] to int16 and copy it to every channel of ``out``."""
+        mono *= np.asarray(volume, dtype=np.float64) * 32767.0
+        np.clip(mono, -32768, 32767, out=mono)
+
+        if out is None:
+            out = np.empty((len(mono), self.channels), dtype=np.int16)
+        if out.ndim == 2:
+            np.copyto(out, mono[:, None], casting='unsafe')
+        else:
+            np.copyto(out, mono, casting='unsafe')
+        return out
+
+    def harmonic_series(self, fundamental: float, count: int, rolloff: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Return frequencies and ``1/n**rolloff`` weights for the first ``count`` harmonics."""
+        harmonics = np.arange(1, count + 1, dtype=np.float64)
+        weights = 1.0 / harmonics ** rolloff
+        return fundamental * harmonics, weights / weights.sum()
@@ -0,0 +1,293 @@
+from typing import Callable, Optional
+import threading
+import logging
+import time
+import numpy as np
+from .audio_engine import AudioEngine
+
+logger = logging.getLogger(__name__)
+
+
+class BlockRing:
+    """Fixed ring of preallocated audio blocks between one producer and one consumer thread."""
+
+    def __init__(self, n_blocks: int, block_size: int, channels: int):
+        self.blocks = np.zeros((n_blocks, block_size, channels), dtype=np.int16)
+        self.n_blocks = n_blocks
+        self.head = 0  # blocks written
+        self.tail = 0  # blocks consumed
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def acquire_write(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Wait for a free block and return it for writing, or None once closed."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.closed or self.head - self.tail < self.n_blocks,
+                                       timeout):
+                return None
+            if self.closed:
+                return None
+            return self.blocks[self.head % self.n_blocks]
+
+    def commit_write(self):
+        with self._cond:
+            self.head += 1
+            self._cond.notify_all()
+
+    def acquire_read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Wait for a filled block and return it, or None on timeout / once drained and closed."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.closed or self.head > self.tail, timeout):
+                return None
+            if self.head == self.tail:
+                return None
+            return self.blocks[self.tail % self.n_blocks]
+
+    def commit_read(self):
+        with self._cond:
+            self.tail += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    @property
+    def filled(self) -> int:
+        return self.head - self.tail
+
+
+class PygameSink:
+    """Plays blocks gaplessly through a pygame mixer channel using its one-deep queue."""
+
+    def __init__(self, config):
+        import pygame
+        self._pygame = pygame
+        self.block_seconds = config['BUFFER'] / config['SAMPLE_RATE']
+        self.channel = pygame.mixer.Channel(0)
+
+    def write(self, block: np.ndarray):
+        """Hand one block to the mixer, waiting until the channel can accept it."""
+        sound = self._pygame.sndarray.make_sound(block)  # copies the samples
+        while self.channel.get_queue() is not None:
+            time.sleep(self.block_seconds / 4)
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            self.channel.play(sound)
+
+    def close(self):
+        self.channel.stop()
+
+
+class AudioStreamer:
+    """Block-by-block tone synthesis with live, click-free parameter changes.
+
+    A producer thread renders ``AUDIO_CONFIG['BUFFER']``-sample blocks into a
+    ``BlockRing`` with a continuous phase accumulator; a consumer thread feeds
+    them to the sink. Frequency, volume and waveform changes are picked up by
+    the next rendered block and ramped across it, so retune latency is bounded
+    by the ring depth rather than by rebuilding a looped buffer.
+    """
+
+    def __init__(self, config, engine: Optional[AudioEngine] = None,
+                 sink_factory: Optional[Callable[[dict], object]] = None):
+        self.config = config
+        self.engine = engine or AudioEngine(config)
+        self.sink_factory = sink_factory or PygameSink
+        self.block_size = config.get('BUFFER', 512)
+        self.sample_rate = config.get('SAMPLE_RATE', 44100)
+        self.ring_blocks = config.get('RING_BLOCKS', 2)
+        self.block_seconds = self.block_size / self.sample_rate
+
+        self._lock = threading.Lock()
+        self._target = {'frequency': None, 'volume': 0.0, 'waveform': 'sine'}
+        self._target_changed_at: Optional[float] = None
+        self._trajectory: Optional[Callable[[np.ndarray], np.ndarray]] = None
+        self._trajectory_samples = 0
+        self._frequency: Optional[float] = None
+        self._volume = 0.0
+        self._waveform = 'sine'
+        self._phase = np.zeros(1)
+        self._ramp = np.linspace(0.0, 1.0, self.block_size, endpoint=False)
+
+        self._ring: Optional[BlockRing] = None
+        self._producer: Optional[threading.Thread] = None
+        self._consumer: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._retune: Optional[tuple] = None  # (block sequence, time of request)
+
+        self.blocks_rendered = 0
+        self.underruns = 0
+        self.last_retune_latency: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._producer is not None and self._producer.is_alive()
+
+    def set_params(self, frequency: Optional[float] = None, volume: Optional[float] = None,
+                   waveform: Optional[str] = None):
+        """Update the target tone; applied and smoothed on the next block."""
+        with self._lock:
+            if frequency is not None:
+                self._target['frequency'] = float(frequency)
+            if volume is not None:
+                self._target['volume'] = float(volume)
+            if waveform is not None:
+                self._target['waveform'] = waveform
+            self._target_changed_at = time.perf_counter()
+
+    def set_trajectory(self, frequency_at: Optional[Callable[[np.ndarray], np.ndarray]]):
+        """Drive the pitch from ``frequency_at(seconds)`` evaluated per sample.
+
+        Time is counted in rendered samples from the next block, so chirps stay
+        sample-accurate regardless of scheduling jitter. Pass None to return
+        to the fixed target frequency.
+        """
+        with self._lock:
+            self._trajectory = frequency_at
+            self._trajectory_samples = 0
+            self._target_changed_at = time.perf_counter()
+
+    @property
+    def current_frequency(self) -> Optional[float]:
+        """Frequency at the end of the most recently rendered block."""
+        return self._frequency
+
+    def start(self):
+        """Start the producer and consumer threads if they are not running."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._ring = BlockRing(self.ring_blocks, self.block_size, self.config.get('CHANNELS', 2))
+        sink = self.sink_factory(self.config)
+        self._producer = threading.Thread(target=self._produce, name="audio-producer", daemon=True)
+        self._consumer = threading.Thread(target=self._consume, args=(sink,),
+                                          name="audio-consumer", daemon=True)
+        self._producer.start()
+        self._consumer.start()
+        logger.info(f"Audio stream started ({self.block_size}-sample blocks, "
+                    f"{self.ring_blocks} in flight)")
+
+    def stop(self, timeout: float = 1.0):
+        """Fade out over one block and stop the stream threads."""
+        if not self.running:
+            return
+        self._stopping.set()
+        self._producer.join(timeout)
+        self._consumer.join(timeout)
+        self._producer = self._consumer = None
+        self._frequency = None
+        self._volume = 0.0
+        logger.info("Audio stream stopped")
+
+    def _produce(self):
+        try:
+            while True:
+                block = self._ring.acquire_write(timeout=0.5)
+                if block is None:
+                    if self._ring.closed:
+                        break
+                    continue
+                fading_out = self._stopping.is_set()
+                changed_at = self._render_block(block, fade_out=fading_out)
+                if changed_at is not None and self._retune is None:
+                    self._retune = (self._ring.head, changed_at)
+                self._ring.commit_write()
+                self.blocks_rendered += 1
+                if fading_out:
+                    break
+        except Exception as e:
+            logger.error(f"Audio producer failed: {e}")
+        finally:
+            self._ring.close()
+
+    def _consume(self, sink):
+        try:
+            while True:
+                block = self._ring.acquire_read(timeout=0)
+                if block is None:
+                    if self._ring.closed and self._ring.filled == 0:
+                        break
+                    self.underruns += 1
+                    block = self._ring.acquire_read(timeout=0.5)
+                    if block is None:
+                        continue
+                sink.write(block)
+                retune = self._retune
+                if retune is not None and self._ring.tail >= retune[0]:
+                    # The first block carrying the change has reached the sink
+                    self.last_retune_latency = time.perf_counter() - retune[1]
+                    self._retune = None
+                self._ring.commit_read()
+        except Exception as e:
+            logger.error(f"Audio consumer failed: {e}")
+            self._ring.close()
+        finally:
+            sink.close()
+
+    def _render_block(self, block: np.ndarray, fade_out: bool = False) -> Optional[float]:
+        """Render one block, ramping from the current to the target parameters.
+
+        Returns the time the applied parameter change was requested, if any.
+        """
+        with self._lock:
+            target = dict(self._target)
+            changed_at, self._target_changed_at = self._target_changed_at, None
+            trajectory = self._trajectory
+            if trajectory is not None:
+                offset = self._trajectory_samples
+                self._trajectory_samples += self.block_size
+
+        target_volume = 0.0 if fade_out else target['volume']
+        if trajectory is not None:
+            seconds = (offset + np.arange(self.block_size)) / self.sample_rate
+            frequency = np.asarray(trajectory(seconds), dtype=np.float64)
+            target['frequency'] = float(frequency[-1])
+            frequency = frequency[None, :]
+        if target['frequency'] is None:
+            block.fill(0)
+            return changed_at
+        if self._frequency is None:
+            # First tone: start at the target pitch and fade in
+            self._frequency = target['frequency']
+            self._waveform = target['waveform']
+
+        if trajectory is None:
+            if self._frequency != target['frequency']:
+                # Exponential glide keeps the pitch change perceptually even
+                frequency = self._frequency * (target['frequency'] / self._frequency) ** self._ramp
+                frequency = frequency[None, :]
+            else:
+                frequency = self._frequency
+        if self._volume != target_volume:
+            volume = self._volume + (target_volume - self._volume) * self._ramp
+        else:
+            volume = self._volume
+
+        ramp, increment, self._phase = self.engine.phase(frequency, self.block_size, self._phase)
+        wave = self.engine.oscillate(ramp, increment, self._waveform)[0]
+        if target['waveform'] != self._waveform:
+            # Crossfade into the new waveform at the same phase
+            incoming = self.engine.oscillate(ramp, increment, target['waveform'])[0]
+            wave += (incoming - wave) * self._ramp
+
+        self.engine.write(wave, volume, out=block)
+        self._frequency = target['frequency']
+        self._volume = target_volume
+        self._waveform = target['waveform']
+        return changed_at
+
+    def stats(self) -> dict:
+        """Return stream timing and health counters."""
+        return {
+            'running': self.running,
+            'block_size': self.block_size,
+            'block_ms': self.block_seconds * 1000,
+            'ring_blocks': self.ring_blocks,
+            'blocks_rendered': self.blocks_rendered,
+            'underruns': self.underruns,
+            'last_retune_latency_ms': (self.last_retune_latency * 1000
+                                       if self.last_retune_latency is not None else None)
+        }
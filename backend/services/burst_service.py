@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context, shared_memory
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+import uuid
+import cv2
+import numpy as np
+from .camera_service import CameraReader
+from .capture_service import write_atomic
+
+logger = logging.getLogger(__name__)
+
+BURST_OUTPUTS = ("jpeg", "mp4")
+
+
+class BurstBusy(Exception):
+    """Raised when a burst is requested while another one still owns the ring."""
+
+
+class FrameRing:
+    """Preallocated frame store in shared memory, readable by encoder processes."""
+
+    def __init__(self, capacity: int, frame_shape: Tuple[int, ...]):
+        self.shape = (capacity, *frame_shape)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def fits(self, capacity: int, frame_shape: Tuple[int, ...]) -> bool:
+        return self.shape[0] >= capacity and self.shape[1:] == tuple(frame_shape)
+
+    def close(self):
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name: str, shape: Tuple[int, ...]):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def encode_jpeg_batch(name: str, shape: Tuple[int, ...], indices: List[int],
+                      paths: List[str], quality: int) -> List[int]:
+    """Encode ring slots ``indices`` to ``paths`` (runs in a worker process)."""
+    shm, frames = _attach(name, shape)
+    try:
+        sizes = []
+        for index, path in zip(indices, paths):
+            ok, encoded = cv2.imencode('.jpg', frames[index], [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise RuntimeError(f"JPEG encoding failed for frame {index}")
+            write_atomic(Path(path), encoded.data)
+            sizes.append(int(encoded.size))
+        return sizes
+    finally:
+        del frames
+        shm.close()
+
+
+def encode_video(name: str, shape: Tuple[int, ...], count: int, path: str,
+                 codec: str, fps: float) -> int:
+    """Encode the first ``count`` ring slots to one video file (runs in a worker process)."""
+    shm, frames = _attach(name, shape)
+    target = Path(path)
+    temp_path = target.with_name(f".{target.stem}.tmp{target.suffix}")
+    try:
+        height, width = shape[1:3]
+        writer = cv2.VideoWriter(str(temp_path), cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for codec {codec}")
+        for index in range(count):
+            writer.write(frames[index])
+        writer.release()
+        os.replace(temp_path, target)
+        return target.stat().st_size
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+        del frames
+        shm.close()
+
+
+class BurstService:
+    """Records frame bursts and time-lapses into a shared-memory ring, then encodes them.
+
+    Recording copies each new camera frame into a preallocated ring slot on a
+    worker thread, so a full-rate burst keeps up with the camera. Encoding
+    then runs in a process pool that reads the ring in place: JPEG sequences
+    are split across workers, while MP4 output (``VIDEO_CODEC``) is a single
+    sequential job. One burst owns the ring at a time.
+    """
+
+    def __init__(self, config, camera_reader: CameraReader, output_dir: Path,
+                 url_prefix: str = "/static/captures",
+                 frequency_source: Optional[Callable[[], Optional[float]]] = None,
+                 on_complete: Optional[Callable[[dict], Optional[int]]] = None):
+        self.config = config
+        self.camera_reader = camera_reader
+        self.output_dir = Path(output_dir)
+        self.url_prefix = url_prefix
+        self.frequency_source = frequency_source or (lambda: None)
+        self.on_complete = on_complete
+
+        self.max_frames = config.get('BURST_MAX_FRAMES', 90)
+        self.max_seconds = config.get('BURST_MAX_SECONDS', 600)
+        self.workers = config.get('BURST_WORKERS') or os.cpu_count() or 2
+        self.quality = config.get('IMAGE_QUALITY', 95)
+        self.codec = config.get('VIDEO_CODEC', 'mp4v')
+        self.video_fps = config.get('VIDEO_FPS', 30)
+        self.history = config.get('BURST_HISTORY', 100)
+
+        self.bursts: "OrderedDict[str, dict]" = OrderedDict()
+        self._ring: Optional[FrameRing] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def validate(self, frames: int, interval: float, output: str):
+        if output not in BURST_OUTPUTS:
+            raise ValueError(f"Unknown burst output: {output}")
+        if not 1 <= frames <= self.max_frames:
+            raise ValueError(f"Bursts take between 1 and {self.max_frames} frames")
+        if interval < 0 or frames * interval > self.max_seconds:
+            raise ValueError(f"Time-lapses may last at most {self.max_seconds}s")
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: the app process runs camera, audio and encoder threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn'))
+        return self._pool
+
+    def _ring_for(self, frames: int, frame_shape: Tuple[int, ...]) -> FrameRing:
+        if self._ring is None or not self._ring.fits(frames, frame_shape):
+            if self._ring is not None:
+                self._ring.close()
+            self._ring = FrameRing(max(frames, self.max_frames), frame_shape)
+        return self._ring
+
+    async def start(self, frames: int, interval: float = 0.0, output: str = "jpeg") -> dict:
+        """Begin recording ``frames`` frames, every new frame or one per ``interval`` seconds."""
+        self.validate(frames, interval, output)
+        if self._lock.locked():
+            raise BurstBusy("A burst is already recording or encoding")
+        await self._lock.acquire()
+
+        burst_id = uuid.uuid4().hex[:12]
+        burst = {
+            'burst_id': burst_id,
+            'state': 'recording',
+            'frames_requested': frames,
+            'interval': interval,
+            'output': output,
+            'frequency': self.frequency_source(),
+            'start_time': datetime.now(),
+            'frames': [],
+            'missed_frames': 0
+        }
+        self.bursts[burst_id] = burst
+        while len(self.bursts) > self.history:
+            self.bursts.popitem(last=False)
+        self._task = asyncio.create_task(self._run(burst))
+        logger.info(f"Burst {burst_id} started: {frames} frames, interval {interval}s, {output}")
+        return burst
+
+    def get(self, burst_id: str) -> Optional[dict]:
+        return self.bursts.get(burst_id)
+
+    def _record(self, burst: dict) -> FrameRing:
+        """Copy new camera frames into the ring (runs on a worker thread)."""
+        reader = self.camera_reader
+        newest = reader.wait_for_frame(0, timeout=2.0)
+        if newest is None:
+            raise RuntimeError("Camera not available")
+        ring = self._ring_for(burst['frames_requested'], newest.image.shape)
+
+        # The burst starts with the newest frame
+        interval = burst['interval']
+        last_sequence = newest.sequence - 1
+        next_due = time.perf_counter()
+        start = time.perf_counter()
+        for index in range(burst['frames_requested']):
+            if interval:
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_due += interval
+            with reader.acquire(after=last_sequence, timeout=2.0) as frame:
+                if frame is None:
+                    raise RuntimeError(f"Camera stopped after {index} frames")
+                np.copyto(ring.frames[index], frame.image)
+                if not interval and index and frame.sequence > last_sequence + 1:
+                    burst['missed_frames'] += frame.sequence - last_sequence - 1
+                last_sequence = frame.sequence
+                burst['frames'].append({
+                    'index': index,
+                    'sequence': frame.sequence,
+                    'timestamp': frame.timestamp,
+                    'frequency': self.frequency_source()
+                })
+        burst['record_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return ring
+
+    async def _encode(self, burst: dict, ring: FrameRing):
+        loop = asyncio.get_running_loop()
+        count = len(burst['frames'])
+        shape = ring.shape
+        stem = f"burst_{burst['start_time']:%Y%m%d_%H%M%S}_{burst['burst_id']}"
+
+        if burst['output'] == "mp4":
+            filename = f"{stem}.mp4"
+            span = burst['frames'][-1]['timestamp'] - burst['frames'][0]['timestamp']
+            # Full-rate bursts play back in real time; time-lapses at VIDEO_FPS
+            fps = (count - 1) / span if not burst['interval'] and count > 1 and span > 0 \
+                else self.video_fps
+            size = await loop.run_in_executor(
+                self.pool, encode_video, ring.name, shape, count,
+                str(self.output_dir / filename), self.codec, fps
+            )
+            burst['video'] = {'filename': filename, 'url': f"{self.url_prefix}/{filename}",
+                              'size': size, 'fps': round(fps, 2)}
+            return
+
+        filenames = [f"{stem}_{i:03d}.jpg" for i in range(count)]
+        batches = np.array_split(np.arange(count), min(self.workers, count))
+        sizes = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.pool, encode_jpeg_batch, ring.name, shape, batch.tolist(),
+                [str(self.output_dir / filenames[i]) for i in batch], self.quality
+            )
+            for batch in batches if batch.size
+        ))
+        for frame, filename, size in zip(burst['frames'], filenames, (s for b in sizes for s in b)):
+            frame.update(filename=filename, url=f"{self.url_prefix}/{filename}", size=size)
+
+    async def _run(self, burst: dict):
+        try:
+            ring = await asyncio.to_thread(self._record, burst)
+            burst['state'] = 'encoding'
+            start = time.perf_counter()
+            await self._encode(burst, ring)
+            burst['encode_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+            if self.on_complete:
+                burst['recording_id'] = await asyncio.to_thread(self.on_complete, burst)
+            burst['state'] = 'saved'
+            logger.info(f"Burst {burst['burst_id']} saved: {len(burst['frames'])} frames "
+                        f"recorded in {burst['record_ms']}ms, encoded in {burst['encode_ms']}ms")
+        except asyncio.CancelledError:
+            burst['state'] = 'stopped'
+            raise
+        except Exception as e:
+            burst['state'] = 'failed'
+            burst['error'] = str(e)
+            logger.error(f"Burst {burst['burst_id']} failed: {e}")
+        finally:
+            burst['end_time'] = datetime.now()
+            self._lock.release()
+
+    async def close(self):
+        """Wait for the current burst, then release the pool and the ring."""
+        if self._task and not self._task.done():
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
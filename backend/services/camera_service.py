@@ -0,0 +1,208 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple, Optional
+import threading
+import logging
+import time
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Frame(NamedTuple):
+    image: np.ndarray  # read-only view into the shared buffer
+    sequence: int
+    timestamp: float
+
+
+def open_camera(config):
+    """Open and configure the capture device described by ``CAMERA_CONFIG``."""
+    camera = cv2.VideoCapture(config['DEVICE_ID'])
+    if not camera.isOpened():
+        raise RuntimeError("Could not open camera")
+    if config.get('CAPTURE_FORMAT'):
+        camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*config['CAPTURE_FORMAT']))
+    camera.set(cv2.CAP_PROP_FRAME_WIDTH, config['FRAME_WIDTH'])
+    camera.set(cv2.CAP_PROP_FRAME_HEIGHT, config['FRAME_HEIGHT'])
+    camera.set(cv2.CAP_PROP_FPS, config['FPS'])
+    return camera
+
+
+class CameraReader:
+    """Single owner of the capture device, publishing the newest frame to all consumers.
+
+    A background thread reads straight into a small set of preallocated frame
+    buffers (triple buffered by default). Consumers get read-only views of
+    the newest buffer; ``acquire()`` pins it so the reader thread never
+    overwrites a frame that is still being encoded or written. If every spare
+    buffer is pinned, the new frame is dropped rather than blocking capture.
+    """
+
+    def __init__(self, config, capture_factory: Optional[Callable[[dict], object]] = None):
+        self.config = config
+        self.capture_factory = capture_factory or open_camera
+        self.n_buffers = max(2, config.get('FRAME_BUFFERS', 3))
+        shape = (config['FRAME_HEIGHT'], config['FRAME_WIDTH'], 3)
+
+        self._buffers = [np.zeros(shape, dtype=np.uint8) for _ in range(self.n_buffers)]
+        self._sequences = [0] * self.n_buffers
+        self._timestamps = [0.0] * self.n_buffers
+        self._pins = [0] * self.n_buffers
+        self._latest: Optional[int] = None
+        self._sequence = 0
+        self._cond = threading.Condition()
+
+        self.camera = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.camera is not None and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    def start(self) -> bool:
+        """Open the device and start the reader thread. Returns whether the camera is live."""
+        if self.available:
+            return True
+        try:
+            self.camera = self.capture_factory(self.config)
+        except Exception as e:
+            logger.error(f"Failed to initialize camera: {e}")
+            self.camera = None
+            return False
+
+        self._running.set()
+        self._thread = threading.Thread(target=self._read_loop, name="camera-reader", daemon=True)
+        self._thread.start()
+        logger.info("Camera initialized successfully")
+        return True
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the reader thread and release the device."""
+        self._running.clear()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.camera is not None:
+            self.camera.release()
+            self.camera = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def _free_slot(self) -> Optional[int]:
+        """Oldest buffer that is neither the published frame nor pinned (lock held)."""
+        free = [i for i in range(self.n_buffers) if i != self._latest and self._pins[i] == 0]
+        if not free:
+            return None
+        return min(free, key=lambda i: self._sequences[i])
+
+    def _read_loop(self):
+        scratch = None
+        while self._running.is_set():
+            with self._cond:
+                slot = self._free_slot()
+            if slot is not None:
+                target = self._buffers[slot]
+            else:
+                if scratch is None:
+                    scratch = np.empty_like(self._buffers[0])
+                target = scratch
+
+            try:
+                ok, image = self.camera.read(target)
+            except Exception as e:
+                logger.error(f"Camera read error: {e}")
+                ok, image = False, None
+            if not ok or image is None:
+                self.read_failures += 1
+                time.sleep(0.05)
+                continue
+            self.frames_read += 1
+
+            if slot is None:
+                self.frames_dropped += 1
+                continue
+            if image is not target:
+                # Device delivered a different size; adopt it for this slot
+                image = np.ascontiguousarray(image)
+
+            with self._cond:
+                self._buffers[slot] = image
+                self._sequence += 1
+                self._sequences[slot] = self._sequence
+                self._timestamps[slot] = time.time()
+                self._latest = slot
+                self._cond.notify_all()
+
+    def _frame(self, slot: int) -> Frame:
+        view = self._buffers[slot].view()
+        view.flags.writeable = False
+        return Frame(view, self._sequences[slot], self._timestamps[slot])
+
+    def latest(self) -> Optional[Frame]:
+        """Newest frame as an unpinned view; copy it if it must outlive the next two reads."""
+        with self._cond:
+            if self._latest is None:
+                return None
+            return self._frame(self._latest)
+
+    def snapshot(self) -> Optional[Frame]:
+        """Newest frame as an owned copy."""
+        with self.acquire() as frame:
+            if frame is None:
+                return None
+            return Frame(frame.image.copy(), frame.sequence, frame.timestamp)
+
+    @contextmanager
+    def acquire(self, after: int = 0, timeout: Optional[float] = None) -> Iterator[Optional[Frame]]:
+        """Pin and yield the newest frame newer than ``after`` (zero-copy).
+
+        Yields None if no such frame arrives within ``timeout``.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: (self._latest is not None and self._sequence > after) or not self._running.is_set(),
+                timeout
+            )
+            if not ready or self._latest is None or self._sequence <= after:
+                slot = None
+            else:
+                slot = self._latest
+                self._pins[slot] += 1
+                frame = self._frame(slot)
+        if slot is None:
+            yield None
+            return
+        try:
+            yield frame
+        finally:
+            with self._cond:
+                self._pins[slot] -= 1
+
+    def wait_for_frame(self, after: int = 0, timeout: Optional[float] = None) -> Optional[Frame]:
+        """Block until a frame newer than ``after`` exists; returns an unpinned view."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._sequence > after or not self._running.is_set(), timeout
+            )
+            if self._latest is None or self._sequence <= after:
+                return None
+            return self._frame(self._latest)
+
+    def stats(self) -> dict:
+        return {
+            'available': self.available,
+            'sequence': self._sequence,
+            'buffers': self.n_buffers,
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'read_failures': self.read_failures
+        }
@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: Path, data, fsync: bool = True):
+    """Write ``data`` to a hidden temp file beside ``path``, then rename it into place.
+
+    The temp name is unique per call, so concurrent writers of the same path
+    (e.g. two workers storing identical content) cannot rename each other's file.
+    """
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class CaptureQueueFull(Exception):
+    """Raised when too many captures are still waiting to be written."""
+
+
+class CaptureService:
+    """Write-behind still capture: the caller gets an ID at once, a worker makes it durable.
+
+    ``submit`` copies the frame and queues it; a bounded pool of worker threads
+    encodes it at ``IMAGE_QUALITY`` and writes it to a temporary file that is
+    fsynced and renamed into place, so a file under its final name is always
+    complete. Each capture moves through ``queued`` -> ``writing`` -> ``saved``
+    (or ``failed``). With a ``store`` (a ``CaptureStore``), files go to the
+    content-addressed store instead of ``captures_dir``; URLs stay the same.
+    """
+
+    def __init__(self, config, captures_dir: Path, url_prefix: str = "/static/captures",
+                 on_saved: Optional[Callable[[dict], None]] = None, store=None):
+        self.captures_dir = Path(captures_dir)
+        self.url_prefix = url_prefix
+        self.on_saved = on_saved
+        self.store = store
+        self.quality = config.get('IMAGE_QUALITY', 95)
+        self.max_pending = config.get('CAPTURE_QUEUE_SIZE', 16)
+        self.history = config.get('CAPTURE_HISTORY', 1000)
+        self.fsync = config.get('CAPTURE_FSYNC', True)
+        self._executor = ThreadPoolExecutor(max_workers=config.get('CAPTURE_WORKERS', 2),
+                                            thread_name_prefix="capture-write")
+
+        self.captures: "OrderedDict[str, dict]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.saved = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._futures)
+
+    def submit(self, image: np.ndarray, frequency: Optional[float] = None,
+               filename: Optional[str] = None, near_duplicates: bool = True, **metadata) -> dict:
+        """Queue ``image`` for writing and return its capture record immediately.
+
+        With a store, ``near_duplicates`` lets a near-identical stored frame
+        stand in for this one; series of frames should pass False.
+        """
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self.rejected += 1
+                raise CaptureQueueFull(f"{len(self._futures)} captures are still being written")
+
+            capture_id = uuid.uuid4().hex[:12]
+            now = datetime.now()
+            if filename is None:
+                freq_str = f"{frequency}Hz" if frequency else "no_freq"
+                filename = f"cymatics_{freq_str}_{now:%Y%m%d_%H%M%S}_{capture_id}.jpg"
+            record = {
+                'capture_id': capture_id,
+                'state': 'queued',
+                'filename': filename,
+                'url': f"{self.url_prefix}/{filename}",
+                'frequency': frequency,
+                'captured_at': now,
+                **metadata
+            }
+            self.captures[capture_id] = record
+            while len(self.captures) > self.history:
+                self.captures.popitem(last=False)
+            self.submitted += 1
+
+            # Own the pixels so the camera buffer is released right away
+            future = self._executor.submit(self._write, record, np.array(image), time.perf_counter(),
+                                           near_duplicates)
+            self._futures[capture_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(capture_id, None))
+        return record
+
+    def _write(self, record: dict, image: np.ndarray, queued_at: float, near_duplicates: bool = True):
+        record['state'] = 'writing'
+        start = time.perf_counter()
+        try:
+            ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                raise RuntimeError("JPEG encoding failed")
+            if self.store is not None:
+                stored = self.store.put(record['filename'], encoded.data, image if near_duplicates else None)
+                record['digest'] = stored['digest']
+                record['stored'] = stored['kind']
+            else:
+                write_atomic(self.captures_dir / record['filename'], encoded.data, self.fsync)
+
+            record['size'] = int(encoded.size)
+            record['queue_ms'] = round((start - queued_at) * 1000, 2)
+            record['write_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            record['state'] = 'saved'
+            self.saved += 1
+        except Exception as e:
+            record['state'] = 'failed'
+            record['error'] = str(e)
+            self.failed += 1
+            logger.error(f"Failed to write capture {record['capture_id']}: {e}")
+            return
+
+        if self.on_saved:
+            try:
+                self.on_saved(record)
+            except Exception as e:
+                logger.error(f"Capture {record['capture_id']} saved, but on_saved failed: {e}")
+
+    def get(self, capture_id: str) -> Optional[dict]:
+        return self.captures.get(capture_id)
+
+    async def wait(self, capture_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """Wait up to ``timeout`` seconds for a capture to be saved or fail."""
+        future = self._futures.get(capture_id)
+        if future is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.captures.get(capture_id)
+
+    def drain(self, timeout: Optional[float] = None):
+        """Block until every queued capture has been written."""
+        for future in list(self._futures.values()):
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'saved': self.saved,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,322 @@
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import hashlib
+import logging
+import os
+import threading
+import time
+import cv2
+import numpy as np
+from sqlalchemy import delete, event, inspect, select, update
+from ..database.models import CaptureBlob, CaptureName, Pattern, Recording
+from .capture_service import write_atomic
+from .db_writer import Job, insert
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_URL_PREFIX = "/static/captures/"
+
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit difference hash: horizontal brightness gradients of a 9x8 thumbnail."""
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def _signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def capture_name(url: Optional[str]) -> Optional[str]:
+    """Filename of a ``/static/captures/<name>`` URL, or None for any other path."""
+    if not url or not url.startswith(CAPTURE_URL_PREFIX):
+        return None
+    name = url[len(CAPTURE_URL_PREFIX):]
+    return name if name and "/" not in name else None
+
+
+class CaptureStore:
+    """Content-addressed capture files, shared between near-identical frames.
+
+    Each distinct file is stored once as ``ab/cd/<sha256>.jpg`` under the
+    store directory, so no directory grows past a few hundred entries. A
+    capture keeps its own filename (and URL) as an alias for a stored file:
+    exact copies reuse that file, and so do frames whose perceptual hash is
+    within ``CAPTURE_DEDUP_DISTANCE`` bits of a stored one, when the caller
+    opts in. Frames of a series (bursts, time-lapses, sweeps) are stored
+    exact-only, since consecutive frames of a slowly changing pattern are
+    near-identical by design. Near-duplicate lookups split the hash into ``distance + 1`` bands; two
+    hashes that close must agree on at least one band, so only frames sharing
+    a band are compared.
+
+    Blob and alias rows are queued on the database writer. Recording and
+    Pattern rows count references to blobs (see ``_count_references``);
+    ``collect`` deletes blobs nobody has referenced or reused for
+    ``CAPTURE_GC_GRACE`` seconds.
+    """
+
+    def __init__(self, config, root_dir: Path, submit: Callable[[Job], Future]):
+        self.root_dir = Path(root_dir)
+        self.submit = submit
+        self.fsync = config.get('CAPTURE_FSYNC', True)
+        self.distance = config.get('CAPTURE_DEDUP_DISTANCE', 3)  # None: exact copies only
+        self.grace = config.get('CAPTURE_GC_GRACE', 86400)
+
+        bands = self.distance + 1 if self.distance is not None else 0
+        edges = [round(i * 64 / bands) for i in range(bands + 1)] if bands else []
+        self._band_masks = [(low, (1 << (high - low)) - 1) for low, high in zip(edges, edges[1:])]
+        self._bands: List[Dict[int, Set[str]]] = [{} for _ in self._band_masks]
+
+        self._names: Dict[str, str] = {}  # capture filename -> digest
+        self._aliases: Dict[str, Set[str]] = {}  # digest -> capture filenames
+        self._blobs: Dict[str, Tuple[str, Optional[int]]] = {}  # digest -> (relative path, phash)
+        self._last_used: Dict[str, float] = {}  # digest -> time.time() of its latest alias
+        self._lock = threading.Lock()
+        self.loaded = False
+
+        self.stored = 0
+        self.duplicates = 0
+        self.near_duplicates = 0
+        self.bytes_saved = 0
+        self.collected = 0
+
+    # In-memory index
+
+    def _band_keys(self, phash: int):
+        return [(phash >> shift) & mask for shift, mask in self._band_masks]
+
+    def _index(self, digest: str, path: str, phash: Optional[int], last_used: float):
+        self._blobs[digest] = (path, phash)
+        self._aliases.setdefault(digest, set())
+        self._last_used[digest] = last_used
+        if phash is not None:
+            for band, key in zip(self._bands, self._band_keys(phash)):
+                band.setdefault(key, set()).add(digest)
+
+    def _unindex(self, digest: str):
+        path, phash = self._blobs.pop(digest)
+        for name in self._aliases.pop(digest, ()):
+            self._names.pop(name, None)
+        self._last_used.pop(digest, None)
+        if phash is not None:
+            for band, key in zip(self._bands, self._band_keys(phash)):
+                bucket = band.get(key)
+                if bucket is not None:
+                    bucket.discard(digest)
+                    if not bucket:
+                        del band[key]
+
+    def _match(self, digest: str, phash: Optional[int]) -> Tuple[Optional[str], str]:
+        """Stored digest to reuse for a new file, and how it matched."""
+        if digest in self._blobs:
+            return digest, 'duplicate'
+        if phash is None or self.distance is None:
+            return None, 'stored'
+        best, best_distance = None, self.distance + 1
+        for band, key in zip(self._bands, self._band_keys(phash)):
+            for candidate in band.get(key, ()):
+                distance = (self._blobs[candidate][1] ^ phash).bit_count()
+                if distance < best_distance:
+                    best, best_distance = candidate, distance
+        return (best, 'near_duplicate') if best is not None else (None, 'stored')
+
+    @staticmethod
+    def shard_path(digest: str) -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+
+    # Storing
+
+    def put(self, name: str, data, image: Optional[np.ndarray] = None) -> dict:
+        """Store encoded ``data`` under capture filename ``name`` (blocking).
+
+        ``image`` is the decoded frame, used for near-duplicate matching;
+        without it only exact copies are shared.
+        """
+        phash = perceptual_hash(image) if image is not None and self.distance is not None else None
+        return self._store(name, hashlib.sha256(data).hexdigest(), phash, len(data),
+                           lambda path: write_atomic(path, data, self.fsync))
+
+    def adopt(self, name: str, source: Path, near_duplicates: bool = False) -> dict:
+        """Move an already written capture file into the store (blocking).
+
+        Only exact copies are shared unless ``near_duplicates`` is set.
+        """
+        data = source.read_bytes()
+        phash = None
+        if near_duplicates and self.distance is not None:
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+            phash = perceptual_hash(image) if image is not None else None
+        result = self._store(name, hashlib.sha256(data).hexdigest(), phash, len(data),
+                             lambda path: os.replace(source, path))
+        if source.exists():
+            source.unlink()  # matched a stored file, so it was never moved
+        return result
+
+    def _store(self, name: str, digest: str, phash: Optional[int], size: int,
+               write: Callable[[Path], None]) -> dict:
+        with self._lock:
+            match, kind = self._match(digest, phash)
+            if match is not None:
+                return self._alias(name, match, kind, size)
+
+        # New content: write it outside the lock so capture workers run in parallel
+        relative = self.shard_path(digest)
+        path = self.root_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write(path)
+
+        with self._lock:
+            match, kind = self._match(digest, phash)
+            if match is None:
+                now = time.time()
+                self._index(digest, relative, phash, now)
+                self.submit(insert(CaptureBlob(
+                    digest=digest, path=relative, size=size,
+                    phash=_signed(phash) if phash is not None else None,
+                    refcount=0, created_at=datetime.utcfromtimestamp(now),
+                    last_used=datetime.utcfromtimestamp(now)
+                )))
+                self.stored += 1
+                return self._alias(name, digest, 'stored', 0)
+            result = self._alias(name, match, kind, size)
+        if match != digest:
+            path.unlink(missing_ok=True)  # another writer stored a near-identical frame first
+        return result
+
+    def _alias(self, name: str, digest: str, kind: str, saved: int) -> dict:
+        """Point ``name`` at a stored blob (call with the lock held)."""
+        now = time.time()
+        self._names[name] = digest
+        self._aliases[digest].add(name)
+        self._last_used[digest] = now
+        if kind == 'duplicate':
+            self.duplicates += 1
+        elif kind == 'near_duplicate':
+            self.near_duplicates += 1
+        self.bytes_saved += saved
+
+        def job(session):
+            session.merge(CaptureName(name=name, digest=digest, created_at=datetime.utcfromtimestamp(now)))
+            session.execute(update(CaptureBlob).where(CaptureBlob.digest == digest)
+                            .values(last_used=datetime.utcfromtimestamp(now)))
+        self.submit(job)
+        return {'digest': digest, 'kind': kind, 'path': self.root_dir / self._blobs[digest][0]}
+
+    # Lookup
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Stored file behind capture filename ``name``."""
+        digest = self._names.get(name)
+        blob = self._blobs.get(digest) if digest else None
+        return self.root_dir / blob[0] if blob else None
+
+    def resolve_url(self, url: Optional[str]) -> Optional[Path]:
+        name = capture_name(url)
+        return self.resolve(name) if name else None
+
+    def digest(self, name: str) -> Optional[str]:
+        return self._names.get(name)
+
+    def load(self, session_factory: Callable):
+        """Rebuild the index from the database (once, before serving)."""
+        db = session_factory()
+        try:
+            blobs = db.execute(select(CaptureBlob.digest, CaptureBlob.path, CaptureBlob.phash,
+                                      CaptureBlob.last_used)).all()
+            names = db.execute(select(CaptureName.name, CaptureName.digest)).all()
+        finally:
+            db.close()
+        with self._lock:
+            for digest, path, phash, last_used in blobs:
+                self._index(digest, path, phash % (1 << 64) if phash is not None else None,
+                            (last_used or datetime.utcnow()).timestamp())
+            for name, digest in names:
+                if digest in self._blobs:
+                    self._names[name] = digest
+                    self._aliases[digest].add(name)
+            self.loaded = True
+        logger.info(f"Capture store loaded: {len(self._blobs)} files, {len(self._names)} captures")
+
+    # Garbage collection
+
+    def collect(self) -> Future:
+        """Queue deletion of unreferenced blobs idle for ``CAPTURE_GC_GRACE``; resolves to the count."""
+        def job(session):
+            cutoff = time.time() - self.grace
+            rows = session.execute(
+                select(CaptureBlob.digest, CaptureBlob.path).where(
+                    CaptureBlob.refcount <= 0,
+                    CaptureBlob.last_used < datetime.utcfromtimestamp(cutoff)
+                )
+            ).all()
+            with self._lock:
+                # A capture may have just reused a candidate; only delete idle ones
+                doomed = [digest for digest, _ in rows if self._last_used.get(digest, 0) < cutoff]
+                for digest, path in rows:
+                    if digest in doomed:
+                        if digest in self._blobs:
+                            self._unindex(digest)
+                        (self.root_dir / path).unlink(missing_ok=True)
+                self.collected += len(doomed)
+            if doomed:
+                session.execute(delete(CaptureName).where(CaptureName.digest.in_(doomed)))
+                session.execute(delete(CaptureBlob).where(CaptureBlob.digest.in_(doomed)))
+                logger.info(f"Capture store collected {len(doomed)} unreferenced files")
+            return len(doomed)
+        return self.submit(job)
+
+    def stats(self) -> dict:
+        return {
+            'loaded': self.loaded,
+            'files': len(self._blobs),
+            'captures': len(self._names),
+            'stored': self.stored,
+            'duplicates': self.duplicates,
+            'near_duplicates': self.near_duplicates,
+            'bytes_saved': self.bytes_saved,
+            'collected': self.collected
+        }
+
+
+# Reference counting: every Recording or Pattern row whose image_path is a
+# capture URL holds one reference on the blob behind that capture's name.
+# The counts change in the same transaction as the row.
+
+def _adjust_refcount(connection, image_path: Optional[str], delta: int):
+    name = capture_name(image_path)
+    if name is None:
+        return
+    connection.execute(
+        update(CaptureBlob)
+        .where(CaptureBlob.digest == select(CaptureName.digest)
+               .where(CaptureName.name == name).scalar_subquery())
+        .values(refcount=CaptureBlob.refcount + delta)
+    )
+
+
+def _count_references(model):
+    @event.listens_for(model, "after_insert")
+    def referenced(mapper, connection, target):
+        _adjust_refcount(connection, target.image_path, 1)
+
+    @event.listens_for(model, "after_delete")
+    def released(mapper, connection, target):
+        _adjust_refcount(connection, target.image_path, -1)
+
+    @event.listens_for(model, "after_update")
+    def changed(mapper, connection, target):
+        history = inspect(target).attrs.image_path.history
+        for old in history.deleted or ():
+            _adjust_refcount(connection, old, -1)
+        for new in history.added or ():
+            _adjust_refcount(connection, new, 1)
+
+
+for _model in (Recording, Pattern):
+    _count_references(_model)
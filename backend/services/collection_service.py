@@ -0,0 +1,81 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+import base64
+import hashlib
+import json
+import logging
+from sqlalchemy import and_, or_, select
+from ..database.models import Recording
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(timestamp: datetime, recording_id: int) -> str:
+    """Opaque cursor for the position just after ``(timestamp, recording_id)``."""
+    raw = f"{timestamp.isoformat()}|{recording_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, recording_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), int(recording_id)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def page_statement(limit: int, cursor: Optional[str] = None):
+    """Recordings with an image, newest first, starting after ``cursor``.
+
+    Keyset pagination on ``(timestamp, id)``: each page is an index range
+    scan of ``ix_recordings_timestamp`` however deep the client has paged,
+    and rows inserted meanwhile do not shift later pages. One row beyond
+    ``limit`` is selected to tell whether another page follows.
+    """
+    statement = select(Recording).where(Recording.image_path.isnot(None))
+    if cursor:
+        timestamp, recording_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            Recording.timestamp < timestamp,
+            and_(Recording.timestamp == timestamp, Recording.id < recording_id)
+        ))
+    return statement.order_by(Recording.timestamp.desc(), Recording.id.desc()).limit(limit + 1)
+
+
+def page_items(recordings: List[Recording], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """Serialize a page selected by ``page_statement``; returns the items and the next cursor."""
+    items = [
+        {
+            'id': recording.id,
+            'timestamp': recording.timestamp.isoformat(),
+            'frequency': recording.frequency,
+            'waveform': recording.waveform,
+            'imagePath': recording.image_path,
+            'videoPath': recording.video_path,
+            'thumbnail': f"/api/collection/{recording.id}/thumbnail"
+        }
+        for recording in recordings[:limit]
+    ]
+    next_cursor = None
+    if len(recordings) > limit:
+        last = recordings[limit - 1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+    return items, next_cursor
+
+
+def page_etag(payload: dict) -> str:
+    """Weak ETag of a collection page, so unchanged pages revalidate with a 304."""
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def static_path(url: str, static_dir: Path) -> Optional[Path]:
+    """File behind a ``/static/...`` URL, or None if it points outside ``static_dir``."""
+    if not url or not url.startswith("/static/"):
+        return None
+    root = Path(static_dir).resolve()
+    path = (root / url[len("/static/"):]).resolve()
+    return path if path.is_relative_to(root) else None
@@ -0,0 +1,152 @@
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[Any], Any]  # called with an open SQLAlchemy session
+
+
+def insert(*objects) -> Job:
+    """Job adding ORM objects; resolves to the first object's primary key."""
+    def job(session):
+        session.add_all(objects)
+        session.flush()
+        return objects[0].id if objects else None
+    return job
+
+
+class DatabaseWriter:
+    """Background thread applying queued database writes in batched transactions.
+
+    Request handlers enqueue jobs (callables taking a session) and get a
+    ``Future`` for the job's result; they never wait on SQLite locks. The
+    writer takes up to ``DB_BATCH_SIZE`` queued jobs, waiting at most
+    ``DB_FLUSH_INTERVAL`` for more to arrive, and commits them in one
+    transaction. If a batch fails it is rolled back and replayed job by job,
+    so a single bad write only fails its own future.
+    """
+
+    def __init__(self, config, session_factory: Callable[[], Any]):
+        self.session_factory = session_factory
+        self.batch_size = config.get('DB_BATCH_SIZE', 100)
+        self.flush_interval = config.get('DB_FLUSH_INTERVAL', 0.05)
+        self._queue: "queue.Queue[Optional[Tuple[Job, Future]]]" = queue.Queue(
+            maxsize=config.get('DB_QUEUE_SIZE', 10000)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.jobs_written = 0
+        self.jobs_failed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_commit_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, job: Job) -> Future:
+        """Queue ``job``; the future resolves once its transaction has committed."""
+        if not self.running:
+            self.start()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def add(self, *objects) -> Future:
+        """Queue ORM objects for insertion; resolves to the first object's id."""
+        return self.submit(insert(*objects))
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Write everything still queued, then stop the thread."""
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _next_batch(self) -> Tuple[List[Tuple[Job, Future]], bool]:
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch, closing = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Tuple[Job, Future]]):
+        start = time.perf_counter()
+        session = self.session_factory()
+        try:
+            results = [job(session) for job, _ in batch]
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Batch of {len(batch)} writes failed ({e}); retrying one by one")
+            results = None
+        finally:
+            session.close()
+
+        if results is None:
+            for item in batch:
+                self._write_one(*item)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            self.jobs_written += len(batch)
+
+        self.batches += 1
+        self.last_batch_size = len(batch)
+        self.last_commit_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def _write_one(self, job: Job, future: Future):
+        session = self.session_factory()
+        try:
+            result = job(session)
+            session.commit()
+            future.set_result(result)
+            self.jobs_written += 1
+        except Exception as e:
+            session.rollback()
+            future.set_exception(e)
+            self.jobs_failed += 1
+            logger.error(f"Database write failed: {e}")
+        finally:
+            session.close()
+
+    def stats(self) -> dict:
+        return {
+            'running': self.running,
+            'queued': self._queue.qsize(),
+            'jobs_written': self.jobs_written,
+            'jobs_failed': self.jobs_failed,
+            'batches': self.batches,
+            'last_batch_size': self.last_batch_size,
+            'last_commit_ms': self.last_commit_ms
+        }
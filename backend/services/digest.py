@@ -0,0 +1,96 @@
+from pathlib import Path
+from typing import Optional, Sequence
+import hashlib
+import logging
+import threading
+import time
+import cv2
+import numpy as np
+from .capture_service import write_atomic
+from .notification_media import evict_lru
+from .thumbnail_cache import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+
+def contact_sheet(images: Sequence[np.ndarray], columns: int, gap: int = 4) -> np.ndarray:
+    """Tile BGR images row by row, ``columns`` to a row, on a white background.
+
+    Tiles take the first image's size. The sheet is allocated once and viewed
+    as a ``(row, y, column, x, channel)`` grid, so each tile is a single slice
+    copy into its cell; there is no intermediate stack of tiles to transpose.
+    """
+    if not images:
+        raise ValueError("A contact sheet needs at least one image")
+    columns = max(1, min(columns, len(images)))
+    rows = -(-len(images) // columns)
+    height, width = images[0].shape[:2]
+    sheet = np.full((rows * (height + gap), columns * (width + gap), 3), 255, dtype=np.uint8)
+    cells = sheet.reshape(rows, height + gap, columns, width + gap, 3)
+    for index, image in enumerate(images):
+        if image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        row, column = divmod(index, columns)
+        cells[row, :height, column, :width] = image
+    return sheet[:sheet.shape[0] - gap, :sheet.shape[1] - gap]
+
+
+class ContactSheets:
+    """Contact sheets of captures for digest emails, cached on disk.
+
+    Tiles come from the gallery's thumbnail cache, so captures already shown
+    in the collection are not decoded again. A sheet is named after the
+    content hashes of its captures, so a retried digest reuses it.
+    """
+
+    def __init__(self, config, cache_dir: Path, thumbnails: ThumbnailCache):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.thumbnails = thumbnails
+        self.columns = config.get('DIGEST_COLUMNS', 4)
+        self.quality = config.get('DIGEST_QUALITY', 85)
+        self.cache_bytes = config.get('EMAIL_MEDIA_CACHE_BYTES', 256 * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.reused = 0
+        self.last_build_ms = 0.0
+
+    def build(self, sources: Sequence[Path]) -> Optional[Path]:
+        """Sheet of the readable images among ``sources`` (blocking); None if there are none."""
+        tiles, etags = [], []
+        for source in sources:
+            try:
+                thumbnail, etag = self.thumbnails.get(Path(source))
+            except Exception as e:
+                logger.warning(f"Leaving {source} off the contact sheet: {e}")
+                continue
+            tiles.append(thumbnail)
+            etags.append(etag)
+        if not tiles:
+            return None
+
+        key = hashlib.sha256(f"{self.columns}:{':'.join(etags)}".encode()).hexdigest()[:32]
+        path = self.cache_dir / f"{key}.jpg"
+        if path.exists():
+            with self._lock:
+                self.reused += 1
+            return path
+
+        start = time.perf_counter()
+        sheet = contact_sheet([cv2.imread(str(tile)) for tile in tiles], self.columns)
+        ok, encoded = cv2.imencode('.jpg', sheet, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("Contact sheet encoding failed")
+        write_atomic(path, encoded, fsync=False)  # a lost sheet is simply rebuilt
+        evict_lru(self.cache_dir, self.cache_bytes)
+        with self._lock:
+            self.built += 1
+            self.last_build_ms = round((time.perf_counter() - start) * 1000, 1)
+        return path
+
+    def stats(self) -> dict:
+        return {
+            'built': self.built,
+            'reused': self.reused,
+            'last_build_ms': self.last_build_ms
+        }
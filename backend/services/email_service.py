@@ -1,21 +1,266 @@
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import EmailMessage
 from pathlib import Path
-import smtplib
-import os
-from typing import Optional
+from typing import Callable, List, Optional, Sequence, Union
+import asyncio
 import logging
+import mimetypes
+import smtplib
+import ssl
+import threading
+import time
+from .outbox import PermanentFailure
 
 logger = logging.getLogger(__name__)
 
+Attachment = Union[str, Sequence[str]]  # a path, or [path, filename]
+GREETING = "Thank you for using our Cymatics Visualization tool!"
+
+
+def compose_email(from_email: str, recipient: str, subject: Optional[str], body: str,
+                  attachments: Optional[List[Attachment]] = None) -> EmailMessage:
+    """Build a message; attachments get the MIME type of their extension."""
+    message = EmailMessage()
+    message['Subject'] = subject or ''
+    message['From'] = from_email
+    message['To'] = recipient
+    message.set_content(body or '')
+    for attachment in attachments or ():
+        path, filename = (attachment, None) if isinstance(attachment, str) else attachment
+        path = Path(path)
+        if not path.is_file():
+            logger.warning(f"Attachment {path} is missing; sending without it")
+            continue
+        mime_type, _ = mimetypes.guess_type(filename or path.name)
+        maintype, subtype = (mime_type or 'application/octet-stream').split('/', 1)
+        message.add_attachment(path.read_bytes(), maintype=maintype, subtype=subtype,
+                               filename=filename or path.name)
+    return message
+
+
+class _Connection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SmtpPool:
+    """Authenticated SMTP connections kept open and reused across messages.
+
+    Opening a connection costs a TCP connect, a STARTTLS handshake and a
+    login; a pooled connection sends the next message without any of them.
+    At most ``SMTP_POOL_SIZE`` connections are open at once. One idle for
+    more than ``SMTP_IDLE_TIMEOUT`` seconds is checked with NOOP before reuse,
+    and one that has sent ``SMTP_MAX_MESSAGES`` messages is retired, since
+    servers drop idle sessions and cap messages per session.
+    """
+
+    def __init__(self, config, smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        self.host = config['SMTP_SERVER']
+        self.port = config['SMTP_PORT']
+        self.username = config.get('SMTP_USERNAME')
+        self.password = config.get('SMTP_PASSWORD')
+        self.from_email = config.get('FROM_EMAIL') or config.get('SMTP_USERNAME')  # the account, if unset
+        self.use_tls = config.get('USE_TLS', True)
+        self.timeout = config.get('SMTP_TIMEOUT', 30)
+        self.size = config.get('SMTP_POOL_SIZE', 2)
+        self.idle_timeout = config.get('SMTP_IDLE_TIMEOUT', 30)
+        self.max_messages = config.get('SMTP_MAX_MESSAGES', 100)
+        self.smtp_factory = smtp_factory
+
+        self._idle: List[_Connection] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+
+        self.opened = 0
+        self.reused = 0
+        self.sent = 0
+        self.last_connect_ms = 0.0
+
+    def _open(self) -> _Connection:
+        start = time.perf_counter()
+        smtp = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            self._quit(smtp)
+            raise
+        with self._lock:
+            self.opened += 1
+            self.last_connect_ms = round((time.perf_counter() - start) * 1000, 1)
+        return _Connection(smtp)
+
+    @staticmethod
+    def _quit(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _checkout(self) -> _Connection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._open()
+            if time.monotonic() - connection.last_used > self.idle_timeout:
+                try:
+                    alive = connection.smtp.noop()[0] == 250
+                except Exception:
+                    alive = False
+                if not alive:
+                    connection.smtp.close()
+                    continue
+            with self._lock:
+                self.reused += 1
+            return connection
+
+    @contextmanager
+    def connection(self):
+        """A live, logged-in connection, returned to the pool unless the block failed."""
+        self._slots.acquire()
+        connection = None
+        try:
+            connection = self._checkout()
+            yield connection.smtp
+            connection.sent += 1
+            connection.last_used = time.monotonic()
+            if connection.sent < self.max_messages:
+                with self._lock:
+                    self._idle.append(connection)
+            else:
+                self._quit(connection.smtp)
+        except BaseException:
+            if connection is not None:
+                connection.smtp.close()  # session state is unknown after an error
+            raise
+        finally:
+            self._slots.release()
+
+    def send(self, message: EmailMessage):
+        """Send through a pooled connection (blocking).
+
+        Raises ``PermanentFailure`` for rejections retrying cannot fix.
+        """
+        for attempt in (1, 2):
+            try:
+                with self.connection() as smtp:
+                    smtp.send_message(message)
+                break
+            except smtplib.SMTPServerDisconnected:
+                if attempt == 2:
+                    raise  # otherwise the server had dropped a pooled connection; try a fresh one
+            except smtplib.SMTPRecipientsRefused as e:
+                raise PermanentFailure(f"Recipient refused: {e.recipients}") from e
+            except smtplib.SMTPAuthenticationError:
+                raise  # a configuration problem; retrying later can succeed
+            except smtplib.SMTPResponseException as e:
+                if 500 <= e.smtp_code < 600:
+                    raise PermanentFailure(f"{e.smtp_code} {e.smtp_error!r}") from e
+                raise
+        with self._lock:
+            self.sent += 1
+
+    def deliver(self, message: dict):
+        """Outbox transport: compose and send an ``OutboxMessage`` as email."""
+        self.send(compose_email(self.from_email, message['recipient'], message.get('subject'),
+                                message.get('body'), message.get('attachments')))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._quit(connection.smtp)
+
+    def stats(self) -> dict:
+        return {
+            'open': len(self._idle),
+            'opened': self.opened,
+            'reused': self.reused,
+            'sent': self.sent,
+            'last_connect_ms': self.last_connect_ms
+        }
+
+
 class EmailService:
-    def __init__(self, config):
-        self.smtp_server = config.get('SMTP_SERVER', 'smtp.gmail.com')
-        self.smtp_port = config.get('SMTP_PORT', 587)
-        self.smtp_username = config.get('SMTP_USERNAME')
-        self.smtp_password = config.get('SMTP_PASSWORD')
-        self.from_email = config.get('FROM_EMAIL')
+    """Recording emails, queued on the notification outbox when one is given.
+
+    Without an outbox, messages go straight to a pooled SMTP connection in a
+    worker thread. With a ``DIGEST_MINUTES`` window, recording emails wait on
+    the outbox's 'digest' channel for the recipient's later recordings.
+    """
+
+    def __init__(self, config, outbox=None, pool: Optional[SmtpPool] = None, media=None):
+        self.from_email = config.get('FROM_EMAIL') or config.get('SMTP_USERNAME')
+        self.outbox = outbox
+        self.media = media  # a NotificationMedia, for emails sent directly (the outbox transport has its own)
+        self.pool = pool or (SmtpPool(config) if outbox is None else None)
+        self.digest_window = config.get('DIGEST_MINUTES', 0) * 60
+
+    @staticmethod
+    def recording_details(frequency: float, notes: Optional[str] = None) -> str:
+        details = (
+            f"- Frequency: {frequency}Hz\n"
+            f"- Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        )
+        if notes:
+            details += f"\nNotes: {notes}"
+        return details
+
+    @classmethod
+    def recording_message(cls, frequency: float, notes: Optional[str] = None):
+        """Subject and body of a recording email."""
+        subject = f'Your Cymatics Recording at {frequency}Hz'
+        return subject, f"{GREETING}\n\nRecording Details:\n{cls.recording_details(frequency, notes)}"
+
+    def queue_recording(
+        self,
+        to_email: str,
+        frequency: float,
+        image_path: Optional[Attachment] = None,
+        video_path: Optional[Attachment] = None,
+        notes: Optional[str] = None
+    ) -> Future:
+        """Queue a recording email on the outbox (from any thread); resolves to the message id.
+
+        ``image_path`` and ``video_path`` are paths, or ``(path, filename)`` pairs.
+        Without an outbox there is nothing to queue on; use ``send_recording``.
+        """
+        if self.outbox is None:
+            raise RuntimeError("Recording emails can only be queued with an outbox; use send_recording")
+        subject, body = self.recording_message(frequency, notes)
+        attachments = [path if isinstance(path, str) else list(path)
+                       for path in (image_path, video_path) if path] or None
+        if self.digest_window and 'digest' in self.outbox.transports:
+            return self.outbox.enqueue('digest', to_email, self.recording_details(frequency, notes),
+                                       subject=subject, attachments=attachments, delay=self.digest_window)
+        return self.outbox.enqueue('email', to_email, body, subject=subject, attachments=attachments)
+
+    async def send(self, to_email: str, subject: str, body: str,
+                   attachments: Optional[List[Attachment]] = None) -> bool:
+        """Queue an email on the outbox, or send it right away without one."""
+        try:
+            if self.outbox is not None:
+                await asyncio.wrap_future(
+                    self.outbox.enqueue('email', to_email, body, subject=subject, attachments=attachments)
+                )
+                logger.info(f"Email to {to_email} queued")
+                return True
+
+            message = {'recipient': to_email, 'subject': subject, 'body': body, 'attachments': attachments}
+            await asyncio.to_thread(self._send_now, message)
+            logger.info(f"Email sent successfully to {to_email}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+            return False
 
     async def send_recording(
         self,
@@ -25,51 +270,24 @@ class EmailService:
         video_path: Optional[str] = None,
         notes: Optional[str] = None
     ):
+        if self.outbox is None:
+            subject, body = self.recording_message(frequency, notes)
+            return await self.send(to_email, subject, body,
+                                   [str(path) for path in (image_path, video_path) if path])
         try:
-            msg = MIMEMultipart()
-            msg['Subject'] = f'Your Cymatics Recording at {frequency}Hz'
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-
-            # Email body
-            body = f"""
-            Thank you for using our Cymatics Visualization tool!
-            
-            Recording Details:
-            - Frequency: {frequency}Hz
-            - Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
-            if notes:
-                body += f"\nNotes: {notes}"
-            
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Attach image if available
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-Disposition', 'attachment', 
-                                 filename=os.path.basename(image_path))
-                    msg.attach(img)
-
-            # Attach video if available
-            if video_path and os.path.exists(video_path):
-                with open(video_path, 'rb') as f:
-                    video_data = f.read()
-                    video_attachment = MIMEImage(video_data)
-                    video_attachment.add_header('Content-Disposition', 'attachment', 
-                                             filename=os.path.basename(video_path))
-                    msg.attach(video_attachment)
-
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
-
-            logger.info(f"Email sent successfully to {to_email}")
+            await asyncio.wrap_future(self.queue_recording(to_email, frequency, image_path, video_path, notes))
+            logger.info(f"Email to {to_email} queued")
             return True
-
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def _send_now(self, message: dict):
+        if self.media is not None:
+            message = self.media.prepare(message)
+        self.pool.send(compose_email(self.from_email, message['recipient'], message['subject'],
+                                     message['body'], message['attachments']))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
@@ -0,0 +1,152 @@
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import heapq
+import logging
+import threading
+from sqlalchemy import distinct, select
+from ..database.models import Recording
+
+logger = logging.getLogger(__name__)
+
+
+class FrequencyCoverage:
+    """Sorted set of tested frequencies over the audible range, with a gap heap.
+
+    Frequencies are quantized to ``COVERAGE_RESOLUTION`` Hz bins between
+    ``MIN_FREQUENCY`` and ``MAX_FREQUENCY``, so the structure never holds more
+    than one entry per bin however many recordings exist. ``used()`` walks the
+    sorted bins (O(k)); untested gaps sit in a max-heap keyed by width, so
+    ``suggest()`` is O(log n) amortized. A gap split by a new frequency stays
+    in the heap and is discarded lazily when it surfaces.
+    """
+
+    def __init__(self, config):
+        self.min_frequency = config['MIN_FREQUENCY']
+        self.max_frequency = config['MAX_FREQUENCY']
+        self.resolution = config.get('COVERAGE_RESOLUTION', 0.1)
+        self.n_bins = int(round((self.max_frequency - self.min_frequency) / self.resolution))
+        self._decimals = max(0, len(f"{self.resolution:g}".partition('.')[2]))
+
+        self._bins: List[int] = []  # sorted used bins
+        self._gap_end: Dict[int, int] = {}  # gap start bin -> end bin, for current gaps only
+        self._heap: List[Tuple[int, int, int]] = []  # (-width, start, end)
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._reset_gaps()
+
+    def _reset_gaps(self):
+        # Gaps are open intervals between used bins; the range edges act as
+        # virtual bins -1 and n_bins + 1
+        self._gap_end.clear()
+        self._heap = []
+        edges = [-1, *self._bins, self.n_bins + 1]
+        for start, end in zip(edges, edges[1:]):
+            self._push_gap(start, end)
+        heapq.heapify(self._heap)
+
+    def _push_gap(self, start: int, end: int):
+        if end - start > 1:
+            self._gap_end[start] = end
+            heapq.heappush(self._heap, (start - end, start, end))
+
+    def _bin(self, frequency: float) -> Optional[int]:
+        index = int(round((frequency - self.min_frequency) / self.resolution))
+        return index if 0 <= index <= self.n_bins else None
+
+    def _frequency(self, index: float) -> float:
+        return round(self.min_frequency + index * self.resolution, self._decimals)
+
+    def load(self, frequencies: Iterable[float]):
+        """Replace the contents with ``frequencies`` (any order, duplicates allowed)."""
+        bins = {self._bin(f) for f in frequencies if f is not None}
+        bins.discard(None)
+        with self._lock:
+            self._bins = sorted(bins)
+            self._reset_gaps()
+            self.loaded = True
+        logger.info(f"Frequency coverage loaded: {len(self._bins)} tested bins")
+
+    # Distinct tested frequencies: an index-only scan of recordings.frequency
+    QUERY = select(distinct(Recording.frequency)).where(Recording.frequency.isnot(None))
+
+    def load_from_db(self, session_factory: Callable):
+        """Load distinct recording frequencies through a synchronous session."""
+        db = session_factory()
+        try:
+            frequencies = db.execute(self.QUERY).scalars().all()
+        finally:
+            db.close()
+        self.load(frequencies)
+
+    async def load_from_async_db(self, session_factory: Callable):
+        """Load distinct recording frequencies through an ``AsyncSession``."""
+        async with session_factory() as db:
+            frequencies = (await db.execute(self.QUERY)).scalars().all()
+        self.load(frequencies)
+
+    def add(self, frequency: Optional[float]) -> bool:
+        """Mark ``frequency`` as tested; returns whether its bin was new."""
+        if frequency is None:
+            return False
+        index = self._bin(frequency)
+        if index is None:
+            return False
+        with self._lock:
+            position = bisect_left(self._bins, index)
+            if position < len(self._bins) and self._bins[position] == index:
+                return False
+            start = self._bins[position - 1] if position > 0 else -1
+            end = self._bins[position] if position < len(self._bins) else self.n_bins + 1
+            insort(self._bins, index)
+            # Split the gap; the old heap entry goes stale
+            self._gap_end.pop(start, None)
+            self._push_gap(start, index)
+            self._push_gap(index, end)
+            if len(self._heap) > 4 * len(self._gap_end) + 64:
+                # Mostly stale entries: rebuild from the live gaps
+                self._heap = [(s - e, s, e) for s, e in self._gap_end.items()]
+                heapq.heapify(self._heap)
+            return True
+
+    def used(self) -> List[float]:
+        """Tested frequencies in ascending order."""
+        with self._lock:
+            return [self._frequency(index) for index in self._bins]
+
+    def is_used(self, frequency: float) -> bool:
+        index = self._bin(frequency)
+        if index is None:
+            return False
+        with self._lock:
+            position = bisect_left(self._bins, index)
+            return position < len(self._bins) and self._bins[position] == index
+
+    def largest_gap(self) -> Optional[Tuple[float, float]]:
+        """Lowest and highest untested frequency of the widest untested range."""
+        with self._lock:
+            while self._heap:
+                _, start, end = self._heap[0]
+                if self._gap_end.get(start) == end:
+                    return self._frequency(start + 1), self._frequency(end - 1)
+                heapq.heappop(self._heap)  # stale: split since it was pushed
+            return None
+
+    def suggest(self) -> Optional[float]:
+        """Centre of the widest untested range, or None when every bin is covered."""
+        gap = self.largest_gap()
+        if gap is None:
+            return None
+        low, high = gap
+        return self._frequency(round((self._bin(low) + self._bin(high)) / 2))
+
+    def stats(self) -> dict:
+        gap = self.largest_gap()
+        return {
+            'loaded': self.loaded,
+            'resolution': self.resolution,
+            'tested_bins': len(self._bins),
+            'total_bins': self.n_bins + 1,
+            'coverage': round(len(self._bins) / (self.n_bins + 1), 6),
+            'largest_gap': gap,
+            'heap_entries': len(self._heap)
+        }
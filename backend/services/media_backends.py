@@ -0,0 +1,145 @@
+from typing import Callable, Optional
+import logging
+import time
+import wave
+import cv2
+import numpy as np
+from .audio_stream import PygameSink
+from .camera_service import open_camera
+
+logger = logging.getLogger(__name__)
+
+FrequencySource = Callable[[], Optional[float]]
+
+
+class SyntheticCamera:
+    """Stand-in for ``cv2.VideoCapture`` rendering animated Chladni-like figures.
+
+    The mode numbers follow the current frequency, so patterns change when a
+    tone or sweep changes. Frames are paced at ``CAMERA_CONFIG['FPS']`` like a
+    real device and are rendered straight into the caller's buffer.
+    """
+
+    def __init__(self, config, frequency_source: Optional[FrequencySource] = None):
+        self.width = config['FRAME_WIDTH']
+        self.height = config['FRAME_HEIGHT']
+        self.interval = 1.0 / config['FPS']
+        self.frequency_source = frequency_source or (lambda: None)
+        self._x = np.linspace(-1, 1, self.width, dtype=np.float32) * np.pi
+        self._y = np.linspace(-1, 1, self.height, dtype=np.float32) * np.pi
+        self._gray = np.empty((self.height, self.width), dtype=np.uint8)
+        self._next_frame = time.perf_counter()
+        self._start = self._next_frame
+        self._opened = True
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def set(self, prop, value) -> bool:
+        return False
+
+    def release(self):
+        self._opened = False
+
+    def read(self, image: Optional[np.ndarray] = None):
+        # Pace like a real camera
+        delay = self._next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_frame = max(self._next_frame + self.interval, time.perf_counter())
+
+        frequency = self.frequency_source() or 0.0
+        t = time.perf_counter() - self._start
+        self.render(frequency, t, out=self._gray)
+        if image is None or image.shape != (self.height, self.width, 3):
+            image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        cv2.cvtColor(self._gray, cv2.COLOR_GRAY2BGR, dst=image)
+        return True, image
+
+    def render(self, frequency: float, t: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render sand on the nodal lines of a square plate mode for ``frequency``."""
+        if out is None:
+            out = np.empty((self.height, self.width), dtype=np.uint8)
+        if frequency <= 0:
+            out.fill(24)
+            return out
+
+        # Higher frequencies excite higher (n, m) modes
+        n = 1.0 + np.sqrt(frequency) / 4.0
+        m = n + 1.0 + 0.5 * np.sin(frequency / 50.0)
+        wobble = 0.03 * np.sin(2 * np.pi * 0.5 * t)
+
+        # Separable terms: cos(n x) cos(m y) - cos(m x) cos(n y) as two outer products
+        pattern = np.outer(np.cos(m * self._y), np.cos(n * self._x + wobble))
+        pattern -= np.outer(np.cos(n * self._y), np.cos(m * self._x - wobble))
+        np.abs(pattern, out=pattern)
+
+        # Nodal lines within the (slowly breathing) sand width are bright
+        width = 0.12 + 0.04 * np.sin(2 * np.pi * 0.25 * t)
+        out.fill(24)
+        out[pattern < width] = 220
+        return out
+
+
+class NullSink:
+    """Discards audio blocks, pacing writes in real time like a sound card."""
+
+    def __init__(self, config):
+        self.block_seconds = config['BUFFER'] / config['SAMPLE_RATE']
+        self._deadline = time.perf_counter()
+        self.blocks_written = 0
+
+    def write(self, block: np.ndarray):
+        self._deadline = max(self._deadline + self.block_seconds, time.perf_counter())
+        delay = self._deadline - time.perf_counter() - self.block_seconds
+        if delay > 0:
+            time.sleep(delay)
+        self.blocks_written += 1
+
+    def close(self):
+        pass
+
+
+class WavFileSink(NullSink):
+    """Records the stream to ``AUDIO_CONFIG['WAV_PATH']`` at real-time pace."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.path = str(config['WAV_PATH'])
+        self._file = wave.open(self.path, 'wb')
+        self._file.setnchannels(config['CHANNELS'])
+        self._file.setsampwidth(2)
+        self._file.setframerate(config['SAMPLE_RATE'])
+
+    def write(self, block: np.ndarray):
+        self._file.writeframes(block.tobytes())
+        super().write(block)
+
+    def close(self):
+        self._file.close()
+        logger.info(f"Audio written to {self.path}")
+
+
+AUDIO_SINKS = {
+    'pygame': PygameSink,
+    'null': NullSink,
+    'wav': WavFileSink,
+}
+
+
+def audio_sink_factory(config) -> Callable[[dict], object]:
+    """Sink class for ``AUDIO_CONFIG['SINK']``."""
+    sink = config.get('SINK', 'pygame')
+    if sink not in AUDIO_SINKS:
+        raise ValueError(f"Unknown audio sink: {sink}")
+    return AUDIO_SINKS[sink]
+
+
+def camera_factory(config, frequency_source: Optional[FrequencySource] = None) -> Callable[[dict], object]:
+    """Capture factory for ``CAMERA_CONFIG['SOURCE']`` ('device' or 'synthetic')."""
+    source = config.get('SOURCE', 'device')
+    if source == 'synthetic':
+        return lambda cfg: SyntheticCamera(cfg, frequency_source)
+    if source == 'device':
+        return open_camera
+    raise ValueError(f"Unknown camera source: {source}")
@@ -1,24 +1,117 @@
 from pathlib import Path
-import pygame
 import numpy as np
 import cv2
+import asyncio
 import logging
+import threading
+import time
+from typing import Optional
+from .camera_service import CameraReader
 
 logger = logging.getLogger(__name__)
 
 class MediaService:
-    def __init__(self, config):
+    """Owns the audio mixer and the camera.
+
+    Nothing is opened on construction: each device opens on first use via
+    ``ensure_audio``/``ensure_camera``, or concurrently in the background via
+    ``start``. A device that failed to open is retried at most once every
+    ``DEVICE_RETRY_SECONDS``.
+    """
+
+    def __init__(self, config, camera_reader: Optional[CameraReader] = None):
         self.config = config
         self.camera = None
+        self.frames = camera_reader  # shared with the API so only one reader owns the device
+        self.audio_initialized = False
+        self.current_session = None
+        self.retry_seconds = config.get('DEVICE_RETRY_SECONDS', 30)
+
+        # Per-device state: pending -> ready | failed
+        self.status = {'audio': 'pending', 'camera': 'pending'}
+        self.open_ms = {'audio': None, 'camera': None}
+        self._failed_at = {'audio': 0.0, 'camera': 0.0}
+        self._locks = {'audio': threading.Lock(), 'camera': threading.Lock()}
+
+    @property
+    def ready(self) -> bool:
+        return all(status == 'ready' for status in self.status.values())
+
+    def readiness(self) -> dict:
+        return {
+            name: {'status': self.status[name], 'open_ms': self.open_ms[name]}
+            for name in self.status
+        }
+
+    def _open(self, name: str, opener) -> bool:
+        """Run ``opener`` once under the device lock; concurrent callers wait for it."""
+        if self.status[name] == 'ready':
+            return True
+        with self._locks[name]:
+            if self.status[name] == 'ready':
+                return True
+            if self.status[name] == 'failed' and \
+                    time.monotonic() - self._failed_at[name] < self.retry_seconds:
+                return False
+            start = time.perf_counter()
+            ok = opener()
+            self.open_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            if ok:
+                self.status[name] = 'ready'
+            else:
+                self.status[name] = 'failed'
+                self._failed_at[name] = time.monotonic()
+            return ok
+
+    def ensure_audio(self) -> bool:
+        """Open the audio system on first use (blocking, idempotent)"""
+        return self._open('audio', self._init_audio)
+
+    def ensure_camera(self) -> bool:
+        """Open the camera on first use (blocking, idempotent)"""
+        return self._open('camera', self._init_camera)
+
+    async def start(self):
+        """Open both devices concurrently without blocking the event loop"""
+        await asyncio.gather(
+            asyncio.to_thread(self.ensure_audio),
+            asyncio.to_thread(self.ensure_camera)
+        )
+        logger.info(f"Media devices: {self.readiness()}")
+
+    def close(self):
+        """Release the camera and shut the mixer down"""
+        if self.frames is not None:
+            self.frames.stop()
+        self.camera = None
+        if self.status['audio'] == 'ready' and self.config.get('SINK', 'pygame') == 'pygame':
+            import pygame
+            pygame.mixer.quit()
         self.audio_initialized = False
+        self.status = {'audio': 'pending', 'camera': 'pending'}
 
-        # Initialize systems
-        self._init_audio()
-        self._init_camera()
+    def make_sound(self, samples: np.ndarray):
+        """Build a pygame Sound, opening the mixer if needed"""
+        import pygame
+        self.ensure_audio()
+        return pygame.sndarray.make_sound(samples)
 
-    def _init_audio(self):
+    def stop_sounds(self):
+        """Stop every looped Sound, if the mixer was ever opened"""
+        if self.status['audio'] == 'ready' and self.config.get('SINK', 'pygame') == 'pygame':
+            import pygame
+            pygame.mixer.stop()
+
+    def _init_audio(self) -> bool:
         """Initialize the audio system"""
+        if self.config.get('SINK', 'pygame') != 'pygame':
+            # Headless sinks need no mixer
+            logger.info(f"Audio sink: {self.config['SINK']}")
+            self.audio_initialized = True
+            return True
         try:
+            # Imported here so importing the app never pays for pygame
+            import pygame
             pygame.mixer.quit()  # Clean up any existing mixer
             pygame.mixer.init(
                 frequency=self.config['SAMPLE_RATE'],
@@ -31,21 +124,16 @@ class MediaService:
         except Exception as e:
             logger.error(f"Failed to initialize audio: {e}")
             self.audio_initialized = False
+        return self.audio_initialized
 
-    def _init_camera(self):
-        """Initialize the camera system"""
-        try:
-            self.camera = cv2.VideoCapture(self.config['DEVICE_ID'])
-            if not self.camera.isOpened():
-                raise Exception("Could not open camera")
-            
-            self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, self.config['FRAME_WIDTH'])
-            self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config['FRAME_HEIGHT'])
-            self.camera.set(cv2.CAP_PROP_FPS, self.config['FPS'])
-            
-            logger.info("Camera initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize camera: {e}")
+    def _init_camera(self) -> bool:
+        """Attach to the shared camera reader, opening the device if nobody has yet"""
+        if self.frames is None:
+            self.frames = CameraReader(self.config)
+        if self.frames.start():
+            self.camera = self.frames.camera
+        else:
             self.camera = None
+        return self.camera is not None
 
-    # ... rest of the class implementation remains the same ...
\ No newline at end of file
+    # ... rest of the class implementation remains the same ...
@@ -0,0 +1,200 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import cv2
+from .thumbnail_cache import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+
+def evict_lru(directory: Path, max_bytes: int):
+    """Delete the least recently modified files in ``directory`` beyond ``max_bytes`` (keeps the newest)."""
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.startswith("."):
+            stat = entry.stat()
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+    total = sum(size for _, _, size in files)
+    for _, path, size in sorted(files)[:-1]:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+class NotificationMedia:
+    """Size-capped email renditions of captures, built once and shared by every recipient.
+
+    A small capture is attached as it is. A larger still is attached as a
+    JPEG at most ``EMAIL_IMAGE_WIDTH`` wide and a video as a short MP4 clip
+    (its first ``EMAIL_CLIP_SECONDS`` seconds, at most ``EMAIL_CLIP_WIDTH``
+    wide); the renditions are cached on disk, so a capture sent to many
+    recipients is only decoded once. Attachments of one message share a
+    budget of ``EMAIL_ATTACHMENT_BYTES`` (never more than ``MAX_FILE_SIZE``);
+    an original that is not attached is offered as a link under
+    ``PUBLIC_URL`` instead.
+    """
+
+    def __init__(self, config, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = min(config.get('EMAIL_ATTACHMENT_BYTES', 10 * 1024 * 1024), config['MAX_FILE_SIZE'])
+        self.inline_bytes = config.get('EMAIL_INLINE_BYTES', 512 * 1024)
+        self.clip_seconds = config.get('EMAIL_CLIP_SECONDS', 5)
+        self.clip_width = config.get('EMAIL_CLIP_WIDTH', 640)
+        self.codec = config.get('VIDEO_CODEC', 'mp4v')
+        self.cache_bytes = config.get('EMAIL_MEDIA_CACHE_BYTES', 256 * 1024 * 1024)
+        self.public_url = (config.get('PUBLIC_URL') or '').rstrip('/')
+
+        # Stills reuse the thumbnail cache, at email size
+        self.images = ThumbnailCache({
+            'THUMBNAIL_WIDTH': config.get('EMAIL_IMAGE_WIDTH', 1280),
+            'THUMBNAIL_QUALITY': config.get('EMAIL_IMAGE_QUALITY', 85),
+            'THUMBNAIL_CACHE_BYTES': self.cache_bytes
+        }, self.cache_dir / "images")
+        self.clip_dir = self.cache_dir / "clips"
+        self.clip_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._building: Dict[str, threading.Lock] = {}  # one build per source at a time
+        self.originals = 0
+        self.renditions = 0
+        self.clips_built = 0
+        self.links = 0
+
+    @contextmanager
+    def _build_lock(self, key: str):
+        with self._lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        with lock:
+            yield
+        with self._lock:
+            if not lock.locked():
+                self._building.pop(key, None)
+
+    def prepare(self, message: dict) -> dict:
+        """Outbox message with its attachments swapped for email renditions (blocking).
+
+        Originals that are not attached are listed as links at the end of the body.
+        """
+        attachments: List[list] = []
+        linked: List[str] = []
+        budget = self.max_bytes
+        for attachment in message.get('attachments') or ():
+            path, filename = (attachment, None) if isinstance(attachment, str) else attachment
+            path = Path(path)
+            filename = filename or path.name
+            if not path.is_file():
+                attachments.append([str(path), filename])  # compose_email logs and skips it
+                continue
+            rendition = self.rendition(path, filename)
+            size = rendition[0].stat().st_size if rendition is not None else 0
+            if rendition is not None and size <= budget:
+                budget -= size
+                attachments.append([str(rendition[0]), rendition[1]])
+                if rendition[0] == path:
+                    continue  # the original itself
+            linked.append(filename)
+            with self._lock:
+                self.links += 1
+
+        body = message.get('body') or ''
+        if linked:
+            body += "\n\nFull-resolution files:\n" + "\n".join(f"- {self.link(name)}" for name in linked)
+        return {**message, 'body': body, 'attachments': attachments}
+
+    def link(self, filename: str) -> str:
+        """Public URL of a capture file, or a note when ``PUBLIC_URL`` is not configured."""
+        if self.public_url:
+            return f"{self.public_url}/static/captures/{quote(filename)}"
+        return f"{filename} (too large to attach; ask us for a copy)"
+
+    def rendition(self, path: Path, filename: str) -> Optional[Tuple[Path, str]]:
+        """File to attach for ``path`` and its name; None if only a link can be offered."""
+        mime_type, _ = mimetypes.guess_type(filename)
+        kind = (mime_type or '').split('/', 1)[0]
+        if path.stat().st_size <= self.inline_bytes and kind != 'video':
+            with self._lock:
+                self.originals += 1
+            return path, filename
+        try:
+            if kind == 'image':
+                with self._build_lock(str(path)):
+                    rendered, _ = self.images.get(path)
+                result = rendered, f"{Path(filename).stem}.jpg"
+            elif kind == 'video':
+                result = self._clip(path), f"{Path(filename).stem}_clip.mp4"
+            else:
+                return None
+        except Exception as e:
+            logger.warning(f"No email rendition of {filename}: {e}")
+            return None
+        with self._lock:
+            self.renditions += 1
+        return result
+
+    def _clip(self, source: Path) -> Path:
+        stat = source.stat()
+        key = hashlib.sha256(f"{source}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:32]
+        path = self.clip_dir / f"{key}_{self.clip_seconds}s_w{self.clip_width}.mp4"
+        with self._build_lock(key):
+            if path.exists():
+                os.utime(path)  # most recently used
+                return path
+            self._encode_clip(source, path)
+            with self._lock:
+                self.clips_built += 1
+        evict_lru(self.clip_dir, self.cache_bytes)
+        return path
+
+    def _encode_clip(self, source: Path, path: Path):
+        """Write the first ``EMAIL_CLIP_SECONDS`` of ``source``, downscaled, to ``path``."""
+        video = cv2.VideoCapture(str(source))
+        if not video.isOpened():
+            raise ValueError("Not a readable video")
+        fps = video.get(cv2.CAP_PROP_FPS) or 30.0
+        temp_path = path.with_name(f".{path.stem}.tmp{path.suffix}")
+        writer = None
+        frames = 0
+        try:
+            while frames < int(fps * self.clip_seconds):
+                ok, frame = video.read()
+                if not ok:
+                    break
+                height, width = frame.shape[:2]
+                if width > self.clip_width:
+                    size = (self.clip_width, max(2, round(height * self.clip_width / width / 2) * 2))
+                    frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                if writer is None:
+                    writer = cv2.VideoWriter(str(temp_path), cv2.VideoWriter_fourcc(*self.codec),
+                                             fps, (frame.shape[1], frame.shape[0]))
+                    if not writer.isOpened():
+                        raise RuntimeError(f"Could not open video writer for codec {self.codec}")
+                writer.write(frame)
+                frames += 1
+        finally:
+            video.release()
+            if writer is not None:
+                writer.release()
+        if not frames:
+            temp_path.unlink(missing_ok=True)
+            raise ValueError("Video has no readable frames")
+        os.replace(temp_path, path)
+
+    def stats(self) -> dict:
+        return {
+            'max_bytes': self.max_bytes,
+            'originals': self.originals,
+            'renditions': self.renditions,
+            'clips_built': self.clips_built,
+            'links': self.links,
+            'images': self.images.stats()
+        }
@@ -1,93 +1,119 @@
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
+from concurrent.futures import Future
 from pathlib import Path
-import smtplib
-from twilio.rest import Client
-from twilio.base.exceptions import TwilioRestException
+from typing import List, Optional
+import asyncio
 import logging
-from datetime import datetime
+import mimetypes
+from .digest import ContactSheets
+from .email_service import GREETING, EmailService, SmtpPool
+from .notification_media import NotificationMedia
+from .sms_service import SmsDispatcher, create_sms_dispatcher
 
 logger = logging.getLogger(__name__)
 
 class NotificationService:
-    def __init__(self, email_config, twilio_config):
+    def __init__(self, email_config, twilio_config, outbox=None, smtp_pool: SmtpPool = None,
+                 sms: Optional[SmsDispatcher] = None, media: Optional[NotificationMedia] = None,
+                 contact_sheets: Optional[ContactSheets] = None):
         self.email_config = email_config
         self.twilio_config = twilio_config
-        
-        # Initialize Twilio client if enabled
-        self.twilio_client = None
-        if (twilio_config['ENABLED'] and 
-            twilio_config['ACCOUNT_SID'] and 
-            twilio_config['AUTH_TOKEN']):
-            try:
-                self.twilio_client = Client(
-                    twilio_config['ACCOUNT_SID'],
-                    twilio_config['AUTH_TOKEN']
-                )
-                logger.info("Twilio client initialized successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize Twilio client: {e}")
+        self.contact_sheets = contact_sheets
 
-    async def send_email(self, to_email: str, subject: str, body: str, image_path: str = None) -> bool:
-        """Send an email with optional image attachment."""
-        try:
-            msg = MIMEMultipart()
-            msg['Subject'] = subject
-            msg['From'] = self.email_config['FROM_EMAIL']
-            msg['To'] = to_email
-
-            # Add body
-            msg.attach(MIMEText(body, 'plain'))
-
-            # Add image if provided
-            if image_path and Path(image_path).exists():
-                with open(image_path, 'rb') as f:
-                    img = MIMEImage(f.read())
-                    img.add_header('Content-Disposition', 'attachment', 
-                                 filename=Path(image_path).name)
-                    msg.attach(img)
-
-            # Send email
-            with smtplib.SMTP(self.email_config['SMTP_SERVER'], 
-                            self.email_config['SMTP_PORT']) as server:
-                if self.email_config['USE_TLS']:
-                    server.starttls()
-                server.login(
-                    self.email_config['SMTP_USERNAME'],
-                    self.email_config['SMTP_PASSWORD']
-                )
-                server.send_message(msg)
-
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
+        # Messages go through the outbox when one is given, otherwise straight to
+        # a pooled SMTP connection or the rate-limited SMS dispatcher
+        self.outbox = outbox
+        self.email = EmailService(email_config, outbox=outbox, pool=smtp_pool, media=media)
+        self.sms = sms if sms is not None else create_sms_dispatcher(twilio_config)
 
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
-            return False
+    @property
+    def sms_enabled(self) -> bool:
+        return bool(self.twilio_config['ENABLED']) and (
+            self.sms is not None or (self.outbox is not None and 'sms' in self.outbox.transports)
+        )
+
+    async def send_email(self, to_email: str, subject: str, body: str, image_path: str = None) -> bool:
+        """Send an email with optional image attachment (queued when there is an outbox)."""
+        attachments = [image_path] if image_path and Path(image_path).exists() else []
+        return await self.email.send(to_email, subject, body, attachments)
 
     async def send_sms(self, to_number: str, message: str) -> bool:
-        """Send an SMS message."""
-        if not self.twilio_client or not self.twilio_config['ENABLED']:
+        """Send an SMS message (queued when there is an outbox); never blocks the event loop."""
+        if not self.sms_enabled:
             logger.warning("Twilio is not configured or disabled")
             return False
 
         try:
-            message = self.twilio_client.messages.create(
-                body=message,
-                from_=self.twilio_config['FROM_NUMBER'],
-                to=to_number
-            )
-            logger.info(f"SMS sent successfully to {to_number}")
+            if self.outbox is not None and 'sms' in self.outbox.transports:
+                await asyncio.wrap_future(self.outbox.enqueue('sms', to_number, message))
+                logger.info(f"SMS to {to_number} queued")
+            else:
+                await asyncio.wrap_future(self.sms.submit(to_number, message))
             return True
-            
-        except TwilioRestException as e:
-            logger.error(f"Twilio error: {e}")
-            return False
+
         except Exception as e:
             logger.error(f"Failed to send SMS: {e}")
             return False
 
+    def digest_message(self, message: dict) -> dict:
+        """Outbox 'digest' transport: one email for a recipient's coalesced recordings (blocking).
+
+        Each part's body holds its recording details. Several recordings get a
+        contact sheet of their images, attached ahead of the images themselves.
+        """
+        parts = message.get('parts') or [message]
+        if len(parts) == 1:
+            return {**parts[0], 'recipient': message['recipient'],
+                    'body': f"{GREETING}\n\nRecording Details:\n{parts[0]['body']}"}
+
+        body = f"{GREETING}\n\nYou captured {len(parts)} patterns"
+        attachments = [attachment for part in parts for attachment in part['attachments'] or ()]
+        sheet = None
+        if attachments and self.contact_sheets is not None:
+            files = [(attachment, attachment) if isinstance(attachment, str) else attachment
+                     for attachment in attachments]
+            sources = [path for path, filename in files
+                       if (mimetypes.guess_type(filename)[0] or '').startswith('image/')]
+            sheet = self.contact_sheets.build(sources) if sources else None
+        if sheet is not None:
+            attachments.insert(0, [str(sheet), "contact_sheet.jpg"])
+            body += "; the contact sheet shows them in order"
+        body += ".\n\n" + "\n".join(f"Recording {number}:\n{part['body']}"
+                                    for number, part in enumerate(parts, 1))
+        return {'recipient': message['recipient'], 'subject': f'Your {len(parts)} Cymatics Recordings',
+                'body': body, 'attachments': attachments}
+
+    @staticmethod
+    def recording_sms(frequency: float, to_email: str = None) -> str:
+        return (
+            f"Your cymatics recording at {frequency}Hz is ready! "
+            f"Check your email at {to_email}" if to_email else
+            f"Your cymatics recording at {frequency}Hz has been captured!"
+        )
+
+    def queue_recording(
+        self,
+        to_email: str,
+        frequency: float,
+        image_path=None,
+        notes: str = None,
+        phone_number: str = None,
+        video_path=None
+    ) -> List[Future]:
+        """Queue the email and SMS for a recording on the outbox (from any thread).
+
+        The messages are separate outbox rows, so they are delivered
+        concurrently; see ``EmailService.queue_recording`` for the email.
+        Without an outbox, use ``send_cymatics_recording``.
+        """
+        if self.outbox is None:
+            raise RuntimeError("Recordings can only be queued with an outbox; use send_cymatics_recording")
+        futures = []
+        if to_email:
+            futures.append(self.email.queue_recording(to_email, frequency, image_path, video_path, notes))
+        if phone_number and self.twilio_config['ENABLED'] and 'sms' in self.outbox.transports:
+            futures.append(self.outbox.enqueue('sms', phone_number, self.recording_sms(frequency, to_email)))
+        return futures
+
     async def send_cymatics_recording(
         self,
         to_email: str,
@@ -96,38 +122,21 @@ class NotificationService:
         notes: str = None,
         phone_number: str = None
     ) -> bool:
-        """Send cymatics recording notification via email and optionally SMS."""
-        success = True
-        
-        # Prepare and send email
+        """Send cymatics recording notification via email and optionally SMS, concurrently."""
+        sends = []
         if to_email:
-            subject = f'Your Cymatics Recording at {frequency}Hz'
-            body = (
-                f"Thank you for using our Cymatics Visualization tool!\n\n"
-                f"Recording Details:\n"
-                f"- Frequency: {frequency}Hz\n"
-                f"- Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            )
-            
-            if notes:
-                body += f"\nNotes: {notes}"
-
-            email_success = await self.send_email(
-                to_email=to_email,
-                subject=subject,
-                body=body,
-                image_path=image_path
-            )
-            success = success and email_success
+            subject, body = self.email.recording_message(frequency, notes)
+            sends.append(self.send_email(to_email=to_email, subject=subject, body=body, image_path=image_path))
 
         # Send SMS if phone number provided
         if phone_number and self.twilio_config['ENABLED']:
-            sms_message = (
-                f"Your cymatics recording at {frequency}Hz is ready! "
-                f"Check your email at {to_email}" if to_email else
-                f"Your cymatics recording at {frequency}Hz has been captured!"
-            )
-            sms_success = await self.send_sms(phone_number, sms_message)
-            success = success and sms_success
-
-        return success
\ No newline at end of file
+            sends.append(self.send_sms(phone_number, self.recording_sms(frequency, to_email)))
+
+        results = await asyncio.gather(*sends)
+        return all(results)
+
+    def close(self):
+        """Stop the SMS dispatcher and close pooled SMTP connections."""
+        if self.sms is not None:
+            self.sms.close()
+        self.email.close()
@@ -0,0 +1,254 @@
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Sequence, Set
+import logging
+import random
+import threading
+import time
+from sqlalchemy import func, select, update
+from ..database.models import OutboxMessage
+from .db_writer import Job, insert
+
+logger = logging.getLogger(__name__)
+
+# Delivers one message, raising on failure; or returns a Future for a delivery still in progress
+Transport = Callable[[dict], Optional[Future]]
+
+
+class PermanentFailure(Exception):
+    """Delivery error that retrying cannot fix (a refused recipient, a rejected message)."""
+
+
+class Outbox:
+    """Durable queue of outgoing notifications, delivered off the request path.
+
+    ``enqueue`` only queues an ``OutboxMessage`` row on the database writer,
+    so a request never waits on a mail server. A dispatcher thread polls for
+    pending rows that are due (woken early when one is added), claims up to
+    ``BATCH_SIZE`` of them and hands them to ``WORKERS`` sender threads, which
+    call the transport registered for the row's channel. A failed delivery is
+    retried with jittered exponential backoff, ``RETRY_BASE`` seconds doubling
+    up to ``RETRY_MAX``, until ``MAX_ATTEMPTS``; a ``PermanentFailure`` fails
+    the message at once. Rows outlive the process, so messages queued before
+    a restart are sent after it.
+
+    On a ``coalesce`` channel, a due row is delivered together with the
+    recipient's other pending rows on that channel, due or not, as one message
+    whose ``parts`` are the rows. Queued with a ``delay``, the first row opens
+    a window that later rows join.
+    """
+
+    def __init__(self, config, session_factory: Callable, submit: Callable[[Job], Future],
+                 transports: Dict[str, Transport], coalesce: Sequence[str] = ()):
+        self.session_factory = session_factory
+        self.submit = submit
+        self.transports = dict(transports)
+        self.coalesce = set(coalesce)
+        self.workers = config.get('WORKERS', 2)
+        self.batch_size = config.get('BATCH_SIZE', 20)
+        self.poll_interval = config.get('POLL_INTERVAL', 5.0)
+        self.max_attempts = config.get('MAX_ATTEMPTS', 6)
+        self.retry_base = config.get('RETRY_BASE', 30.0)
+        self.retry_max = config.get('RETRY_MAX', 3600.0)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._in_flight: Set[int] = set()  # claimed ids, released once their outcome is committed
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=10000)  # monotonic times of recent deliveries
+
+        self.enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.coalesced = 0  # rows delivered as part of another row's message
+        self.pending = 0
+        self.last_send_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopping = False
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="outbox-send")
+            self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, channel: str, recipient: str, body: str, subject: Optional[str] = None,
+                attachments: Optional[Sequence] = None, delay: float = 0.0) -> Future:
+        """Queue a message for delivery in ``delay`` seconds; resolves to its id once the row is committed."""
+        if channel not in self.transports:
+            raise ValueError(f"No transport for channel '{channel}'")
+        future = self.submit(insert(OutboxMessage(
+            channel=channel, recipient=recipient, subject=subject, body=body,
+            attachments=list(attachments) if attachments else None,
+            state='pending', attempts=0, next_attempt_at=datetime.utcnow() + timedelta(seconds=delay)
+        )))
+        future.add_done_callback(lambda f: f.exception() is None and self._wake.set())
+        with self._lock:
+            self.enqueued += 1
+        return future
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retry number ``attempts``, with jitter so failures spread out."""
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    # Dispatching
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                self._dispatch()
+            except Exception as e:
+                logger.error(f"Outbox poll failed: {e}")
+            self._wake.wait(self.poll_interval)
+
+    def _dispatch(self):
+        # Claim at most BATCH_SIZE at a time, so a long backlog stays pending in the table
+        with self._lock:
+            room = self.batch_size - len(self._in_flight)
+            claimed = list(self._in_flight)
+        if room <= 0:
+            return
+        db = self.session_factory()
+        try:
+            due = select(OutboxMessage).where(OutboxMessage.state == 'pending',
+                                              OutboxMessage.next_attempt_at <= datetime.utcnow())
+            if claimed:
+                due = due.where(OutboxMessage.id.notin_(claimed))
+            rows = db.execute(due.order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+                              .limit(room)).scalars().all()
+            messages = []
+            grouped = set()
+            for row in rows:
+                if row.channel not in self.coalesce:
+                    messages.append(self._message([row]))
+                elif (row.channel, row.recipient) not in grouped:
+                    grouped.add((row.channel, row.recipient))
+                    messages.append(self._message(self._group(db, row, claimed)))
+            self.pending = db.execute(select(func.count(OutboxMessage.id))
+                                      .where(OutboxMessage.state == 'pending')).scalar()
+        finally:
+            db.close()
+
+        with self._lock:
+            if self._stopping:
+                return
+            for message in messages:
+                self._in_flight.update(message['ids'])
+                self._executor.submit(self._deliver, message)
+
+    def _group(self, db, row: OutboxMessage, claimed: Sequence[int]) -> list:
+        """``row`` and the recipient's other pending rows on its channel, oldest first."""
+        group = select(OutboxMessage).where(OutboxMessage.state == 'pending',
+                                            OutboxMessage.channel == row.channel,
+                                            OutboxMessage.recipient == row.recipient)
+        if claimed:
+            group = group.where(OutboxMessage.id.notin_(claimed))
+        rows = db.execute(group.order_by(OutboxMessage.id).limit(self.batch_size)).scalars().all()
+        return rows if row in rows else [row] + rows[:-1]
+
+    @staticmethod
+    def _message(rows: list) -> dict:
+        first = rows[0]
+        message = {'ids': [row.id for row in rows], 'channel': first.channel, 'recipient': first.recipient,
+                   'subject': first.subject, 'body': first.body, 'attachments': first.attachments or [],
+                   'attempts': max(row.attempts or 0 for row in rows)}
+        if len(rows) > 1:
+            message['parts'] = [{'subject': row.subject, 'body': row.body, 'attachments': row.attachments or []}
+                                for row in rows]
+        return message
+
+    def _deliver(self, message: dict):
+        start = time.perf_counter()
+        try:
+            transport = self.transports.get(message['channel'])
+            if transport is None:
+                raise PermanentFailure(f"No transport for channel '{message['channel']}'")
+            result = transport({key: message[key] for key in ('recipient', 'subject', 'body', 'attachments', 'parts')
+                                if key in message})
+        except Exception as e:
+            self._record(message, start, e)
+            return
+        if isinstance(result, Future):
+            # Sent by the transport's own executor; this sender thread is free for the next message
+            result.add_done_callback(lambda f: self._record(
+                message, start, CancelledError() if f.cancelled() else f.exception()
+            ))
+        else:
+            self._record(message, start, None)
+
+    def _record(self, message: dict, start: float, error: Optional[BaseException]):
+        """Queue the outcome of one delivery attempt on the database writer."""
+        permanent = isinstance(error, PermanentFailure)
+        attempts = message['attempts'] + 1
+        now = datetime.utcnow()
+        if error is None:
+            values = {'state': 'sent', 'attempts': attempts, 'sent_at': now, 'last_error': None}
+            with self._lock:
+                self.sent += 1
+                self.coalesced += len(message['ids']) - 1
+                self.last_send_ms = round((time.perf_counter() - start) * 1000, 1)
+                self._recent.append(time.monotonic())
+        elif permanent or attempts >= self.max_attempts:
+            values = {'state': 'failed', 'attempts': attempts, 'last_error': str(error)[:500]}
+            logger.error(f"Giving up on {message['channel']} to {message['recipient']} "
+                         f"after {attempts} attempt(s): {error}")
+            with self._lock:
+                self.failed += 1
+        else:
+            delay = self.backoff(attempts)
+            values = {'attempts': attempts, 'last_error': str(error)[:500],
+                      'next_attempt_at': now + timedelta(seconds=delay)}
+            logger.warning(f"Sending {message['channel']} to {message['recipient']} failed ({error}); "
+                           f"retrying in {delay:.0f}s")
+            with self._lock:
+                self.retried += 1
+
+        def job(session):
+            session.execute(update(OutboxMessage).where(OutboxMessage.id.in_(message['ids'])).values(**values))
+        self.submit(job).add_done_callback(lambda _: self._release(message['ids']))
+
+    def _release(self, message_ids: Sequence[int]):
+        with self._lock:
+            self._in_flight.difference_update(message_ids)
+        self._wake.set()
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Finish deliveries already started; unstarted ones stay pending for the next run."""
+        with self._lock:
+            self._stopping = True
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        cutoff = time.monotonic() - 60
+        with self._lock:
+            last_minute = sum(1 for sent_at in self._recent if sent_at >= cutoff)
+            in_flight = len(self._in_flight)
+        return {
+            'running': self.running,
+            'pending': self.pending,
+            'in_flight': in_flight,
+            'enqueued': self.enqueued,
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'coalesced': self.coalesced,
+            'sent_last_minute': last_minute,
+            'last_send_ms': self.last_send_ms
+        }
@@ -0,0 +1,245 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_VERSION = 1  # bump when metrics or the embedding layout change
+EMBEDDING_SIZE = 32  # 16 radial spectrum bins + 16 angular orders
+
+SCALAR_METRICS = ('symmetry_order', 'symmetry_strength', 'nodal_line_density', 'nodal_fraction',
+                  'dominant_frequency', 'edge_energy')
+
+
+def load_gray(path: str, size: int) -> Optional[np.ndarray]:
+    """Centre square of a capture as ``size`` x ``size`` grayscale, decoded at reduced scale."""
+    data = np.fromfile(path, dtype=np.uint8)
+    image = None
+    for flag in (cv2.IMREAD_REDUCED_GRAYSCALE_4, cv2.IMREAD_REDUCED_GRAYSCALE_2, cv2.IMREAD_GRAYSCALE):
+        image = cv2.imdecode(data, flag)
+        if image is None or min(image.shape) >= size:
+            break
+    if image is None:
+        return None
+    height, width = image.shape
+    side = min(height, width)
+    top, left = (height - side) // 2, (width - side) // 2
+    return cv2.resize(image[top:top + side, left:left + side], (size, size), interpolation=cv2.INTER_AREA)
+
+
+class _Geometry:
+    """Sampling grids shared by every batch of one frame size."""
+
+    def __init__(self, size: int, rings: int = 24, angles: int = 128):
+        self.size = size
+        self.window = np.outer(np.hanning(size), np.hanning(size)).astype(np.float32)
+
+        # Radial bins of the rfft2 half-plane; mirrored columns count twice
+        fy = np.fft.fftfreq(size) * size
+        fx = np.fft.rfftfreq(size) * size
+        radius = np.rint(np.hypot(fy[:, None], fx[None, :])).astype(np.int64)
+        self.n_radii = size // 2
+        self.valid = (radius < self.n_radii).ravel()
+        self.radius = radius.ravel()[self.valid]
+        weights = np.full(fx.shape, 2.0)
+        weights[0] = 1.0
+        if size % 2 == 0:
+            weights[-1] = 1.0
+        self.weights = np.broadcast_to(weights, radius.shape).ravel()[self.valid]
+        self.band_starts = np.linspace(0, self.n_radii - 1, 17)[:-1].astype(np.int64)  # 16 bands above DC
+
+        # Polar sampling grid for the angular spectrum (nearest pixel)
+        centre = (size - 1) / 2
+        r = np.linspace(0.1, 0.45, rings) * size
+        theta = np.linspace(0, 2 * np.pi, angles, endpoint=False)
+        self.polar_y = np.rint(centre + r[:, None] * np.sin(theta)[None, :]).astype(np.int64)
+        self.polar_x = np.rint(centre + r[:, None] * np.cos(theta)[None, :]).astype(np.int64)
+
+
+_geometries: Dict[int, _Geometry] = {}
+
+
+def analyze_batch(frames: np.ndarray, nodal_threshold: float = 0.5) -> List[dict]:
+    """Metrics and embedding for a stack of square grayscale frames ``(N, S, S)``.
+
+    Every stage runs on the whole stack at once:
+
+    - ``edge_energy``: mean squared gradient of the contrast-normalized frame
+    - ``nodal_fraction`` / ``nodal_line_density``: share of bright (sand)
+      pixels, and sand-line crossings per scan line
+    - ``dominant_frequency``: peak of the radially averaged 2-D power
+      spectrum, in cycles per frame
+    - ``symmetry_order`` / ``symmetry_strength``: strongest angular harmonic
+      (order >= 2) of concentric rings around the centre, and its share of
+      the angular power
+    """
+    n, size, _ = frames.shape
+    geometry = _geometries.get(size)
+    if geometry is None:
+        geometry = _geometries[size] = _Geometry(size)
+
+    x = frames.astype(np.float32)
+    x -= x.mean(axis=(1, 2), keepdims=True)
+    x /= x.std(axis=(1, 2), keepdims=True) + 1e-6
+
+    gy = np.diff(x, axis=1)[:, :, :-1]
+    gx = np.diff(x, axis=2)[:, :-1, :]
+    edge_energy = (gx * gx + gy * gy).mean(axis=(1, 2))
+
+    sand = x > nodal_threshold
+    nodal_fraction = sand.mean(axis=(1, 2))
+    crossings = (sand[:, 1:, :] != sand[:, :-1, :]).sum(axis=(1, 2)) \
+        + (sand[:, :, 1:] != sand[:, :, :-1]).sum(axis=(1, 2))
+    nodal_line_density = crossings / (2 * size)
+
+    power = np.abs(np.fft.rfft2(x * geometry.window)) ** 2
+    flat = power.reshape(n, -1)[:, geometry.valid] * geometry.weights
+    bins = (geometry.radius[None, :] + geometry.n_radii * np.arange(n)[:, None]).ravel()
+    radial = np.bincount(bins, weights=flat.ravel(), minlength=n * geometry.n_radii) \
+        .reshape(n, geometry.n_radii)
+    dominant_frequency = radial[:, 1:].argmax(axis=1) + 1
+
+    polar = x[:, geometry.polar_y, geometry.polar_x]  # (N, rings, angles)
+    angular = (np.abs(np.fft.rfft(polar, axis=2)) ** 2).sum(axis=1)
+    orders = angular[:, 2:33]
+    symmetry_order = orders.argmax(axis=1) + 2
+    symmetry_strength = orders.max(axis=1) / (angular[:, 1:].sum(axis=1) + 1e-9)
+
+    # Embedding: log radial spectrum in 16 bands and angular orders 1-16, each L2-normalized
+    radial_bands = np.log1p(np.add.reduceat(radial[:, 1:], geometry.band_starts, axis=1))
+    angular_bands = np.log1p(angular[:, 1:17])
+    embedding = np.concatenate([
+        radial_bands / (np.linalg.norm(radial_bands, axis=1, keepdims=True) + 1e-9),
+        angular_bands / (np.linalg.norm(angular_bands, axis=1, keepdims=True) + 1e-9)
+    ], axis=1) / np.sqrt(2)
+
+    return [
+        {
+            'version': ANALYSIS_VERSION,
+            'symmetry_order': int(symmetry_order[i]),
+            'symmetry_strength': round(float(symmetry_strength[i]), 4),
+            'nodal_line_density': round(float(nodal_line_density[i]), 4),
+            'nodal_fraction': round(float(nodal_fraction[i]), 4),
+            'dominant_frequency': int(dominant_frequency[i]),
+            'edge_energy': round(float(edge_energy[i]), 4),
+            'embedding': [round(float(v), 5) for v in embedding[i]]
+        }
+        for i in range(n)
+    ]
+
+
+def analyze_files(paths: Sequence[str], size: int = 128, nodal_threshold: float = 0.5) -> List[Optional[dict]]:
+    """Analyze capture files as one batch (runs in a worker process); None for unreadable files."""
+    frames = [load_gray(path, size) if os.path.exists(path) else None for path in paths]
+    readable = [frame for frame in frames if frame is not None]
+    results = iter(analyze_batch(np.stack(readable), nodal_threshold) if readable else [])
+    return [next(results) if frame is not None else None for frame in frames]
+
+
+def summarize(results: Sequence[dict]) -> dict:
+    """Per-recording summary of pattern metrics (mean, min and max of each)."""
+    summary = {'version': ANALYSIS_VERSION, 'patterns': len(results)}
+    for key in SCALAR_METRICS:
+        values = np.array([result[key] for result in results], dtype=np.float64)
+        summary[key] = {'mean': round(float(values.mean()), 4),
+                        'min': round(float(values.min()), 4),
+                        'max': round(float(values.max()), 4)}
+    orders = [result['symmetry_order'] for result in results]
+    summary['symmetry_order']['mode'] = max(set(orders), key=orders.count)
+    return summary
+
+
+class PatternAnalyzer:
+    """Runs ``analyze_files`` on batches of captures in a process pool, off the request path.
+
+    ``submit`` splits its items into batches of ``BATCH_SIZE`` and returns a
+    future for ``[(item_id, metrics), ...]``; items whose file cannot be read
+    are left out. Workers are spawned on first use.
+    """
+
+    def __init__(self, config):
+        self.size = config.get('SIZE', 128)
+        self.batch_size = config.get('BATCH_SIZE', 16)
+        self.nodal_threshold = config.get('NODAL_THRESHOLD', 0.5)
+        self.workers = config.get('WORKERS') or max(1, (os.cpu_count() or 2) - 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.analyzed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_ms = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: the app process runs camera, audio and encoder threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn'))
+        return self._pool
+
+    def submit(self, items: Sequence[Tuple[int, str]]) -> Future:
+        """Analyze ``(item_id, path)`` pairs; resolves to the metrics of the readable ones."""
+        result: Future = Future()
+        items = list(items)
+        if not items:
+            result.set_result([])
+            return result
+
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        outputs: List[Optional[list]] = [None] * len(batches)
+        remaining = [len(batches)]
+
+        def finished(index: int, batch: list, started: float, future: Future):
+            try:
+                metrics = future.result()
+                outputs[index] = [(item_id, m) for (item_id, _), m in zip(batch, metrics) if m is not None]
+                with self._lock:
+                    self.analyzed += len(outputs[index])
+                    self.failed += len(batch) - len(outputs[index])
+            except Exception as e:
+                logger.error(f"Pattern analysis batch failed: {e}")
+                outputs[index] = []
+                with self._lock:
+                    self.failed += len(batch)
+            with self._lock:
+                self.batches += 1
+                self.last_batch_ms = round((time.perf_counter() - started) * 1000, 1)
+                remaining[0] -= 1
+                done = remaining[0] == 0
+            if done:
+                result.set_result([pair for output in outputs for pair in output])
+
+        with self._lock:
+            if self._closed:
+                result.set_result([])
+                return result
+            pool = self.pool
+        for index, batch in enumerate(batches):
+            started = time.perf_counter()
+            future = pool.submit(analyze_files, [path for _, path in batch], self.size, self.nodal_threshold)
+            future.add_done_callback(lambda f, i=index, b=batch, s=started: finished(i, b, s, f))
+        return result
+
+    def close(self):
+        """Finish queued batches, then stop the workers."""
+        with self._lock:
+            self._closed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'analyzed': self.analyzed,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_batch_ms': self.last_batch_ms
+        }
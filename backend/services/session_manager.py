@@ -0,0 +1,257 @@
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+import heapq
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[dict], None]
+TIMINGS = ('setup_s', 'recording_s', 'review_s', 'total_s')
+
+
+class SessionNotFound(KeyError):
+    """Raised for a session id that is unknown or has expired."""
+
+
+class SessionStateError(ValueError):
+    """Raised for an event the session's state does not allow, e.g. saving it twice."""
+
+
+class SessionManager:
+    """Experiment sessions in memory, from start through recording to saving.
+
+    Session ids are unique (a timestamp plus random hex), so concurrent starts
+    never collide. A session expires ``SESSION_TTL`` seconds after its last
+    lifecycle event; expiry deadlines sit in a heap that a background thread
+    sleeps on, and lookups ignore expired sessions even before the thread has
+    removed them. At most ``MAX_SESSIONS`` are kept: starting one more expires
+    the session closest to its deadline. A session is saved once, after it
+    has stopped.
+
+    ``on_start``, ``on_record``, ``on_stop``, ``on_save`` and ``on_expire``
+    are called with the session after each event (outside the lock; errors
+    are logged). Each session records when its events happened, and
+    ``stats`` averages the setup, recording, review and total times of
+    recently finished sessions.
+    """
+
+    def __init__(self, config, on_start: Optional[Hook] = None, on_record: Optional[Hook] = None,
+                 on_stop: Optional[Hook] = None, on_save: Optional[Hook] = None,
+                 on_expire: Optional[Hook] = None):
+        self.ttl = config.get('SESSION_TTL', 1800)
+        self.max_sessions = config.get('MAX_SESSIONS', 500)
+        self.hooks: Dict[str, Optional[Hook]] = {
+            'start': on_start, 'record': on_record, 'stop': on_stop, 'save': on_save, 'expire': on_expire
+        }
+
+        self.sessions: Dict[str, dict] = {}
+        self._deadlines: List[Tuple[float, int, str]] = []  # (expires_at, sequence, session_id)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._finished = deque(maxlen=1000)  # timings of sessions that were saved or expired after a stop
+
+        self.started = 0
+        self.expired = 0
+        self.evicted = 0
+
+    # Lifecycle
+
+    def start(self, frequency: Optional[float], **data) -> dict:
+        """Open a new session; ``data`` (e.g. ``duration``, ``waveform``) is kept on it."""
+        now = time.monotonic()
+        session_id = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+        session = {
+            **data,
+            'session_id': session_id,
+            'state': 'started',
+            'frequency': frequency,
+            'start_time': datetime.now(),
+            'events': {'start': now},
+            'timings': {}
+        }
+        evicted = []
+        with self._lock:
+            while len(self.sessions) >= self.max_sessions:
+                oldest = self._pop_deadline(force=True)
+                if oldest is None:
+                    break
+                evicted.append(oldest)
+            self.sessions[session_id] = session
+            self.started += 1
+            self.evicted += len(evicted)
+            self._touch(session, now)
+        for old in evicted:
+            logger.warning(f"Session {old['session_id']} evicted: {self.max_sessions} sessions open")
+            self._call('expire', old)
+        self._call('start', session)
+        return session
+
+    def record(self, session_id: str, **data) -> dict:
+        """Mark a session as recording (``data``: e.g. the ``recording_id``)."""
+        return self._event(session_id, 'record', 'recording', data)
+
+    def stop(self, session_id: str, **data) -> dict:
+        """Mark a session as stopped (``data``: e.g. ``image_path`` and ``video_path``)."""
+        return self._event(session_id, 'stop', 'stopped', data)
+
+    def save(self, session_id: str, **data) -> dict:
+        """Record the visitor's details on a stopped session (``data``: name, email, phone, ...)."""
+        return self._event(session_id, 'save', 'saved', data, after=('stopped',))
+
+    def _event(self, session_id: str, event: str, state: str, data: dict,
+               after: Optional[Tuple[str, ...]] = None) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                raise SessionNotFound(session_id)
+            if after is not None and session['state'] not in after:
+                raise SessionStateError(f"Session {session_id} is {session['state']}; cannot {event} it")
+            session.update(data)
+            session['state'] = state
+            session['events'][event] = now
+            session['timings'] = self._timings(session['events'], now)
+            self._touch(session, now)
+            if event == 'save':
+                self._finished.append(session['timings'])
+        self._call(event, session)
+        return session
+
+    # Lookup
+
+    def get(self, session_id: Optional[str]) -> Optional[dict]:
+        """The session, or None if it is unknown or has expired."""
+        if not session_id:
+            return None
+        with self._lock:
+            return self._live(session_id)
+
+    def _live(self, session_id: str) -> Optional[dict]:
+        session = self.sessions.get(session_id)
+        if session is None or session['expires_at'] <= time.monotonic():
+            return None
+        return session
+
+    @staticmethod
+    def _timings(events: dict, now: float) -> dict:
+        def span(first, last):
+            return round(events[last] - events[first], 3) if first in events and last in events else None
+        return {
+            'setup_s': span('start', 'record'),
+            'recording_s': span('record', 'stop'),
+            'review_s': span('stop', 'save'),
+            'total_s': round(now - events['start'], 3)
+        }
+
+    # Expiry
+
+    def _touch(self, session: dict, now: float):
+        session['last_activity'] = now
+        session['expires_at'] = now + self.ttl
+        self._sequence += 1
+        heapq.heappush(self._deadlines, (session['expires_at'], self._sequence, session['session_id']))
+        if len(self._deadlines) > 4 * len(self.sessions) + 64:
+            # Drop superseded deadlines so touches cannot grow the heap without bound
+            self._deadlines = [(session['expires_at'], 0, session_id)
+                               for session_id, session in self.sessions.items()]
+            heapq.heapify(self._deadlines)
+        self._wake.notify()
+
+    def _pop_deadline(self, force: bool = False) -> Optional[dict]:
+        """Remove and return the session whose deadline is first (if due, unless ``force``)."""
+        while self._deadlines:
+            expires_at, _, session_id = self._deadlines[0]
+            session = self.sessions.get(session_id)
+            if session is None or session['expires_at'] != expires_at:
+                heapq.heappop(self._deadlines)  # superseded by a later touch
+                continue
+            if not force and expires_at > time.monotonic():
+                return None
+            heapq.heappop(self._deadlines)
+            del self.sessions[session_id]  # its state stays the last one reached, for the expire hook
+            if 'stop' in session['events'] and 'save' not in session['events']:
+                self._finished.append(self._timings(session['events'], expires_at))
+            return session
+        return None
+
+    def expire(self) -> int:
+        """Remove sessions past their deadline now; returns how many."""
+        expired = []
+        with self._lock:
+            while True:
+                session = self._pop_deadline()
+                if session is None:
+                    break
+                expired.append(session)
+            self.expired += len(expired)
+        for session in expired:
+            logger.info(f"Session {session['session_id']} expired")
+            self._call('expire', session)
+        return len(expired)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+                timeout = self._deadlines[0][0] - time.monotonic() if self._deadlines else None
+                if timeout is None or timeout > 0:
+                    self._wake.wait(timeout)
+                    continue
+            self.expire()
+
+    def start_expiry(self):
+        """Expire sessions in the background, as their deadlines pass."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="session-expiry", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._wake.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _call(self, event: str, session: dict):
+        hook = self.hooks.get(event)
+        if hook is None:
+            return
+        try:
+            hook(session)
+        except Exception as e:
+            logger.error(f"Session {session['session_id']} {event} hook failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            states: Dict[str, int] = {}
+            for session in self.sessions.values():
+                states[session['state']] = states.get(session['state'], 0) + 1
+            finished = list(self._finished)
+
+        def mean(key):
+            values = [timings[key] for timings in finished if timings.get(key) is not None]
+            return round(sum(values) / len(values), 3) if values else None
+
+        return {
+            'open': sum(states.values()),
+            'max_sessions': self.max_sessions,
+            'ttl': self.ttl,
+            'states': states,
+            'started': self.started,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'finished': len(finished),
+            'mean': {key: mean(key) for key in TIMINGS}
+        }
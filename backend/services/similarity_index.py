@@ -0,0 +1,249 @@
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import threading
+import time
+import numpy as np
+from sqlalchemy import select
+from ..database.models import Pattern
+from .pattern_analysis import ANALYSIS_VERSION, EMBEDDING_SIZE
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATIONS = (None, 'int8')
+
+
+class SimilarityIndex:
+    """Pattern embeddings in memory-mapped files, searched by brute-force cosine.
+
+    The index directory holds ``ids.i64`` (one int64 pattern id per row),
+    ``vectors.f32`` (unit-length float32 rows), or with ``QUANTIZE='int8'``
+    ``vectors.i8`` plus a float32 scale per row in ``scales.f32`` (a quarter
+    of the size, scores within about 1%), and ``index.json`` describing the
+    layout. Rows are only ever appended, so the files never need rewriting;
+    a pattern that is analyzed again has its row overwritten in place. The
+    row count is implied by the file sizes, and a row torn by a crash is
+    dropped when the index is opened.
+
+    A query is one matrix-vector product over every row and a partial sort
+    for the top ``k``: about 3M multiply-adds at 100k patterns.
+    """
+
+    def __init__(self, config, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.quantize = config.get('QUANTIZE')
+        if self.quantize not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {self.quantize}")
+        self.dim = config.get('DIM', EMBEDDING_SIZE)
+        self.version = config.get('VERSION', ANALYSIS_VERSION)
+        self._dtype = np.int8 if self.quantize == 'int8' else np.float32
+        self._vector_file = self.index_dir / ('vectors.i8' if self.quantize == 'int8' else 'vectors.f32')
+        self._id_file = self.index_dir / 'ids.i64'
+        self._scale_file = self.index_dir / 'scales.f32'
+        self._meta_file = self.index_dir / 'index.json'
+
+        self._ids = np.empty(0, dtype=np.int64)
+        self._vectors = np.empty((0, self.dim), dtype=self._dtype)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._rows: Dict[int, int] = {}  # pattern id -> row
+        self._lock = threading.Lock()
+        self.loaded = False
+
+        self.appended = 0
+        self.updated = 0
+        self.queries = 0
+        self.last_query_ms = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self._rows)
+
+    # Files
+
+    def _layout(self) -> dict:
+        return {'dim': self.dim, 'version': self.version, 'quantize': self.quantize}
+
+    def open(self):
+        """Map the index files, starting afresh if their layout differs from the config."""
+        with self._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            layout = None
+            if self._meta_file.exists():
+                try:
+                    layout = json.loads(self._meta_file.read_text())
+                except ValueError:
+                    pass
+            if layout != self._layout():
+                if layout is not None:
+                    logger.info(f"Similarity index layout changed ({layout}); rebuilding")
+                for path in self.index_dir.glob('*'):
+                    if path.is_file():
+                        path.unlink()
+                self._meta_file.write_text(json.dumps(self._layout()))
+
+            for path in (self._id_file, self._vector_file, self._scale_file):
+                path.touch()
+            # Keep only rows that were written completely
+            rows = min(self._id_file.stat().st_size // 8,
+                       self._vector_file.stat().st_size // (self.dim * np.dtype(self._dtype).itemsize))
+            if self.quantize == 'int8':
+                rows = min(rows, self._scale_file.stat().st_size // 4)
+            self._truncate(rows)
+            self._remap()
+            self._rows = {int(pattern_id): row for row, pattern_id in enumerate(self._ids)}
+            self.loaded = True
+        logger.info(f"Similarity index opened: {len(self._rows)} patterns")
+
+    def _truncate(self, rows: int):
+        for path, row_bytes in ((self._id_file, 8),
+                                (self._vector_file, self.dim * np.dtype(self._dtype).itemsize),
+                                (self._scale_file, 4 if self.quantize == 'int8' else 0)):
+            if path.stat().st_size != rows * row_bytes:
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * row_bytes)
+
+    def _remap(self):
+        rows = self._id_file.stat().st_size // 8
+        if rows == 0:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._vectors = np.empty((0, self.dim), dtype=self._dtype)
+            self._scales = np.empty(0, dtype=np.float32)
+            return
+        self._ids = np.memmap(self._id_file, dtype=np.int64, mode='r', shape=(rows,))
+        self._vectors = np.memmap(self._vector_file, dtype=self._dtype, mode='r+', shape=(rows, self.dim))
+        if self.quantize == 'int8':
+            self._scales = np.memmap(self._scale_file, dtype=np.float32, mode='r+', shape=(rows,))
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Unit-normalize rows, then quantize them if configured."""
+        vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12)
+        if self.quantize != 'int8':
+            return vectors.astype(np.float32), None
+        scales = np.abs(vectors).max(axis=1) / 127 + 1e-12
+        return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    # Writing
+
+    def add(self, items: Iterable[Tuple[int, Sequence[float]]]) -> int:
+        """Index ``(pattern_id, embedding)`` pairs; returns how many were appended."""
+        items = [(int(pattern_id), embedding) for pattern_id, embedding in items
+                 if embedding is not None and len(embedding) == self.dim]
+        if not items:
+            return 0
+        latest = dict(items)  # the last embedding of a repeated id wins
+        ids = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        vectors, scales = self._encode(np.array(list(latest.values()), dtype=np.float32))
+
+        with self._lock:
+            if not self.loaded:
+                raise RuntimeError("Similarity index is not open")
+            rows = np.array([self._rows.get(int(pattern_id), -1) for pattern_id in ids])
+            known = rows >= 0
+            if known.any():
+                self._vectors[rows[known]] = vectors[known]
+                if scales is not None:
+                    self._scales[rows[known]] = scales[known]
+                self.updated += int(known.sum())
+
+            fresh = ~known
+            if fresh.any():
+                # Vectors before ids: a crash in between leaves a row the next open drops
+                with open(self._vector_file, 'ab') as f:
+                    f.write(vectors[fresh].tobytes())
+                if scales is not None:
+                    with open(self._scale_file, 'ab') as f:
+                        f.write(scales[fresh].tobytes())
+                with open(self._id_file, 'ab') as f:
+                    f.write(ids[fresh].tobytes())
+                start = len(self._ids)
+                self._remap()
+                for offset, pattern_id in enumerate(ids[fresh]):
+                    self._rows[int(pattern_id)] = start + offset
+                self.appended += int(fresh.sum())
+            return int(fresh.sum())
+
+    # Searching
+
+    def vector(self, pattern_id: int) -> Optional[np.ndarray]:
+        """Stored (dequantized) embedding of a pattern."""
+        with self._lock:
+            row = self._rows.get(pattern_id)
+            if row is None:
+                return None
+            vector = np.array(self._vectors[row], dtype=np.float32)
+            return vector * self._scales[row] if self.quantize == 'int8' else vector
+
+    def search(self, query: Sequence[float], k: int = 10,
+               exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top ``k`` ``(pattern_id, cosine)`` pairs for an embedding, best first."""
+        query = np.asarray(query, dtype=np.float32)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Query must have {self.dim} dimensions")
+        query = query / (np.linalg.norm(query) + 1e-12)
+        with self._lock:
+            # Appends remap to new arrays, so this snapshot stays consistent
+            ids, vectors, scales = self._ids, self._vectors, self._scales
+
+        started = time.perf_counter()
+        scores = vectors @ query if vectors.dtype == np.float32 else (vectors @ query) * scales
+        excluded = [self._rows[i] for i in exclude if self._rows.get(i, len(ids)) < len(ids)]
+        if excluded:
+            scores[excluded] = -np.inf
+        k = min(k, len(ids) - len(excluded))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        self.queries += 1
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return [(int(ids[row]), round(float(scores[row]), 5)) for row in top]
+
+    def similar(self, pattern_id: int, k: int = 10) -> Optional[List[Tuple[int, float]]]:
+        """Patterns that look most like ``pattern_id`` (itself left out); None if it is not indexed."""
+        vector = self.vector(pattern_id)
+        if vector is None:
+            return None
+        return self.search(vector, k, exclude=(pattern_id,))
+
+    # Catching up with the database
+
+    def sync(self, session_factory: Callable, batch_size: int = 1000) -> int:
+        """Index analyzed patterns missing from the files (once, at startup); returns the count."""
+        db = session_factory()
+        try:
+            analyzed = db.execute(select(Pattern.id).where(Pattern.analysis_data.isnot(None))).scalars().all()
+            missing = [pattern_id for pattern_id in analyzed if pattern_id not in self._rows]
+            added = 0
+            for i in range(0, len(missing), batch_size):
+                rows = db.execute(select(Pattern.id, Pattern.analysis_data)
+                                  .where(Pattern.id.in_(missing[i:i + batch_size]))).all()
+                added += self.add(
+                    (pattern_id, data.get('embedding')) for pattern_id, data in rows
+                    if isinstance(data, dict) and data.get('version') == self.version
+                )
+        finally:
+            db.close()
+        if added:
+            logger.info(f"Similarity index caught up: {added} patterns added")
+        return added
+
+    def close(self):
+        with self._lock:
+            if isinstance(self._vectors, np.memmap):
+                self._vectors.flush()
+            if isinstance(self._scales, np.memmap):
+                self._scales.flush()
+
+    def stats(self) -> dict:
+        itemsize = np.dtype(self._dtype).itemsize
+        return {
+            'loaded': self.loaded,
+            'patterns': self.count,
+            'quantize': self.quantize,
+            'bytes': len(self._ids) * (8 + self.dim * itemsize + (4 if self.quantize == 'int8' else 0)),
+            'appended': self.appended,
+            'updated': self.updated,
+            'queries': self.queries,
+            'last_query_ms': self.last_query_ms
+        }
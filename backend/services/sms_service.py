@@ -0,0 +1,199 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+import logging
+import threading
+import time
+import uuid
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+from .outbox import PermanentFailure
+
+logger = logging.getLogger(__name__)
+
+
+class SmsQueueFull(Exception):
+    """Raised when ``SMS_QUEUE_SIZE`` messages are already waiting to be sent."""
+
+
+class TwilioTransport:
+    """Sends through the Twilio REST API (one blocking HTTPS request per message)."""
+
+    def __init__(self, config):
+        if not config.get('ACCOUNT_SID') or not config.get('AUTH_TOKEN'):
+            raise ValueError("TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN are required")
+        self.from_number = config['FROM_NUMBER']
+        # One keep-alive HTTP session shared by the sender threads
+        self.client = Client(config['ACCOUNT_SID'], config['AUTH_TOKEN'],
+                             http_client=TwilioHttpClient(timeout=config.get('SMS_TIMEOUT', 15)))
+
+    def send(self, to_number: str, body: str) -> str:
+        try:
+            return self.client.messages.create(body=body, from_=self.from_number, to=to_number).sid
+        except TwilioRestException as e:
+            # 429 and 5xx are worth retrying; other 4xx (bad number, unsubscribed) are not
+            if e.status == 429 or e.status >= 500:
+                raise
+            raise PermanentFailure(f"Twilio {e.status} (code {e.code}): {e.msg}") from e
+
+    def close(self):
+        pass
+
+
+class FakeSmsTransport:
+    """Keeps messages in memory after ``FAKE_LATENCY`` seconds, standing in for Twilio."""
+
+    def __init__(self, config):
+        self.latency = config.get('FAKE_LATENCY', 0.0)
+        self.messages: List[dict] = []
+        self.active = 0
+        self.max_active = 0  # most sends in progress at once
+        self._lock = threading.Lock()
+
+    def send(self, to_number: str, body: str) -> str:
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            sid = f"SMfake{uuid.uuid4().hex[:26]}"
+            with self._lock:
+                self.messages.append({'sid': sid, 'to': to_number, 'body': body, 'sent_at': time.monotonic()})
+            logger.info(f"Fake SMS to {to_number}: {body}")
+            return sid
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def close(self):
+        pass
+
+
+SMS_TRANSPORTS = {
+    'twilio': TwilioTransport,
+    'fake': FakeSmsTransport,
+}
+
+
+def sms_transport_factory(config) -> Callable[[dict], object]:
+    """Transport class for ``TWILIO_CONFIG['TRANSPORT']``."""
+    transport = config.get('TRANSPORT', 'twilio')
+    if transport not in SMS_TRANSPORTS:
+        raise ValueError(f"Unknown SMS transport: {transport}")
+    return SMS_TRANSPORTS[transport]
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` sends per second on average, bursts of up to ``burst``."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now, so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SmsDispatcher:
+    """Sends text messages from a bounded thread pool, under a rate limit.
+
+    At most ``SMS_CONCURRENCY`` requests to the provider are in progress at
+    once, and sends start no faster than ``SMS_RATE`` per second (bursts of
+    ``SMS_BURST``), which keeps within the provider's per-number throughput.
+    ``submit`` returns a future for the message id; once ``SMS_QUEUE_SIZE``
+    messages are waiting it raises ``SmsQueueFull`` instead of queueing more.
+    """
+
+    def __init__(self, config, transport):
+        self.transport = transport
+        self.concurrency = config.get('SMS_CONCURRENCY', 4)
+        self.queue_size = config.get('SMS_QUEUE_SIZE', 100)
+        self.limiter = RateLimiter(config.get('SMS_RATE'), config.get('SMS_BURST', 1))
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="sms")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.throttled_ms = 0.0
+        self.last_send_ms = 0.0
+
+    def submit(self, to_number: str, body: str) -> Future:
+        """Queue a message; the future resolves to the provider's message id."""
+        with self._lock:
+            if self._pending >= self.queue_size:
+                self.rejected += 1
+                raise SmsQueueFull(f"{self._pending} text messages are waiting to be sent")
+            self._pending += 1
+            self.submitted += 1
+        future = self._executor.submit(self._send, to_number, body)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _send(self, to_number: str, body: str) -> str:
+        waited = self.limiter.acquire()
+        start = time.perf_counter()
+        sid = self.transport.send(to_number, body)
+        with self._lock:
+            self.throttled_ms += waited * 1000
+            self.last_send_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"SMS sent successfully to {to_number}")
+        return sid
+
+    def _finished(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.sent += 1
+
+    def deliver(self, message: dict) -> Future:
+        """Outbox transport: send an ``OutboxMessage`` as a text."""
+        return self.submit(message['recipient'], message['body'])
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.transport.close()
+
+    def stats(self) -> dict:
+        return {
+            'concurrency': self.concurrency,
+            'rate': self.limiter.rate,
+            'pending': self._pending,
+            'submitted': self.submitted,
+            'sent': self.sent,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'throttled_ms': round(self.throttled_ms, 1),
+            'last_send_ms': self.last_send_ms
+        }
+
+
+def create_sms_dispatcher(config) -> Optional[SmsDispatcher]:
+    """Dispatcher for ``TWILIO_CONFIG``, or None when SMS is disabled or misconfigured."""
+    if not config.get('ENABLED'):
+        return None
+    try:
+        return SmsDispatcher(config, sms_transport_factory(config)(config))
+    except Exception as e:
+        logger.error(f"SMS disabled: {e}")
+        return None
@@ -1,32 +1,172 @@
 from fastapi import WebSocket
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
 import cv2
-import base64
 import json
 import logging
-from typing import Dict, Set, Optional
+import math
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Set, Optional
 from datetime import datetime
 import numpy as np
 from .media_service import MediaService
+from .session_manager import SessionManager
 
 logger = logging.getLogger(__name__)
 
+# Binary frame message: type, sequence, unix timestamp, frequency (NaN if silent), then JPEG bytes
+FRAME_HEADER = struct.Struct('!BIdf')
+MESSAGE_FRAME = 1
+
+def pack_frame(jpeg: bytes, sequence: int, timestamp: float, frequency: Optional[float]) -> bytes:
+    """Build one binary frame message shared by every connection."""
+    header = FRAME_HEADER.pack(
+        MESSAGE_FRAME,
+        sequence & 0xFFFFFFFF,
+        timestamp,
+        math.nan if frequency is None else frequency
+    )
+    return header + jpeg
+
+class ClientConnection:
+    """One viewer's send queue, sender task and adaptive rate/quality controller.
+
+    Frames are offered without awaiting the socket; if the bounded queue is
+    full the oldest frame is dropped. Send latency and drops steer the
+    client's frame rate and JPEG quality level (lower quality first, then
+    frame rate), and recover once sends are fast again.
+    """
+
+    def __init__(self, websocket: WebSocket, config: dict, client_id: int):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.tier = config.get('DEFAULT_TIER', 'full')
+        self.quality_levels: List[int] = list(config.get('QUALITY_LEVELS', [70, 50, 35]))
+        self.min_fps = config.get('MIN_FPS', 2)
+        self.max_fps = config.get('MAX_FPS', 30)
+        self.slow_send_ms = config.get('SLOW_SEND_MS', 50)
+        self.fast_send_ms = config.get('FAST_SEND_MS', 15)
+        self.adapt_interval = config.get('ADAPT_INTERVAL', 1.0)
+
+        self.queue: deque = deque()
+        self.max_queue = config.get('CLIENT_QUEUE_SIZE', 2)
+        self._ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+        self.fps = float(self.max_fps)
+        self.quality_index = 0
+        self.send_ms: Optional[float] = None
+        self.last_offer = 0.0
+        self._last_adapt = time.monotonic()
+        self._drops_at_adapt = 0
+
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    @property
+    def quality(self) -> int:
+        return self.quality_levels[self.quality_index]
+
+    def wants_frame(self, now: float) -> bool:
+        return now - self.last_offer >= 1.0 / self.fps
+
+    def offer(self, payload: bytes, now: float):
+        """Queue a frame for this client, dropping the oldest if it is behind."""
+        if len(self.queue) >= self.max_queue:
+            self.queue.popleft()
+            self.frames_dropped += 1
+        self.queue.append(payload)
+        self.last_offer = now
+        self._ready.set()
+
+    async def run(self, on_error: Callable[[WebSocket], Awaitable[None]]):
+        """Sender loop: drain the queue to the socket, timing every send."""
+        try:
+            while True:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                payload = self.queue.popleft()
+                start = time.perf_counter()
+                await self.websocket.send_bytes(payload)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self.send_ms = elapsed_ms if self.send_ms is None else 0.8 * self.send_ms + 0.2 * elapsed_ms
+                self.frames_sent += 1
+                self._adapt()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending frame to client {self.client_id}: {e}")
+            await on_error(self.websocket)
+
+    def _adapt(self):
+        now = time.monotonic()
+        if now - self._last_adapt < self.adapt_interval:
+            return
+        dropped = self.frames_dropped - self._drops_at_adapt
+        self._last_adapt, self._drops_at_adapt = now, self.frames_dropped
+
+        if dropped or self.send_ms > self.slow_send_ms:
+            # Congested: cheaper frames first, then fewer of them
+            if self.quality_index < len(self.quality_levels) - 1:
+                self.quality_index += 1
+            else:
+                self.fps = max(self.min_fps, self.fps * 0.75)
+        elif self.send_ms < self.fast_send_ms:
+            if self.fps < self.max_fps:
+                self.fps = min(self.max_fps, self.fps + 2)
+            elif self.quality_index > 0:
+                self.quality_index -= 1
+
+    def stats(self) -> dict:
+        return {
+            'client_id': self.client_id,
+            'tier': self.tier,
+            'fps': round(self.fps, 1),
+            'quality': self.quality,
+            'send_ms': round(self.send_ms, 2) if self.send_ms is not None else None,
+            'queued': len(self.queue),
+            'frames_sent': self.frames_sent,
+            'frames_dropped': self.frames_dropped
+        }
+
 class StreamingService:
-    def __init__(self, media_service: MediaService):
+    def __init__(self, media_service: MediaService, config: Optional[dict] = None,
+                 frequency_source: Optional[Callable[[], Optional[float]]] = None,
+                 sessions: Optional[SessionManager] = None):
+        self.config = config or {}
         self.media_service = media_service
+        self.frequency_source = frequency_source
         self.active_connections: Set[WebSocket] = set()
-        self.active_sessions: Dict[str, dict] = {}
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.sessions = sessions or SessionManager({})
         self._stream_task: Optional[asyncio.Task] = None
+        self._next_client_id = 0
+        # JPEG encoding runs here so the event loop keeps serving sockets
+        self._encoder = ThreadPoolExecutor(max_workers=self.config.get('ENCODE_WORKERS', 2),
+                                           thread_name_prefix="stream-encode")
         
     async def connect(self, websocket: WebSocket):
         """Handle new WebSocket connection."""
         await websocket.accept()
+        self._next_client_id += 1
+        client = ClientConnection(websocket, self.config, self._next_client_id)
+        client.task = asyncio.create_task(client.run(self.disconnect))
+        self.clients[websocket] = client
         self.active_connections.add(websocket)
         logger.info(f"New client connected. Total connections: {len(self.active_connections)}")
         
     async def disconnect(self, websocket: WebSocket):
         """Handle WebSocket disconnection."""
-        self.active_connections.remove(websocket)
+        if websocket not in self.active_connections:
+            return
+        self.active_connections.discard(websocket)
+        client = self.clients.pop(websocket, None)
+        if client and client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
         logger.info(f"Client disconnected. Remaining connections: {len(self.active_connections)}")
         
         # If no more connections, stop streaming
@@ -34,35 +174,89 @@ class StreamingService:
             self._stream_task.cancel()
             self._stream_task = None
 
-    async def broadcast_frame(self, frame: np.ndarray):
-        """Broadcast frame to all connected clients."""
-        if not self.active_connections:
+    async def close(self):
+        """Stop streaming and drop every client (the encoder pool stays reusable)."""
+        if self._stream_task:
+            self._stream_task.cancel()
+            self._stream_task = None
+        for websocket in list(self.active_connections):
+            await self.disconnect(websocket)
+
+    @property
+    def tiers(self) -> Dict[str, Optional[int]]:
+        """Stream tiers by name, mapped to output height (None keeps the camera resolution)."""
+        return self.config.get('TIERS', {'full': None})
+
+    def set_tier(self, websocket: WebSocket, tier: str):
+        """Switch a client to another resolution tier."""
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown stream tier: {tier}")
+        client = self.clients.get(websocket)
+        if client:
+            client.tier = tier
+
+    def _encode_tier(self, frame: np.ndarray, height: Optional[int],
+                     qualities: List[int]) -> Dict[int, bytes]:
+        """Downscale once for a tier, then JPEG-encode at each requested quality."""
+        if height and height < frame.shape[0]:
+            scale = height / frame.shape[0]
+            width = round(frame.shape[1] * scale)
+            # INTER_AREA is needed against aliasing on heavy reductions but is
+            # several times slower than bilinear at fractional ratios like 2/3
+            interpolation = cv2.INTER_AREA if scale <= 0.5 else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, (width, height), interpolation=interpolation)
+        return {quality: self._encode(frame, quality) for quality in qualities}
+
+    def _encode(self, frame: np.ndarray, quality: int) -> bytes:
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return buffer.tobytes()
+
+    async def broadcast_frame(self, frame: np.ndarray, sequence: int = 0,
+                              timestamp: Optional[float] = None):
+        """Encode each tier/quality pair in use once and queue it for every due client."""
+        now = time.monotonic()
+        # Snapshot tier and quality now; either may change while encoding
+        due = [(client, client.tier, client.quality)
+               for client in self.clients.values() if client.wants_frame(now)]
+        if not due:
             return
 
         try:
-            # Encode frame as JPEG
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-            # Convert to base64
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-            
-            # Create message with frame data and timestamp
-            message = {
-                'type': 'frame',
-                'data': frame_base64,
-                'timestamp': datetime.now().isoformat()
+            loop = asyncio.get_running_loop()
+            # Only tiers with at least one due subscriber are scaled and encoded
+            wanted: Dict[str, Set[int]] = {}
+            for _, tier, quality in due:
+                wanted.setdefault(tier, set()).add(quality)
+            tiers = list(wanted)
+            encoded = await asyncio.gather(*(
+                loop.run_in_executor(self._encoder, self._encode_tier, frame,
+                                     self.tiers.get(tier), sorted(wanted[tier]))
+                for tier in tiers
+            ))
+            frequency = self.frequency_source() if self.frequency_source else None
+            timestamp = timestamp or time.time()
+            payloads = {
+                (tier, quality): pack_frame(jpeg, sequence, timestamp, frequency)
+                for tier, by_quality in zip(tiers, encoded)
+                for quality, jpeg in by_quality.items()
             }
             
-            # Broadcast to all clients
-            for connection in self.active_connections.copy():
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending frame to client: {e}")
-                    await self.disconnect(connection)
+            # Hand off to per-client sender tasks; a slow socket only drops its own frames
+            for client, tier, quality in due:
+                client.offer(payloads[(tier, quality)], now)
                     
         except Exception as e:
             logger.error(f"Error broadcasting frame: {e}")
 
+    def stats(self) -> dict:
+        """Per-client stream rate, quality and drop counters."""
+        return {
+            'connections': len(self.active_connections),
+            'clients': [client.stats() for client in self.clients.values()]
+        }
+
     async def start_stream(self):
         """Start the video stream."""
         if self._stream_task:
@@ -72,28 +266,32 @@ class StreamingService:
         logger.info("Stream started")
 
     async def _stream_loop(self):
-        """Main streaming loop."""
+        """Main streaming loop, paced by new frames from the shared camera reader."""
+        last_sequence = 0
         try:
             while self.active_connections:
-                if not self.media_service.camera:
+                frames = self.media_service.frames
+                if not frames or not frames.available:
                     await asyncio.sleep(1)
                     continue
                 
-                ret, frame = self.media_service.camera.read()
-                if not ret:
-                    logger.error("Failed to read camera frame")
-                    await asyncio.sleep(0.1)
+                # Wait for the next frame without blocking the event loop
+                if await asyncio.to_thread(frames.wait_for_frame, last_sequence, 1.0) is None:
+                    logger.error("No new camera frame")
                     continue
                 
-                # Add overlays if in session
-                if self.media_service.current_session:
-                    frame = self.media_service._add_overlay(frame)
-                    frame = self.media_service._add_watermark(frame)
-                
-                await self.broadcast_frame(frame)
-                
-                # Control frame rate
-                await asyncio.sleep(1/30)  # 30 FPS
+                with frames.acquire(after=last_sequence, timeout=0) as shared:
+                    if shared is None:
+                        continue
+                    last_sequence = shared.sequence
+                    frame = shared.image
+                    
+                    # Add overlays if in session (drawn on a private copy)
+                    if self.media_service.current_session:
+                        frame = self.media_service._add_overlay(frame.copy())
+                        frame = self.media_service._add_watermark(frame)
+                    
+                    await self.broadcast_frame(frame, shared.sequence, shared.timestamp)
                 
         except asyncio.CancelledError:
             logger.info("Stream loop cancelled")
@@ -107,31 +305,44 @@ class StreamingService:
         try:
             msg_type = message.get('type')
             
-            if msg_type == 'start_session':
+            if msg_type == 'subscribe':
+                # Normally the first message: pick the resolution tier for this client
+                tier = message.get('tier', self.config.get('DEFAULT_TIER', 'full'))
+                self.set_tier(websocket, tier)
+                await websocket.send_json({
+                    'type': 'subscribed',
+                    'tier': tier,
+                    'tiers': list(self.tiers)
+                })
+                
+            elif msg_type == 'start_session':
                 frequency = message.get('frequency')
                 duration = message.get('duration', 20.0)
                 
                 # Start new session
-                session = await self.media_service.start_session(frequency, duration)
+                session = await asyncio.to_thread(self.sessions.start, frequency, duration=duration)
                 
                 # Notify all clients
                 await self.broadcast_session_status({
                     'type': 'session_started',
-                    'session_id': session['id'],
+                    'session_id': session['session_id'],
                     'frequency': frequency,
                     'duration': duration
                 })
                 
             elif msg_type == 'stop_session':
-                if self.media_service.current_session:
-                    # Capture final image
-                    image_path = await self.media_service.capture_image()
+                # Only the session named: another kiosk's may be running
+                session = self.sessions.get(message.get('session_id'))
+                if session is None:
+                    await websocket.send_json({'type': 'error', 'message': 'Session not found or expired'})
+                else:
+                    session = await asyncio.to_thread(self.sessions.stop, session['session_id'])
                     
                     # Notify clients
                     await self.broadcast_session_status({
                         'type': 'session_completed',
-                        'session_id': self.media_service.current_session['id'],
-                        'image_path': str(image_path)
+                        'session_id': session['session_id'],
+                        'image_path': session.get('image_path')
                     })
                     
             elif msg_type == 'audio_sync':
@@ -152,7 +363,7 @@ class StreamingService:
 
     async def broadcast_session_status(self, status: dict):
         """Broadcast session status to all clients."""
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
                 await connection.send_json(status)
             except Exception as e:
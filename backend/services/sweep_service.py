@@ -0,0 +1,247 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Union
+from datetime import datetime
+import asyncio
+import logging
+import uuid
+import numpy as np
+from .audio_stream import AudioStreamer
+
+logger = logging.getLogger(__name__)
+
+SWEEP_MODES = ("linear", "log", "stepped")
+
+
+class SweepPlan:
+    """Frequency schedule for one sweep session.
+
+    ``linear`` and ``log`` are continuous chirps from ``start_frequency`` to
+    ``end_frequency`` over ``duration`` seconds. ``stepped`` holds each of
+    ``frequencies`` for its dwell time; when no list is given, ``steps``
+    log-spaced frequencies between the start and end are used.
+    """
+
+    def __init__(self, mode: str, start_frequency: Optional[float] = None,
+                 end_frequency: Optional[float] = None, duration: Optional[float] = None,
+                 frequencies: Optional[Sequence[float]] = None,
+                 dwell: Optional[Union[float, Sequence[float]]] = None,
+                 steps: Optional[int] = None):
+        if mode not in SWEEP_MODES:
+            raise ValueError(f"Unknown sweep mode: {mode}")
+        self.mode = mode
+
+        if mode == "stepped":
+            if frequencies is None:
+                if start_frequency is None or end_frequency is None or not steps:
+                    raise ValueError("Stepped sweeps need frequencies or start/end frequency and steps")
+                frequencies = np.geomspace(start_frequency, end_frequency, steps)
+            self.frequencies = np.asarray(frequencies, dtype=np.float64)
+            if self.frequencies.size == 0:
+                raise ValueError("Stepped sweeps need at least one frequency")
+            if dwell is None:
+                if duration is None:
+                    raise ValueError("Stepped sweeps need a dwell time or total duration")
+                dwell = duration / self.frequencies.size
+            self.dwell = np.broadcast_to(np.asarray(dwell, dtype=np.float64),
+                                         self.frequencies.shape).copy()
+            if (self.dwell <= 0).any():
+                raise ValueError("Dwell times must be positive")
+            self.step_ends = np.cumsum(self.dwell)
+            self.step_starts = self.step_ends - self.dwell
+            self.duration = float(self.step_ends[-1])
+            self.start_frequency = float(self.frequencies[0])
+            self.end_frequency = float(self.frequencies[-1])
+        else:
+            if start_frequency is None or end_frequency is None or not duration:
+                raise ValueError("Chirps need start_frequency, end_frequency and duration")
+            self.start_frequency = float(start_frequency)
+            self.end_frequency = float(end_frequency)
+            self.duration = float(duration)
+
+        if min(self.start_frequency, self.end_frequency) <= 0:
+            raise ValueError("Frequencies must be positive")
+
+    def frequency_at(self, seconds: Union[float, np.ndarray]) -> np.ndarray:
+        """Instantaneous frequency at ``seconds`` from the start (vectorized, clamped to the plan)."""
+        t = np.clip(np.asarray(seconds, dtype=np.float64), 0.0, self.duration)
+        if self.mode == "stepped":
+            index = np.minimum(np.searchsorted(self.step_ends, t, side='right'),
+                               self.frequencies.size - 1)
+            return self.frequencies[index]
+        progress = t / self.duration
+        if self.mode == "log":
+            return self.start_frequency * (self.end_frequency / self.start_frequency) ** progress
+        return self.start_frequency + (self.end_frequency - self.start_frequency) * progress
+
+    def capture_times(self, interval: float, settle_fraction: float) -> np.ndarray:
+        """Seconds at which to grab a frame: once per settled step, or every ``interval`` of a chirp."""
+        if self.mode == "stepped":
+            return self.step_starts + self.dwell * settle_fraction
+        return np.arange(0.0, self.duration + 1e-9, interval)
+
+    def retune_times(self, interval: float) -> np.ndarray:
+        """Seconds at which a fixed-tone output must be retuned to follow the plan."""
+        if self.mode == "stepped":
+            return self.step_starts
+        return np.arange(0.0, self.duration, interval)
+
+    def to_dict(self) -> dict:
+        plan = {
+            'mode': self.mode,
+            'start_frequency': self.start_frequency,
+            'end_frequency': self.end_frequency,
+            'duration': self.duration
+        }
+        if self.mode == "stepped":
+            plan['frequencies'] = self.frequencies.tolist()
+            plan['dwell'] = self.dwell.tolist()
+        return plan
+
+
+class SweepService:
+    """Runs sweep plans as server-side scheduler tasks.
+
+    When an ``AudioStreamer`` is given the plan is handed over as a per-sample
+    trajectory, so audio is generated incrementally block by block. Otherwise
+    ``play_tone`` is called in a worker thread at every step, and a chirp is
+    held as a staircase of tones ``SWEEP_RETUNE_INTERVAL`` apart, since each
+    new looped tone is synthesized and restarts the mixer. Frames are captured
+    along the way via ``capture_frame`` and tagged with the frequency playing.
+    """
+
+    def __init__(self, config,
+                 play_tone: Callable[[float, str, float], None],
+                 capture_frame: Callable[[float, str, int], Awaitable[dict]],
+                 streamer: Optional[AudioStreamer] = None,
+                 frequency_range: Optional[tuple] = None):
+        self.config = config
+        self.play_tone = play_tone
+        self.capture_frame = capture_frame
+        self.streamer = streamer
+        self.frequency_range = frequency_range
+        self.max_duration = config.get('MAX_DURATION', 60)
+        self.capture_interval = config.get('SWEEP_CAPTURE_INTERVAL', 0.5)
+        self.retune_interval = config.get('SWEEP_RETUNE_INTERVAL', 0.5)
+        self.settle_fraction = config.get('SWEEP_SETTLE_FRACTION', 0.8)
+        self.history = config.get('SWEEP_HISTORY', 100)
+
+        self.sweeps: "OrderedDict[str, dict]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def validate(self, plan: SweepPlan):
+        """Reject plans longer than a session or outside the audible range."""
+        if plan.duration > self.max_duration:
+            raise ValueError(f"Sweep duration {plan.duration:.1f}s exceeds the "
+                             f"{self.max_duration}s session limit")
+        if self.frequency_range:
+            low, high = self.frequency_range
+            frequencies = plan.frequencies if plan.mode == "stepped" else \
+                [plan.start_frequency, plan.end_frequency]
+            if min(frequencies) < low or max(frequencies) > high:
+                raise ValueError(f"Sweep frequencies must be between {low}Hz and {high}Hz")
+
+    async def start(self, plan: SweepPlan, waveform: str = "sine", volume: float = 0.9,
+                    capture_interval: Optional[float] = None) -> dict:
+        """Schedule a sweep, cancelling any sweep already driving the audio output."""
+        self.validate(plan)
+        await self.stop_all()
+
+        sweep_id = uuid.uuid4().hex[:12]
+        sweep = {
+            'sweep_id': sweep_id,
+            'status': 'running',
+            'plan': plan.to_dict(),
+            'waveform': waveform,
+            'volume': volume,
+            'start_time': datetime.now(),
+            'current_frequency': plan.start_frequency,
+            'captures': []
+        }
+        self.sweeps[sweep_id] = sweep
+        while len(self.sweeps) > self.history:
+            self.sweeps.popitem(last=False)
+        self._tasks[sweep_id] = asyncio.create_task(
+            self._run(sweep, plan, capture_interval or self.capture_interval)
+        )
+        logger.info(f"Sweep {sweep_id} started: {plan.mode} "
+                    f"{plan.start_frequency}-{plan.end_frequency}Hz over {plan.duration}s")
+        return sweep
+
+    async def stop(self, sweep_id: str) -> Optional[dict]:
+        """Cancel a running sweep; returns its final state."""
+        task = self._tasks.pop(sweep_id, None)
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        return self.sweeps.get(sweep_id)
+
+    async def stop_all(self):
+        """Cancel every running sweep."""
+        for sweep_id in list(self._tasks):
+            await self.stop(sweep_id)
+
+    def get(self, sweep_id: str) -> Optional[dict]:
+        return self.sweeps.get(sweep_id)
+
+    async def _run(self, sweep: dict, plan: SweepPlan, capture_interval: float):
+        loop = asyncio.get_running_loop()
+        streaming = self.streamer is not None
+
+        # Merge retunes and captures into one timeline (retune first on ties)
+        events: List[tuple] = [(t, 1, 'capture') for t in
+                               plan.capture_times(capture_interval, self.settle_fraction)]
+        if not streaming:
+            events += [(t, 0, 'retune') for t in plan.retune_times(self.retune_interval)]
+        events.sort()
+
+        try:
+            if streaming:
+                self.streamer.set_params(volume=sweep['volume'], waveform=sweep['waveform'])
+                self.streamer.set_trajectory(plan.frequency_at)
+                self.streamer.start()
+            start = loop.time()
+
+            for t, _, kind in events:
+                delay = start + t - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if kind == 'retune':
+                    # Synthesizing a tone and restarting the mixer would stall the event loop
+                    frequency = float(plan.frequency_at(t))
+                    await asyncio.to_thread(self.play_tone, frequency, sweep['waveform'], sweep['volume'])
+                else:
+                    elapsed = loop.time() - start
+                    # A held tone plays the frequency of its step, not the plan's at this instant
+                    frequency = float(plan.frequency_at(elapsed)) if streaming else sweep['current_frequency']
+                    index = len(sweep['captures'])
+                    result = await self.capture_frame(frequency, sweep['sweep_id'], index)
+                    sweep['captures'].append({
+                        'index': index,
+                        'time': round(elapsed, 4),
+                        'frequency': round(frequency, 3),
+                        **(result or {})
+                    })
+                sweep['current_frequency'] = frequency
+
+            remaining = start + plan.duration - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            sweep['status'] = 'completed'
+            logger.info(f"Sweep {sweep['sweep_id']} completed with {len(sweep['captures'])} captures")
+        except asyncio.CancelledError:
+            sweep['status'] = 'stopped'
+            raise
+        except Exception as e:
+            sweep['status'] = 'failed'
+            sweep['error'] = str(e)
+            logger.error(f"Sweep {sweep['sweep_id']} failed: {e}")
+        finally:
+            sweep['end_time'] = datetime.now()
+            if streaming:
+                # Hold the last frequency reached once the trajectory ends
+                self.streamer.set_trajectory(None)
+                self.streamer.set_params(frequency=sweep['current_frequency'])
+            self._tasks.pop(sweep['sweep_id'], None)
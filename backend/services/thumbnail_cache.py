@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+import hashlib
+import logging
+import os
+import threading
+import cv2
+import numpy as np
+from .capture_service import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# JPEG decoding can scale by 1/2, 1/4 or 1/8 while decoding, far cheaper than a full decode
+REDUCED_READS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                 (2, cv2.IMREAD_REDUCED_COLOR_2), (1, cv2.IMREAD_COLOR))
+
+DIGEST_MEMORY = 50000  # source files whose content hash is remembered
+
+
+class ThumbnailCache:
+    """Small JPEG renditions of captures, generated once and kept on disk.
+
+    Thumbnails are named after a hash of the source file's content, so a
+    capture is only decoded the first time it is asked for (or after it
+    changes), and the hash doubles as the HTTP ETag. The cache directory is
+    capped at ``THUMBNAIL_CACHE_BYTES``; the least recently used thumbnails
+    are deleted first.
+    """
+
+    def __init__(self, config, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.width = config.get('THUMBNAIL_WIDTH', 320)
+        self.quality = config.get('THUMBNAIL_QUALITY', 80)
+        self.max_bytes = config.get('THUMBNAIL_CACHE_BYTES', 256 * 1024 * 1024)
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # filename -> bytes, oldest first
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()  # (path, mtime, size) -> hash
+        self._source_width: Optional[int] = None  # learned from the first full decode
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _scan(self):
+        """Index thumbnails left by a previous run, least recently written first."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".jpg") and not entry.name.startswith("."):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.cache_dir / name)
+            except FileNotFoundError:
+                pass
+
+    def _digest(self, source: Path) -> Tuple[str, Optional[bytes]]:
+        """Content hash of ``source``, plus its bytes if they had to be read."""
+        stat = source.stat()
+        key = (str(source), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                return digest, None
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        with self._lock:
+            self._digests[key] = digest
+            if len(self._digests) > DIGEST_MEMORY:
+                self._digests.popitem(last=False)
+        return digest, data
+
+    def _name(self, digest: str) -> str:
+        return f"{digest}_w{self.width}q{self.quality}.jpg"
+
+    def etag(self, source: Path) -> str:
+        """Strong ETag for the thumbnail of ``source`` (hashes the file on first use)."""
+        digest, _ = self._digest(source)
+        return f'"{digest}-{self.width}"'
+
+    def get(self, source: Path) -> Tuple[Path, str]:
+        """Path and ETag of the thumbnail of ``source``, generating it if needed (blocking)."""
+        digest, data = self._digest(source)
+        name = self._name(digest)
+        path = self.cache_dir / name
+        with self._lock:
+            if name in self._entries and path.exists():
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return path, f'"{digest}-{self.width}"'
+            self.misses += 1
+
+        encoded = self.render(data if data is not None else source.read_bytes())
+        write_atomic(path, encoded, fsync=False)  # a lost thumbnail is simply regenerated
+        with self._lock:
+            self.total_bytes += encoded.size - self._entries.pop(name, 0)
+            self._entries[name] = encoded.size
+            self._evict()
+        return path, f'"{digest}-{self.width}"'
+
+    def render(self, data: bytes) -> np.ndarray:
+        """Encode a ``THUMBNAIL_WIDTH`` wide JPEG from the bytes of a JPEG capture."""
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        image = None
+        if self._source_width:
+            # Let the JPEG decoder do most of the downscaling
+            for factor, flag in REDUCED_READS:
+                if self._source_width // factor >= self.width:
+                    image = cv2.imdecode(buffer, flag)
+                    break
+        if image is None or image.shape[1] < min(self.width, self._source_width or 0):
+            image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)  # first image, or a smaller source
+            if image is None:
+                raise ValueError("Capture is not a readable image")
+            self._source_width = image.shape[1]
+
+        height, width = image.shape[:2]
+        if width > self.width:
+            image = cv2.resize(image, (self.width, max(1, round(height * self.width / width))),
+                               interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("Thumbnail encoding failed")
+        return encoded
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,210 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+import cv2
+import numpy as np
+from .camera_service import CameraReader
+
+logger = logging.getLogger(__name__)
+
+
+class RecorderBusy(Exception):
+    """Raised when a recording is requested while another one is running."""
+
+
+class VideoRecorder:
+    """Writes the shared camera frames of one experiment session to a video file.
+
+    A feeder thread copies each due camera frame into one of a few
+    preallocated buffers and queues it. A dedicated writer thread drains that
+    bounded queue into ``cv2.VideoWriter`` (``VIDEO_CODEC`` at ``VIDEO_FPS``).
+    When the writer falls behind, new frames are dropped and counted instead
+    of stalling the camera reader or the live stream. Gaps are filled by
+    repeating the previous frame, so the video keeps real time.
+    """
+
+    def __init__(self, config, camera_reader: CameraReader, output_dir: Path,
+                 url_prefix: str = "/static/captures"):
+        self.camera_reader = camera_reader
+        self.output_dir = Path(output_dir)
+        self.url_prefix = url_prefix
+        self.codec = config.get('VIDEO_CODEC', 'mp4v')
+        self.fps = config.get('VIDEO_FPS', 30)
+        self.queue_size = config.get('RECORD_QUEUE_SIZE', 8)
+        self.nice = config.get('RECORD_NICE', 10)
+
+        self.recordings: Dict[str, dict] = {}
+        self.current: Optional[dict] = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    @property
+    def recording(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, session_id: Optional[str] = None, duration: Optional[float] = None) -> dict:
+        """Start recording; stops by itself after ``duration`` seconds if given."""
+        if self.recording:
+            raise RecorderBusy("A session is already being recorded")
+        frame = self.camera_reader.latest()
+        if frame is None:
+            raise RuntimeError("Camera not available")
+
+        recording_id = uuid.uuid4().hex[:12]
+        now = datetime.now()
+        filename = f"session_{session_id or 'none'}_{now:%Y%m%d_%H%M%S}_{recording_id}.mp4"
+        record = {
+            'recording_id': recording_id,
+            'session_id': session_id,
+            'state': 'recording',
+            'filename': filename,
+            'url': f"{self.url_prefix}/{filename}",
+            'fps': self.fps,
+            'duration_limit': duration,
+            'start_time': now,
+            'frames_written': 0,
+            'frames_dropped': 0,
+            'frames_repeated': 0,
+            'max_queue': 0
+        }
+
+        path = self.output_dir / filename
+        temp_path = path.with_name(f".{path.stem}.tmp{path.suffix}")
+        height, width = frame.image.shape[:2]
+        writer = cv2.VideoWriter(str(temp_path), cv2.VideoWriter_fourcc(*self.codec),
+                                 self.fps, (width, height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open video writer for codec {self.codec}")
+
+        # The pool bounds the queue: one buffer being filled, one held for gap
+        # filling, the rest queued for the writer
+        free: "queue.Queue[np.ndarray]" = queue.Queue()
+        for _ in range(self.queue_size + 2):
+            free.put(np.empty_like(frame.image))
+        work: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+        self._stop.clear()
+        self.current = record
+        self.recordings[recording_id] = record
+        self._threads = [
+            threading.Thread(target=self._feed, args=(record, free, work, duration),
+                             name="record-feed", daemon=True),
+            threading.Thread(target=self._write, args=(record, writer, free, work, temp_path, path),
+                             name="record-write", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Recording session {session_id} to {filename}")
+        return record
+
+    def stop(self, timeout: float = 5.0) -> Optional[dict]:
+        """Stop recording and wait until the file is finalized (blocking).
+
+        Also collects a recording that already ended on its own; returns None
+        once the current recording has been collected.
+        """
+        record = self.current
+        if record is None:
+            return None
+        start = time.perf_counter()
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        record['finalize_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self.current = None
+        return record
+
+    def get(self, recording_id: str) -> Optional[dict]:
+        return self.recordings.get(recording_id)
+
+    def _feed(self, record: dict, free: queue.Queue, work: queue.Queue, duration: Optional[float]):
+        reader = self.camera_reader
+        deadline = time.monotonic() + duration if duration else None
+        last_sequence = reader.sequence - 1
+        first_timestamp = None
+        next_slot = 0
+        try:
+            while not self._stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                with reader.acquire(after=last_sequence, timeout=0.1) as frame:
+                    if frame is None:
+                        continue
+                    last_sequence = frame.sequence
+                    if first_timestamp is None:
+                        first_timestamp = frame.timestamp
+                    slot = int(round((frame.timestamp - first_timestamp) * self.fps))
+                    if slot < next_slot:
+                        continue  # camera runs faster than the video
+                    try:
+                        buffer = free.get_nowait()
+                    except queue.Empty:
+                        record['frames_dropped'] += 1  # writer is behind
+                        continue
+                    np.copyto(buffer, frame.image)
+                work.put((slot, buffer))
+                record['max_queue'] = max(record['max_queue'], work.qsize())
+                next_slot = slot + 1
+        except Exception as e:
+            logger.error(f"Recording feed error: {e}")
+            record['error'] = str(e)
+        finally:
+            work.put(None)
+
+    def _write(self, record: dict, writer, free: queue.Queue, work: queue.Queue,
+               temp_path: Path, path: Path):
+        previous = None
+        written = 0
+        if self.nice and hasattr(os, 'setpriority'):
+            # Linux niceness is per thread: let the live stream win the CPU
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError as e:
+                logger.warning(f"Could not lower recording writer priority: {e}")
+        try:
+            while True:
+                item = work.get()
+                if item is None:
+                    break
+                slot, buffer = item
+                if previous is not None:
+                    while written < slot:
+                        writer.write(previous)
+                        written += 1
+                        record['frames_repeated'] += 1
+                    free.put(previous)
+                writer.write(buffer)
+                written = slot + 1
+                record['frames_written'] = written
+                previous = buffer
+            writer.release()
+            os.replace(temp_path, path)
+            record['duration'] = round(written / self.fps, 3)
+            record['size'] = path.stat().st_size
+            record['state'] = 'failed' if record.get('error') else 'saved'
+        except Exception as e:
+            writer.release()
+            record['state'] = 'failed'
+            record['error'] = str(e)
+            logger.error(f"Recording write error: {e}")
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+            record['end_time'] = datetime.now()
+            logger.info(f"Recording {record['recording_id']} {record['state']}: "
+                        f"{record['frames_written']} frames, {record['frames_dropped']} dropped, "
+                        f"{record['frames_repeated']} repeated")
+
+    def stats(self) -> dict:
+        record = self.current
+        return {
+            'recording': self.recording,
+            'current': None if record is None else {
+                key: record[key] for key in ('recording_id', 'session_id', 'state', 'frames_written',
+                                             'frames_dropped', 'frames_repeated', 'max_queue')
+            }
+        }
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+import threading
+import logging
+import numpy as np
+from .audio_engine import AudioEngine
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[float, str, float, int]
+
+
+def loop_length(frequency: float, sample_rate: int, min_samples: int = 1,
+                max_samples: Optional[int] = None, tolerance_hz: float = 0.01) -> Tuple[int, int]:
+    """Find the shortest buffer holding a whole number of cycles.
+
+    Returns ``(n_samples, n_cycles)``. The tone actually played is
+    ``n_cycles * sample_rate / n_samples``, which is within ``tolerance_hz``
+    of the requested frequency whenever such a buffer fits in ``max_samples``;
+    otherwise the closest candidate is used.
+    """
+    if frequency <= 0:
+        raise ValueError("Frequency must be positive")
+    max_samples = max_samples or sample_rate
+    max_cycles = max(1, int(frequency * max_samples / sample_rate))
+
+    cycles = np.arange(1, max_cycles + 1)
+    samples = np.rint(cycles * sample_rate / frequency)
+    samples[samples < 1] = 1
+    error = np.abs(cycles * sample_rate / samples - frequency)
+
+    valid = (samples >= min_samples) & (samples <= max_samples) & (error <= tolerance_hz)
+    if valid.any():
+        idx = int(np.argmax(valid))
+    else:
+        # Nothing within tolerance, take the most accurate length that fits
+        error = np.where(samples <= max_samples, error, np.inf)
+        idx = int(np.argmin(error))
+    return int(samples[idx]), int(cycles[idx])
+
+
+class WaveformCache:
+    """LRU cache of looped tone buffers keyed by (frequency, waveform, volume, sample rate).
+
+    Entries hold the int16 sample array and, when a ``sound_factory`` is given,
+    the object built from it (e.g. ``pygame.sndarray.make_sound``), so a cache
+    hit skips both synthesis and mixer upload.
+    """
+
+    def __init__(self, config, sound_factory: Optional[Callable[[np.ndarray], object]] = None,
+                 engine: Optional[AudioEngine] = None):
+        self.engine = engine or AudioEngine(config)
+        self.sample_rate = config.get('SAMPLE_RATE', 44100)
+        self.channels = config.get('CHANNELS', 2)
+        self.min_samples = config.get('BUFFER', 512)
+        self.max_samples = int(self.sample_rate * config.get('LOOP_MAX_SECONDS', 2.0))
+        self.tolerance_hz = config.get('LOOP_TOLERANCE_HZ', 0.01)
+        self.max_bytes = config.get('CACHE_MAX_BYTES', 64 * 1024 * 1024)
+        self.sound_factory = sound_factory
+
+        self._entries: "OrderedDict[CacheKey, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, frequency: float, waveform: str, volume: float,
+                 sample_rate: Optional[int] = None) -> CacheKey:
+        """Normalize request parameters into a cache key."""
+        return (round(float(frequency), 3), waveform, round(float(volume), 3),
+                int(sample_rate or self.sample_rate))
+
+    def get(self, frequency: float, waveform: str, volume: float,
+            sample_rate: Optional[int] = None) -> np.ndarray:
+        """Return the looped sample buffer, synthesizing it on a miss."""
+        return self._lookup(self.make_key(frequency, waveform, volume, sample_rate))[0]
+
+    def get_sound(self, frequency: float, waveform: str, volume: float,
+                  sample_rate: Optional[int] = None):
+        """Return the playable sound object for the tone, building it on a miss."""
+        if self.sound_factory is None:
+            raise RuntimeError("WaveformCache was created without a sound_factory")
+        return self._lookup(self.make_key(frequency, waveform, volume, sample_rate))[1]
+
+    def _lookup(self, key: CacheKey) -> tuple:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._build(key)
+        size = self._entry_size(entry)
+
+        with self._lock:
+            if key in self._entries:
+                # Another caller built the same tone concurrently
+                return self._entries[key]
+            if size > self.max_bytes:
+                logger.warning(f"Waveform {key} ({size} bytes) exceeds cache capacity; not cached")
+                return entry
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._entry_size(evicted)
+                self.evictions += 1
+        return entry
+
+    def _build(self, key: CacheKey) -> tuple:
+        frequency, waveform, volume, sample_rate = key
+        n_samples, n_cycles = loop_length(
+            frequency, sample_rate,
+            min_samples=self.min_samples,
+            max_samples=self.max_samples,
+            tolerance_hz=self.tolerance_hz
+        )
+        # Whole cycles per buffer make the band-limited waveform periodic too;
+        # the frequency is given in engine units so only cycles/sample matters
+        samples = np.empty((n_samples, self.channels), dtype=np.int16)
+        self.engine.render(n_cycles * self.engine.sample_rate / n_samples, waveform, n_samples,
+                           volume=volume, out=samples)
+        sound = self.sound_factory(samples) if self.sound_factory else None
+        return samples, sound
+
+    def _entry_size(self, entry: tuple) -> int:
+        samples, sound = entry
+        # A mixer-side sound holds its own copy of the samples
+        return samples.nbytes * (2 if sound is not None else 1)
+
+    def clear(self):
+        """Drop all cached buffers."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and memory usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.config.settings import AUDIO_CONFIG
+from backend.services.audio_engine import AudioEngine, WAVEFORMS, QUALITY_LEVELS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def bench_render(block_size: int, frequency: float = 440.0, repeats: int = 50) -> dict:
+    """Measure samples/sec per waveform and quality level for one block size."""
+    engine = AudioEngine(AUDIO_CONFIG)
+    out = np.empty((block_size, AUDIO_CONFIG['CHANNELS']), dtype=np.int16)
+    results = {}
+    for quality in QUALITY_LEVELS:
+        for waveform in WAVEFORMS:
+            phase = 0.0
+            engine.render(frequency, waveform, block_size, quality=quality, out=out)  # warm up
+            start = time.perf_counter()
+            for _ in range(repeats):
+                _, phase = engine.render(frequency, waveform, block_size, phase=phase,
+                                         quality=quality, out=out)
+            elapsed = time.perf_counter() - start
+            results[(quality, waveform)] = block_size * repeats / elapsed
+    return results
+
+def run_benchmarks():
+    for block_size in (AUDIO_CONFIG['BUFFER'], AUDIO_CONFIG['SAMPLE_RATE']):
+        logger.info(f"Block size {block_size} samples")
+        for (quality, waveform), rate in bench_render(block_size).items():
+            realtime = rate / AUDIO_CONFIG['SAMPLE_RATE']
+            print(f"{block_size:>6} {quality:>9} {waveform:>9}: "
+                  f"{rate / 1e6:8.2f} Msamples/s ({realtime:7.1f}x realtime)")
+
+if __name__ == "__main__":
+    run_benchmarks()
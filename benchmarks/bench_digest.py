@@ -0,0 +1,81 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import tempfile
+import threading
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.services.db_writer import DatabaseWriter
+from backend.services.digest import contact_sheet
+from backend.services.outbox import Outbox
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SMTP_LATENCY = 0.05  # seconds per message on the wire
+
+def stacked_transpose(images, columns: int, gap: int = 4) -> np.ndarray:
+    """Alternative: stack padded tiles, then lay them out with one reshape and transpose"""
+    height, width = images[0].shape[:2]
+    rows = -(-len(images) // columns)
+    tiles = np.full((rows * columns, height + gap, width + gap, 3), 255, dtype=np.uint8)
+    tiles[:len(images), :height, :width] = np.stack(images)
+    sheet = tiles.reshape(rows, columns, height + gap, width + gap, 3).swapaxes(1, 2)
+    return sheet.reshape(rows * (height + gap), columns * (width + gap), 3)[:-gap, :-gap]
+
+def bench_contact_sheet(count: int = 20, repeat: int = 200):
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (180, 320, 3), dtype=np.uint8) for _ in range(count)]
+    assert np.array_equal(stacked_transpose(images, 4), contact_sheet(images, 4))
+    for name, tile in (("stack + transpose", stacked_transpose), ("cell slice copies", contact_sheet)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            tile(images, 4)
+        print(f"contact sheet of {count} 320px tiles, {name:17}: "
+              f"{(time.perf_counter() - start) / repeat * 1000:.2f} ms")
+
+def bench_outbox(visitors: int = 10, captures: int = 8, window: float = 0.5):
+    print(f"{visitors} visitors x {captures} captures, {SMTP_LATENCY * 1000:.0f} ms per SMTP message")
+    for channel, delay in (('email', 0.0), ('digest', window)):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = create_db_engine(f"sqlite:///{Path(temp_dir) / 'bench.db'}")
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            writer = DatabaseWriter({'DB_FLUSH_INTERVAL': 0.01}, session_factory)
+            sent, lock = [], threading.Lock()
+            def deliver(message):
+                time.sleep(SMTP_LATENCY)
+                with lock:
+                    sent.append(message)
+            outbox = Outbox({'WORKERS': 2, 'POLL_INTERVAL': 0.05}, session_factory, writer.submit,
+                            {'email': deliver, 'digest': deliver}, coalesce=['digest'])
+            outbox.start()
+            start = time.perf_counter()
+            futures = [outbox.enqueue(channel, f"visitor{v}@example.com", f"- Frequency: {100 + c}Hz", delay=delay)
+                       for c in range(captures) for v in range(visitors)]
+            for future in futures:
+                future.result(10)
+            while outbox.stats()['sent'] < (visitors * captures if channel == 'email' else visitors) \
+                    or outbox.stats()['in_flight']:
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            outbox.close()
+            writer.close()
+            engine.dispose()
+            busy = len(sent) * SMTP_LATENCY
+            label = "one email per capture (before)" if channel == 'email' else f"digest, {window}s window (after)"
+            print(f"{label:32}: {len(sent):3d} SMTP messages, {busy:.2f}s of SMTP time, "
+                  f"done {elapsed:.2f}s after the first capture")
+
+if __name__ == "__main__":
+    bench_contact_sheet()
+    bench_outbox()
@@ -0,0 +1,67 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config.settings import AUDIO_CONFIG
+from backend.database.database import Base
+from backend.database.models import Recording
+from backend.services.frequency_coverage import FrequencyCoverage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def naive_suggest(frequencies, low, high):
+    """Previous approach: sort everything, then scan for the widest gap"""
+    used = sorted(set(frequencies))
+    best, best_gap = (low + high) / 2, 0
+    for a, b in zip([low, *used], [*used, high]):
+        if b - a > best_gap:
+            best, best_gap = (a + b) / 2, b - a
+    return best
+
+def timed(fn, *args, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+def bench_frequency_coverage(recordings: int = 300_000, db_path: str = ":memory:"):
+    rng = np.random.default_rng(0)
+    low, high = AUDIO_CONFIG['MIN_FREQUENCY'], AUDIO_CONFIG['MAX_FREQUENCY']
+    frequencies = np.round(rng.uniform(low, high, recordings), 1)
+    # Leave one wide untested band so the suggestion is unambiguous
+    band = (low + 0.6 * (high - low), low + 0.62 * (high - low))
+    frequencies = frequencies[(frequencies < band[0]) | (frequencies > band[1])].tolist()
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(Recording.__table__.insert(), [{'frequency': f} for f in frequencies])
+    Session = sessionmaker(bind=engine)
+
+    coverage = FrequencyCoverage(AUDIO_CONFIG)
+    _, load_ms = timed(coverage.load_from_db, Session)
+    used, used_ms = timed(coverage.used, repeat=20)
+    suggested, suggest_ms = timed(coverage.suggest, repeat=1000)
+    _, add_ms = timed(coverage.add, sum(band) / 2, repeat=1)
+    _, naive_ms = timed(naive_suggest, frequencies, low, high, repeat=3)
+
+    print(f"{len(frequencies)} recordings, {len(used)} distinct frequencies")
+    print(f"load from db:    {load_ms:9.2f} ms (once at startup)")
+    print(f"used():          {used_ms:9.3f} ms")
+    print(f"suggest():       {suggest_ms * 1000:9.2f} us -> {suggested} Hz")
+    print(f"add():           {add_ms * 1000:9.2f} us")
+    print(f"sort-and-scan:   {naive_ms:9.2f} ms per suggestion -> "
+          f"{naive_suggest(frequencies, low, high):.1f} Hz")
+
+if __name__ == "__main__":
+    bench_frequency_coverage()
@@ -0,0 +1,76 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import tempfile
+import tracemalloc
+import cv2
+import numpy as np
+
+from backend.config.settings import MEDIA_CONFIG
+from backend.services.email_service import compose_email
+from backend.services.notification_media import NotificationMedia
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def make_media(directory: Path):
+    """A 4K still of sand-like noise and a 10 second 720p session video"""
+    rng = np.random.default_rng(0)
+    still = directory / "capture_4k.jpg"
+    cv2.imwrite(str(still), rng.integers(0, 256, (2160, 3840, 3), dtype=np.uint8),
+                [cv2.IMWRITE_JPEG_QUALITY, MEDIA_CONFIG['IMAGE_QUALITY']])
+    video = directory / "session.mp4"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*'mp4v'), 30, (1280, 720))
+    base = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    for i in range(10 * 30):
+        writer.write(np.roll(base, i * 7, axis=1))
+    writer.release()
+    return still, video
+
+def measure(recipients: int, message_for) -> str:
+    start = time.perf_counter()
+    sizes = []
+    for i in range(recipients):
+        sizes.append(len(message_for(f"visitor{i}@example.com").as_bytes()))
+    elapsed = time.perf_counter() - start
+    # Peak memory of one more message, traced separately since tracing slows everything down
+    tracemalloc.start()
+    message_for("traced@example.com").as_bytes()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (f"{elapsed / recipients * 1000:7.1f} ms/message, {np.mean(sizes) / 1e6:6.2f} MB/message, "
+            f"peak {peak / 1e6:6.1f} MB")
+
+def bench_notification_media(recipients: int = 10):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        still, video = make_media(directory)
+        print(f"still {still.stat().st_size / 1e6:.1f} MB, video {video.stat().st_size / 1e6:.1f} MB, "
+              f"{recipients} recipients")
+        attachments = [[str(still), still.name], [str(video), video.name]]
+
+        # Before: both originals read and encoded into every message
+        print("originals (before):   " + measure(recipients, lambda to: compose_email(
+            "lab@example.com", to, "Your recording", "Hi", attachments)))
+
+        media = NotificationMedia({**MEDIA_CONFIG, 'PUBLIC_URL': 'https://cymatics.example.org'},
+                                  directory / "media")
+        def prepared(to):
+            message = media.prepare({'recipient': to, 'subject': "Your recording", 'body': "Hi",
+                                     'attachments': attachments})
+            return compose_email("lab@example.com", to, message['subject'], message['body'],
+                                 message['attachments'])
+        start = time.perf_counter()
+        prepared("first@example.com")
+        print(f"first rendition build: {(time.perf_counter() - start) * 1000:7.1f} ms")
+        print("renditions (after):   " + measure(recipients, prepared))
+        print(f"media stats: {media.stats()}")
+
+if __name__ == "__main__":
+    bench_notification_media()
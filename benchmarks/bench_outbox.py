@@ -0,0 +1,88 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import smtplib
+import socket
+from aiosmtpd.controller import Controller
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.services.db_writer import DatabaseWriter
+from backend.services.email_service import SmtpPool, compose_email
+from backend.services.outbox import Outbox
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+class Sink:
+    async def handle_DATA(self, server, session, envelope):
+        return '250 OK'
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:8.1f} messages/s ({seconds * 1000 / count:.2f} ms each)"
+
+def bench_outbox(count: int = 200):
+    server = Controller(Sink(), hostname='127.0.0.1', port=free_port())
+    server.start()
+    config = {'SMTP_SERVER': '127.0.0.1', 'SMTP_PORT': server.port, 'FROM_EMAIL': 'lab@example.com',
+              'USE_TLS': False, 'SMTP_POOL_SIZE': 2}
+    messages = [{'recipient': f'visitor{i}@example.com', 'subject': 'Your pattern', 'body': 'Thanks!'}
+                for i in range(count)]
+    print(f"{count} messages to a local SMTP server (no TLS, so connection costs are a lower bound)")
+
+    try:
+        # A connection per message, as send_email used to do
+        start = time.perf_counter()
+        for message in messages:
+            with smtplib.SMTP(config['SMTP_SERVER'], config['SMTP_PORT']) as smtp:
+                smtp.send_message(compose_email(config['FROM_EMAIL'], message['recipient'],
+                                                message['subject'], message['body']))
+        print(f"connect per message: {rate(count, time.perf_counter() - start)}")
+
+        pool = SmtpPool(config)
+        start = time.perf_counter()
+        for message in messages:
+            pool.deliver(message)
+        print(f"pooled connection:   {rate(count, time.perf_counter() - start)}, "
+              f"{pool.stats()['opened']} connection(s)")
+
+        with tempfile.TemporaryDirectory() as scratch:
+            engine = create_db_engine(f"sqlite:///{Path(scratch) / 'bench.db'}")
+            Base.metadata.create_all(bind=engine)
+            session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            writer = DatabaseWriter({'DB_FLUSH_INTERVAL': 0.01}, session_factory)
+            outbox = Outbox({'WORKERS': 2, 'POLL_INTERVAL': 0.05}, session_factory, writer.submit,
+                            {'email': pool.deliver})
+            outbox.start()
+
+            # What a request pays: queueing the row
+            start = time.perf_counter()
+            futures = [outbox.enqueue('email', m['recipient'], m['body'], subject=m['subject']) for m in messages]
+            print(f"enqueue (request):   {rate(count, time.perf_counter() - start)}")
+            for future in futures:
+                future.result()
+            while outbox.stats()['sent'] < count:
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            outbox.close()
+            writer.close()
+            print(f"outbox end to end:   {rate(count, elapsed)}, stats {outbox.stats()}")
+        pool.close()
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    bench_outbox()
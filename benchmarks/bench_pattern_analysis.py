@@ -0,0 +1,74 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import cv2
+import numpy as np
+
+from backend.config.settings import ANALYSIS_CONFIG, CAMERA_CONFIG, CAPTURES_DIR, MEDIA_CONFIG
+from backend.services.media_backends import SyntheticCamera
+from backend.services.pattern_analysis import PatternAnalyzer, analyze_batch, analyze_files, load_gray
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def capture_files(minimum: int, scratch: Path) -> list:
+    """Every capture on disk, topped up with synthetic ones so the run is long enough"""
+    paths = sorted(str(p) for p in CAPTURES_DIR.glob("*.jpg"))
+    paths += sorted(str(p) for p in Path(MEDIA_CONFIG['CAPTURE_STORE_DIR']).rglob("*.jpg"))
+    if len(paths) < minimum:
+        camera = SyntheticCamera(CAMERA_CONFIG)
+        rng = np.random.default_rng(0)
+        for i in range(minimum - len(paths)):
+            image = camera.render(float(rng.uniform(50, 2000)), float(i))
+            path = scratch / f"synthetic_{i:05d}.jpg"
+            cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, MEDIA_CONFIG['IMAGE_QUALITY']])
+            paths.append(str(path))
+    return paths
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:8.1f} images/s ({seconds * 1000 / count:.2f} ms each)"
+
+def bench_pattern_analysis(minimum: int = 400):
+    with tempfile.TemporaryDirectory() as scratch:
+        paths = capture_files(minimum, Path(scratch))
+        size, batch_size = ANALYSIS_CONFIG['SIZE'], ANALYSIS_CONFIG['BATCH_SIZE']
+        print(f"{len(paths)} captures, analyzed at {size}x{size}")
+
+        # Where the time goes: JPEG decoding versus the vectorized metrics
+        start = time.perf_counter()
+        frames = np.stack([load_gray(path, size) for path in paths])
+        print(f"decode only:    {rate(len(paths), time.perf_counter() - start)}")
+        for batch in (1, batch_size):
+            start = time.perf_counter()
+            for i in range(0, len(frames), batch):
+                analyze_batch(frames[i:i + batch])
+            print(f"metrics ({batch:>3}):  {rate(len(frames), time.perf_counter() - start)}")
+
+        # One image per call, as a per-capture hook on the request path would do
+        start = time.perf_counter()
+        for path in paths:
+            analyze_files([path], size)
+        print(f"one at a time:  {rate(len(paths), time.perf_counter() - start)}")
+
+        start = time.perf_counter()
+        for i in range(0, len(paths), batch_size):
+            analyze_files(paths[i:i + batch_size], size)
+        print(f"batched ({batch_size:>3}):  {rate(len(paths), time.perf_counter() - start)}")
+
+        analyzer = PatternAnalyzer(ANALYSIS_CONFIG)
+        analyzer.submit([(0, paths[0])]).result()  # spawn the workers outside the timing
+        start = time.perf_counter()
+        results = analyzer.submit(list(enumerate(paths))).result()
+        elapsed = time.perf_counter() - start
+        analyzer.close()
+        print(f"process pool:   {rate(len(results), elapsed)} with {analyzer.workers} workers")
+
+if __name__ == "__main__":
+    bench_pattern_analysis()
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+# Run headless: synthetic camera frames and a null audio sink
+os.environ.setdefault("CAMERA_SOURCE", "synthetic")
+os.environ.setdefault("AUDIO_SINK", "null")
+
+import logging
+import numpy as np
+from fastapi.testclient import TestClient
+from backend.main import (
+    app, CAPTURES_DIR, audio_streamer, camera_reader, capture_file, capture_service, streaming_service
+)
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def stream_client(client: TestClient, tier: str, seconds: float, results: dict):
+    """Receive binary frames on one websocket for ``seconds``."""
+    frames = 0
+    with client.websocket_connect("/ws/stream") as ws:
+        ws.send_json({"type": "subscribe", "tier": tier})
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            message = ws.receive()
+            if message.get("bytes"):
+                frames += 1
+    results[tier] = results.get(tier, []) + [frames / seconds]
+
+def bench_pipeline(n_clients: int = 4, seconds: float = 5.0, captures: int = 20, record: bool = False):
+    """Tone + live stream to ``n_clients`` websockets + repeated captures, all headless.
+
+    With ``record`` the session video recorder runs throughout, to check that
+    it does not slow the live stream down.
+    """
+    tiers = ["thumb", "480p", "full"]
+    with TestClient(app) as client:
+        client.post("/api/audio", json={"frequency": 440, "waveform": "sine", "volume": 0.5})
+        if record:
+            session_id = client.post("/api/experiment/start", json={"frequency": 440}).json()["session_id"]
+            client.post("/api/experiment/record", json={"session_id": session_id, "duration": seconds + 5})
+
+        results: dict = {}
+        threads = [threading.Thread(target=stream_client,
+                                    args=(client, tiers[i % len(tiers)], seconds, results))
+                   for i in range(n_clients)]
+        for thread in threads:
+            thread.start()
+
+        latencies = []
+        saved = []
+        time.sleep(0.5)
+        for i in range(captures):
+            client.post("/api/audio", json={"frequency": 200 + 50 * i, "waveform": "sine", "volume": 0.5})
+            start = time.perf_counter()
+            response = client.post("/api/capture")
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code == 200:
+                saved.append(response.json()["capture_id"])
+            time.sleep(seconds / captures / 2)
+
+        stream_stats = streaming_service.stats()
+        for thread in threads:
+            thread.join()
+        recording = client.post("/api/experiment/stop").json() if record else None
+        client.post("/api/stop")
+
+    capture_service.drain()
+    records = [capture_service.get(capture_id) for capture_id in saved]
+    durable_ms = [r['queue_ms'] + r['write_ms'] for r in records if r['state'] == 'saved']
+    for record in records:
+        (capture_file(record['url']) or CAPTURES_DIR / record['filename']).unlink(missing_ok=True)
+
+    for tier, rates in results.items():
+        print(f"{tier:>6}: {np.mean(rates):5.1f} fps per client ({len(rates)} clients)")
+    print(f"capture: {len(saved)}/{captures} ok, median {np.median(latencies):.1f} ms, "
+          f"p95 {np.percentile(latencies, 95):.1f} ms; durable after median "
+          f"{np.median(durable_ms):.1f} ms more ({len(durable_ms)} saved)")
+    print(f"camera: {camera_reader.stats()}")
+    print(f"audio: {audio_streamer.stats()}")
+    print(f"stream: {stream_stats}")
+    if recording:
+        video = recording["recording"]
+        print(f"recording: {video['frames_written']} frames, {video['frames_dropped']} dropped, "
+              f"{video['frames_repeated']} repeated, max queue {video['max_queue']}, "
+              f"finalized in {video['finalize_ms']} ms")
+        for path in (recording["videoPath"], recording["imagePath"]):
+            if path:
+                (capture_file(path) or CAPTURES_DIR / Path(path).name).unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    bench_pipeline()
+    bench_pipeline(record=True)
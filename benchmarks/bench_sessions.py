@@ -0,0 +1,58 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import tracemalloc
+from datetime import datetime
+import numpy as np
+
+from backend.services.session_manager import SessionManager
+
+logging.basicConfig(level=logging.ERROR)  # evictions log a warning each
+logger = logging.getLogger(__name__)
+
+def bench_sessions(count: int = 100000):
+    print(f"{count} experiment sessions, each started, recorded, stopped and saved")
+
+    # Before: a plain dict keyed by second-resolution timestamps, so starts in the
+    # same second collide; over an event (one start per second) it only grows
+    distinct = len({datetime.now().strftime("%Y%m%d_%H%M%S") for _ in range(count)})
+    tracemalloc.start()
+    sessions = {}
+    for i in range(count):
+        session_id = f"{i:014d}"
+        sessions[session_id] = {'session_id': session_id, 'frequency': 440.0, 'start_time': datetime.now(),
+                                'image_path': "/static/captures/x.jpg", 'email': "visitor@example.com"}
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"dict (before):   {distinct:6d} distinct ids when started back to back, "
+          f"{peak / 1e6:6.1f} MB after {count} starts, never freed")
+
+    def lifecycle(manager: SessionManager) -> float:
+        start = time.perf_counter()
+        session_id = manager.start(440.0)['session_id']
+        manager.record(session_id)
+        manager.stop(session_id, image_path="/static/captures/x.jpg")
+        manager.save(session_id, email="visitor@example.com")
+        return time.perf_counter() - start
+
+    # Full past MAX_SESSIONS, so every start also evicts the stalest session
+    manager = SessionManager({'MAX_SESSIONS': 500, 'SESSION_TTL': 1800})
+    latencies = np.array([lifecycle(manager) for _ in range(count)]) * 1e6
+    manager = SessionManager({'MAX_SESSIONS': 500, 'SESSION_TTL': 1800})
+    tracemalloc.start()
+    for _ in range(count):
+        lifecycle(manager)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = manager.stats()
+    print(f"manager (after): {stats['started']:6d} distinct ids, {stats['open']} kept, {peak / 1e6:6.1f} MB peak, "
+          f"lifecycle p50 {np.percentile(latencies, 50):.0f} us / p99 {np.percentile(latencies, 99):.0f} us")
+
+if __name__ == "__main__":
+    bench_sessions()
@@ -0,0 +1,60 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+
+from backend.services.pattern_analysis import EMBEDDING_SIZE
+from backend.services.similarity_index import SimilarityIndex
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+TARGET_MS = 50
+
+def embeddings(count: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).gamma(2.0, size=(count, EMBEDDING_SIZE)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def bench_similarity_index(count: int = 100_000, batch: int = 16, queries: int = 200, k: int = 12):
+    vectors = embeddings(count)
+    probes = embeddings(queries, seed=1)
+    print(f"{count} patterns, {EMBEDDING_SIZE}-dim embeddings, top {k}")
+
+    for quantize in (None, 'int8'):
+        with tempfile.TemporaryDirectory() as scratch:
+            index = SimilarityIndex({'QUANTIZE': quantize}, Path(scratch))
+            index.open()
+            # Appended a recording's worth at a time, as analysis results arrive
+            start = time.perf_counter()
+            for i in range(0, count, batch):
+                index.add(zip(range(i, i + batch), vectors[i:i + batch]))
+            appended = time.perf_counter() - start
+
+            # Reopen so queries run against the memory-mapped files
+            index.close()
+            index = SimilarityIndex({'QUANTIZE': quantize}, Path(scratch))
+            start = time.perf_counter()
+            index.open()
+            opened = time.perf_counter() - start
+
+            timings = []
+            for probe in probes:
+                start = time.perf_counter()
+                index.search(probe, k)
+                timings.append((time.perf_counter() - start) * 1000)
+            p50, p99 = np.percentile(timings, [50, 99])
+            label = quantize or 'float32'
+            print(f"{label:>8}: {index.stats()['bytes'] / 1e6:5.1f} MB, "
+                  f"append {count / appended:8.0f} patterns/s, open {opened * 1000:5.1f} ms, "
+                  f"query p50 {p50:5.2f} ms p99 {p99:5.2f} ms "
+                  f"({'within' if p99 < TARGET_MS else 'OVER'} {TARGET_MS} ms)")
+
+if __name__ == "__main__":
+    bench_similarity_index()
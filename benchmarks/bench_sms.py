@@ -0,0 +1,62 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+
+from backend.services.sms_service import FakeSmsTransport, SmsDispatcher
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+LATENCY = 0.2  # seconds per provider API call
+
+def rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:7.1f} messages/s ({seconds:.2f}s for {count})"
+
+async def loop_stall(work) -> float:
+    """Longest gap between 10ms ticks of the event loop while ``work`` runs"""
+    gaps, last = [], time.perf_counter()
+    task = asyncio.ensure_future(work)
+    while not task.done():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+    await task
+    return max(gaps) * 1000
+
+def bench_sms(count: int = 40):
+    print(f"{count} texts through a fake transport taking {LATENCY * 1000:.0f} ms per call")
+    numbers = [f"+1555000{i:04d}" for i in range(count)]
+
+    # Before: the synchronous API call made inside the coroutine, one after another
+    transport = FakeSmsTransport({'FAKE_LATENCY': LATENCY})
+    async def inline():
+        for number in numbers:
+            transport.send(number, "Your pattern is ready")
+    start = time.perf_counter()
+    stall = asyncio.run(loop_stall(inline()))
+    print(f"inline (before):       {rate(count, time.perf_counter() - start)}, event loop stalled {stall:.0f} ms")
+
+    for concurrency, sms_rate in ((1, None), (4, None), (8, None), (8, 10.0)):
+        transport = FakeSmsTransport({'FAKE_LATENCY': LATENCY})
+        dispatcher = SmsDispatcher({'SMS_CONCURRENCY': concurrency, 'SMS_RATE': sms_rate, 'SMS_BURST': 1}, transport)
+        async def dispatched():
+            await asyncio.gather(*(asyncio.wrap_future(dispatcher.submit(number, "Your pattern is ready"))
+                                   for number in numbers))
+        start = time.perf_counter()
+        stall = asyncio.run(loop_stall(dispatched()))
+        elapsed = time.perf_counter() - start
+        dispatcher.close()
+        limit = f"{sms_rate:.0f}/s" if sms_rate else "none"
+        print(f"dispatcher x{concurrency} (rate {limit:>4}): {rate(count, elapsed)}, "
+              f"event loop stalled {stall:.0f} ms, {transport.max_active} in flight at most")
+
+if __name__ == "__main__":
+    bench_sms()
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Budgets for a headless worker (synthetic camera, null audio sink)
+IMPORT_BUDGET_MS = 1500  # `import backend.main`
+SERVING_BUDGET_MS = 100  # lifespan startup until the first request is answered
+READY_BUDGET_MS = 1000  # lifespan startup until every device reports ready
+
+SCRIPT = """
+import json, time
+start = time.perf_counter()
+import backend.main as main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get("/")
+    serving = time.perf_counter()
+    while not client.get("/").json()["ready"]:
+        time.sleep(0.001)
+    ready = time.perf_counter()
+    devices = client.get("/").json()["devices"]
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "serving_ms": (serving - imported) * 1000,
+    "ready_ms": (ready - imported) * 1000,
+    "devices": devices
+}))
+"""
+
+def measure_startup() -> dict:
+    """Import and start the app in a fresh interpreter, as a new uvicorn worker would."""
+    environment = {**os.environ, "CAMERA_SOURCE": "synthetic", "AUDIO_SINK": "null"}
+    output = subprocess.run([sys.executable, "-c", SCRIPT], cwd=project_root, env=environment,
+                            capture_output=True, text=True, timeout=60, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def bench_startup(runs: int = 5) -> bool:
+    """Report median startup phases against their budgets; returns whether all were met."""
+    results = [measure_startup() for _ in range(runs)]
+    within = True
+    for key, budget in (("import_ms", IMPORT_BUDGET_MS), ("serving_ms", SERVING_BUDGET_MS),
+                        ("ready_ms", READY_BUDGET_MS)):
+        median = float(np.median([r[key] for r in results]))
+        ok = median <= budget
+        within &= ok
+        print(f"{key:>10}: {median:7.1f} ms (budget {budget} ms) {'ok' if ok else 'OVER BUDGET'}")
+    print(f"devices: {results[-1]['devices']}")
+    return within
+
+if __name__ == "__main__":
+    sys.exit(0 if bench_startup() else 1)
@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.config.settings import CAMERA_CONFIG, STREAM_CONFIG
+from backend.services.streaming_service import StreamingService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_frame(width: int, height: int) -> np.ndarray:
+    """Chladni-like test frame with sensor noise, so JPEG cost is realistic."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    x, y = x / width * np.pi * 6, y / height * np.pi * 4
+    pattern = np.cos(x) * np.cos(y * 1.7) - np.cos(x * 1.7) * np.cos(y)
+    image = (np.abs(pattern) < 0.15).astype(np.float32) * 200 + 30
+    image += np.random.default_rng(0).normal(0, 8, image.shape)
+    gray = np.clip(image, 0, 255).astype(np.uint8)
+    return np.repeat(gray[:, :, None], 3, axis=2)
+
+def bench_tiers(repeats: int = 30):
+    """Report scale+encode time and message size per tier and quality."""
+    service = StreamingService(media_service=None, config=STREAM_CONFIG)
+    frame = make_frame(CAMERA_CONFIG['FRAME_WIDTH'], CAMERA_CONFIG['FRAME_HEIGHT'])
+    for tier, height in STREAM_CONFIG['TIERS'].items():
+        for quality in STREAM_CONFIG['QUALITY_LEVELS']:
+            service._encode_tier(frame, height, [quality])  # warm up
+            start = time.perf_counter()
+            for _ in range(repeats):
+                encoded = service._encode_tier(frame, height, [quality])
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+            size_kb = len(encoded[quality]) / 1024
+            print(f"{tier:>6} q{quality:<3}: {elapsed_ms:7.2f} ms/frame, {size_kb:7.1f} KB, "
+                  f"{1000 / elapsed_ms:6.0f} fps per encoder thread")
+
+if __name__ == "__main__":
+    bench_tiers()
@@ -1,5 +1,6 @@
 class CollectionHandler {
     constructor() {
+        this.sessionId = new URLSearchParams(window.location.search).get('session_id');
         this.initializeElements();
         this.loadExperimentResult();
         this.attachEventListeners();
@@ -27,7 +28,10 @@ class CollectionHandler {
 
     async loadExperimentResult() {
         try {
-            const response = await fetch('/api/experiment/result');
+            if (!this.sessionId) throw new Error('No experiment session');
+            const response = await fetch(
+                `/api/experiment/result?session_id=${encodeURIComponent(this.sessionId)}`
+            );
             const data = await response.json();
             
             if (data.status === 'success') {
@@ -68,6 +72,7 @@ class CollectionHandler {
         
         const formData = new FormData(this.form);
         const data = {
+            session_id: this.sessionId,
             name: formData.get('name'),
             email: formData.get('email'),
             phone: formData.get('phone'),
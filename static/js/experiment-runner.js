@@ -24,6 +24,7 @@ class ExperimentRunner {
     }
 
     initializeState() {
+        this.sessionId = new URLSearchParams(window.location.search).get('session_id');
         this.isRecording = false;
         this.experimentData = null;
         this.timer = null;
@@ -42,8 +43,11 @@ class ExperimentRunner {
 
     async loadExperimentData() {
         try {
-            const response = await fetch('/api/experiment/current');
-            this.experimentData = await response.json();
+            if (!this.sessionId) throw new Error('No experiment session');
+            const response = await fetch(
+                `/api/experiment/current?session_id=${encodeURIComponent(this.sessionId)}`
+            );
+            this.experimentData = response.ok ? await response.json() : null;
             
             if (this.experimentData) {
                 this.frequencyDisplay.textContent = this.experimentData.frequency;
@@ -68,7 +72,7 @@ class ExperimentRunner {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
-                    frequency: this.experimentData.frequency,
+                    session_id: this.sessionId,
                     duration: this.timeRemaining
                 })
             });
@@ -97,9 +101,10 @@ class ExperimentRunner {
     async stopExperiment() {
         try {
             // Stop recording on server
-            const response = await fetch('/api/experiment/stop', {
-                method: 'POST'
-            });
+            const response = await fetch(
+                `/api/experiment/stop?session_id=${encodeURIComponent(this.sessionId)}`,
+                { method: 'POST' }
+            );
 
             const data = await response.json();
             
@@ -201,7 +206,7 @@ class ExperimentRunner {
     }
 
     proceedToCollection() {
-        window.location.href = '/collection.html';
+        window.location.href = `/collection.html?session_id=${encodeURIComponent(this.sessionId)}`;
     }
 
     // Cleanup when leaving page
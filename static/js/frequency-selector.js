@@ -197,7 +197,9 @@ class FrequencySelector {
             });
             
             if (response.ok) {
-                window.location.href = '/experiment.html';
+                // Later pages name this session, so kiosks never pick up each other's
+                const data = await response.json();
+                window.location.href = `/experiment.html?session_id=${encodeURIComponent(data.session_id)}`;
             }
         } catch (error) {
             console.error('Error starting experiment:', error);
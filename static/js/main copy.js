@@ -9,14 +9,21 @@ class CymaticsStream {
     async connect() {
         try {
             this.ws = new WebSocket(`ws://${window.location.host}/ws/stream`);
+            this.ws.binaryType = 'arraybuffer';
             
             this.ws.onmessage = (event) => {
+                if (event.data instanceof ArrayBuffer) {
+                    this.handleFrame(event.data);
+                    return;
+                }
                 const message = JSON.parse(event.data);
                 this.handleMessage(message);
             };
             
             this.ws.onopen = () => {
                 this.connected = true;
+                // Ask for the smallest tier that still fills the video element
+                this.ws.send(JSON.stringify({ type: 'subscribe', tier: this.pickTier() }));
                 console.log('Connected to stream');
             };
             
@@ -31,11 +38,27 @@ class CymaticsStream {
         }
     }
 
+    pickTier() {
+        const height = (this.videoElement?.clientHeight || window.innerHeight) * (window.devicePixelRatio || 1);
+        if (height <= 180) return 'thumb';
+        if (height <= 480) return '480p';
+        return 'full';
+    }
+
+    handleFrame(buffer) {
+        // Header: type (u8), sequence (u32), timestamp (f64), frequency (f32), big-endian
+        const view = new DataView(buffer);
+        if (view.getUint8(0) !== 1) return;
+        this.lastFrame = {
+            sequence: view.getUint32(1),
+            timestamp: view.getFloat64(5),
+            frequency: view.getFloat32(13)
+        };
+        this.updateVideo(new Blob([buffer.slice(17)], { type: 'image/jpeg' }));
+    }
+
     handleMessage(message) {
         switch (message.type) {
-            case 'frame':
-                this.updateVideo(message.data);
-                break;
             case 'session_started':
                 this.sessionActive = true;
                 this.onSessionStart?.(message);
@@ -50,9 +73,11 @@ class CymaticsStream {
         }
     }
 
-    updateVideo(frameData) {
+    updateVideo(frameBlob) {
         const img = new Image();
+        const url = URL.createObjectURL(frameBlob);
         img.onload = () => {
+            URL.revokeObjectURL(url);
             const canvas = document.createElement('canvas');
             const ctx = canvas.getContext('2d');
             canvas.width = img.width;
@@ -64,7 +89,7 @@ class CymaticsStream {
                 this.videoElement.srcObject = canvas.captureStream();
             }
         };
-        img.src = 'data:image/jpeg;base64,' + frameData;
+        img.src = url;
     }
 
     async startSession(frequency, duration = 20) {
@@ -138,8 +138,14 @@ async function captureImage() {
         const response = await fetch('/api/capture', { method: 'POST' });
         const data = await response.json();
         if (data.status === 'success') {
+            // The file is written in the background; wait until it is on disk
+            const saved = await fetch(`/api/capture/${data.capture_id}?wait=5`);
+            const capture = (await saved.json()).capture;
+            if (!capture || capture.state !== 'saved') {
+                throw new Error(capture && capture.error ? capture.error : 'Capture not saved');
+            }
             const img = document.getElementById('capturedImage');
-            img.src = data.url;
+            img.src = capture.url;
             img.style.display = 'block';
             setTimeout(() => {
                 img.style.display = 'none';
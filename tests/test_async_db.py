@@ -0,0 +1,129 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import time
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from backend.database.base import Base
+from backend.database.database import async_database_url, create_async_db_engine, create_db_engine
+from backend.database.models import Recording
+from backend.services.frequency_coverage import FrequencyCoverage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 2}
+
+def make_database(tmp_path, rows: int = 0) -> str:
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_db_engine(url, CONFIG)
+    Base.metadata.create_all(bind=engine)
+    if rows:
+        with engine.begin() as connection:
+            connection.execute(Recording.__table__.insert(),
+                               [{'frequency': 20.0 + i % 1980, 'waveform': 'sine'} for i in range(rows)])
+    engine.dispose()
+    return url
+
+def test_async_database_url():
+    assert async_database_url("sqlite:////data/cymatics.db") == "sqlite+aiosqlite:////data/cymatics.db"
+    assert async_database_url("postgresql://u:p@db/cymatics") == "postgresql+asyncpg://u:p@db/cymatics"
+    assert async_database_url("postgresql+psycopg2://db/c") == "postgresql+asyncpg://db/c"
+    assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    with pytest.raises(ValueError):
+        async_database_url("mssql://db/c")
+
+def test_async_engine_is_pooled_and_tuned(tmp_path):
+    url = make_database(tmp_path)
+
+    async def check():
+        engine = create_async_db_engine(url, CONFIG)
+        try:
+            assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+            assert engine.pool.size() == CONFIG['DB_POOL_SIZE']
+            async with engine.connect() as connection:
+                assert (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+                assert (await connection.exec_driver_sql("PRAGMA busy_timeout")).scalar() == 5000
+        finally:
+            await engine.dispose()
+
+    asyncio.run(check())
+
+def test_queries_do_not_block_the_event_loop(tmp_path):
+    url = make_database(tmp_path, rows=50000)
+
+    async def run():
+        engine = create_async_db_engine(url, CONFIG)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        stop = asyncio.Event()
+        gaps = []
+
+        async def ticker():
+            # Stands in for the frame broadcaster: should keep ticking during queries
+            last = time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        async def query():
+            async with session_factory() as db:
+                statement = select(func.count(), func.avg(Recording.frequency)) \
+                    .where(Recording.waveform == "sine")
+                return (await db.execute(statement)).one()
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(query() for _ in range(24)))
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await tick
+            await engine.dispose()
+        return results, gaps, elapsed
+
+    results, gaps, elapsed = asyncio.run(run())
+    logger.info(f"Queries took {elapsed * 1000:.1f}ms: {len(gaps)} ticks, "
+                f"longest gap {max(gaps) * 1000:.1f}ms")
+    assert all(count == 50000 for count, _ in results)
+    # A blocking driver would stall the loop for the whole batch of queries
+    assert len(gaps) >= 3
+    assert max(gaps) < elapsed / 2
+
+def test_coverage_loads_through_async_session(tmp_path):
+    url = make_database(tmp_path, rows=100)
+
+    async def load():
+        engine = create_async_db_engine(url, CONFIG)
+        coverage = FrequencyCoverage({'MIN_FREQUENCY': 20, 'MAX_FREQUENCY': 2000})
+        try:
+            await coverage.load_from_async_db(
+                sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            )
+        finally:
+            await engine.dispose()
+        return coverage
+
+    coverage = asyncio.run(load())
+    assert coverage.loaded
+    assert coverage.used() == [20.0 + i for i in range(100)]
+
+if __name__ == "__main__":
+    import tempfile
+    test_async_database_url()
+    for test in (test_async_engine_is_pooled_and_tuned, test_queries_do_not_block_the_event_loop,
+                 test_coverage_loads_through_async_session):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Async database tests passed!")
@@ -2,6 +2,7 @@ import pygame
 import numpy as np
 import time
 import logging
+from backend.services.audio_engine import AudioEngine
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -32,13 +33,9 @@ def test_audio():
         duration = 1.0   # seconds
         sample_rate = AUDIO_CONFIG['SAMPLE_RATE']
         
-        # Generate samples
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        tone = np.sin(2 * np.pi * frequency * t)
-        audio_data = (tone * 32767).astype(np.int16)
-        
-        # Make it stereo
-        stereo_data = np.column_stack([audio_data, audio_data])
+        # Generate stereo samples with the shared synthesis engine
+        engine = AudioEngine(AUDIO_CONFIG)
+        stereo_data, _ = engine.render(frequency, "sine", int(sample_rate * duration))
         
         logger.info("Audio data generated successfully")
         
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.services.audio_engine import AudioEngine, WAVEFORMS, QUALITY_LEVELS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'SAMPLE_RATE': 44100, 'CHANNELS': 2, 'MAX_HARMONICS': 512}
+
+def _alias_db(wave, frequency):
+    """Energy outside the harmonic bins relative to the harmonics, in dB."""
+    spectrum = np.abs(np.fft.rfft(wave)) ** 2
+    harmonic = np.arange(len(spectrum)) % frequency == 0
+    return 10 * np.log10(spectrum[~harmonic].sum() / spectrum[harmonic].sum())
+
+def test_render_all_waveforms():
+    engine = AudioEngine(CONFIG)
+    out = np.empty((4096, 2), dtype=np.int16)
+    for waveform in WAVEFORMS:
+        for quality in QUALITY_LEVELS:
+            result, _ = engine.render(440.0, waveform, 4096, volume=0.5, quality=quality, out=out)
+            assert result is out
+            assert np.array_equal(out[:, 0], out[:, 1])
+            assert np.abs(out.astype(np.int32)).max() <= 0.6 * 32767
+    logger.info("All waveforms rendered")
+
+def test_band_limiting_reduces_aliasing():
+    engine = AudioEngine(CONFIG)
+    # 1Hz FFT bins over one second put every harmonic of 1975Hz on a bin
+    ramp, increment, _ = engine.phase(1975, 44100)
+    for waveform in ("square", "triangle", "sawtooth"):
+        naive = _alias_db(engine.oscillate(ramp, increment, waveform, "naive")[0], 1975)
+        blep = _alias_db(engine.oscillate(ramp, increment, waveform, "polyblep")[0], 1975)
+        additive = _alias_db(engine.oscillate(ramp, increment, waveform, "additive")[0], 1975)
+        logger.info(f"{waveform}: naive {naive:.1f}dB, polyblep {blep:.1f}dB, additive {additive:.1f}dB")
+        assert blep < naive - 10
+        assert additive < blep
+
+def test_phase_continuity_across_blocks():
+    engine = AudioEngine(CONFIG)
+    whole, _ = engine.render(523.25, "sine", 2048, out=np.empty(2048, dtype=np.int16))
+
+    first, phase = engine.render(523.25, "sine", 1024, out=np.empty(1024, dtype=np.int16))
+    second, _ = engine.render(523.25, "sine", 1024, phase=phase, out=np.empty(1024, dtype=np.int16))
+    assert np.abs(np.concatenate([first, second]).astype(np.int32) - whole).max() <= 1
+
+def test_multiple_partials_in_one_pass():
+    engine = AudioEngine(CONFIG)
+    frequencies, weights = engine.harmonic_series(220.0, 4)
+    out, phase = engine.render(frequencies, "sine", 44100, weights=weights,
+                               out=np.empty(44100, dtype=np.int16))
+    assert phase.shape == (4,)
+
+    spectrum = np.abs(np.fft.rfft(out))
+    peaks = sorted(np.argsort(spectrum)[-4:])
+    assert peaks == [220, 440, 660, 880]
+
+if __name__ == "__main__":
+    test_render_all_waveforms()
+    test_band_limiting_reduces_aliasing()
+    test_phase_continuity_across_blocks()
+    test_multiple_partials_in_one_pass()
+    print("Audio engine tests passed!")
@@ -0,0 +1,69 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.services.audio_stream import AudioStreamer, BlockRing
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'SAMPLE_RATE': 44100, 'CHANNELS': 2, 'BUFFER': 512, 'RING_BLOCKS': 2}
+
+class RecordingSink:
+    """Collects blocks at real-time pace instead of playing them."""
+    def __init__(self, config):
+        self.block_seconds = config['BUFFER'] / config['SAMPLE_RATE']
+        self.blocks = []
+
+    def write(self, block):
+        self.blocks.append(block.copy())
+        time.sleep(self.block_seconds)
+
+    def close(self):
+        pass
+
+def test_block_ring_order():
+    ring = BlockRing(2, 4, 1)
+    for value in (1, 2):
+        ring.acquire_write()[:] = value
+        ring.commit_write()
+    assert ring.acquire_write(timeout=0) is None  # full
+
+    assert ring.acquire_read()[0, 0] == 1
+    ring.commit_read()
+    assert ring.acquire_read()[0, 0] == 2
+    ring.commit_read()
+    ring.close()
+    assert ring.acquire_read() is None
+
+def test_retune_is_continuous_and_fast():
+    sink = RecordingSink(CONFIG)
+    streamer = AudioStreamer(CONFIG, sink_factory=lambda config: sink)
+    streamer.set_params(frequency=440.0, volume=0.8, waveform="sine")
+    streamer.start()
+    time.sleep(0.1)
+    streamer.set_params(frequency=660.0)
+    time.sleep(0.1)
+    streamer.stop()
+
+    audio = np.concatenate(sink.blocks)[:, 0].astype(np.int32)
+    # A sine at <=660Hz never moves more than 2*pi*f/sr of full scale per sample
+    max_step = 2 * np.pi * 660.0 / 44100 * 0.8 * 32767
+    assert np.abs(np.diff(audio)).max() <= max_step * 1.05
+    assert audio[-1] == 0 or abs(audio[-1]) < 0.05 * 32767  # faded out
+
+    stats = streamer.stats()
+    logger.info(f"Stream stats: {stats}")
+    # Ring depth plus the block at the sink
+    assert stats['last_retune_latency_ms'] < (CONFIG['RING_BLOCKS'] + 2) * stats['block_ms'] + 20
+
+if __name__ == "__main__":
+    test_block_ring_order()
+    test_retune_is_continuous_and_fast()
+    print("Audio stream tests passed!")
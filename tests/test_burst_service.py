@@ -0,0 +1,120 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import cv2
+import numpy as np
+import pytest
+from backend.services.burst_service import BurstBusy, BurstService
+from backend.services.camera_service import CameraReader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAMERA = {'FRAME_WIDTH': 64, 'FRAME_HEIGHT': 48, 'FPS': 100, 'FRAME_BUFFERS': 3}
+CONFIG = {'BURST_MAX_FRAMES': 20, 'BURST_WORKERS': 2, 'IMAGE_QUALITY': 90,
+          'VIDEO_CODEC': 'mp4v', 'VIDEO_FPS': 30}
+
+class CountingCapture:
+    """Fills each frame with its frame number, like a camera at a fixed rate."""
+    def __init__(self, config):
+        self.count = 0
+        self.interval = 1.0 / config['FPS']
+
+    def read(self, image=None):
+        time.sleep(self.interval)
+        self.count += 1
+        image[:] = (self.count * 8) % 256
+        return True, image
+
+    def release(self):
+        pass
+
+def run_burst(tmp_path, frames, output, interval=0.0, on_complete=None):
+    reader = CameraReader(CAMERA, capture_factory=CountingCapture)
+    reader.start()
+
+    async def run():
+        service = BurstService(CONFIG, reader, tmp_path, frequency_source=lambda: 440.0,
+                               on_complete=on_complete)
+        try:
+            burst = await service.start(frames, interval=interval, output=output)
+            with pytest.raises(BurstBusy):
+                await service.start(1)
+            await service._task
+            return burst
+        finally:
+            await service.close()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        reader.stop()
+
+def test_jpeg_burst_keeps_every_frame(tmp_path):
+    linked = []
+    burst = run_burst(tmp_path, 12, "jpeg", on_complete=lambda b: linked.append(b) or 7)
+    logger.info(f"Burst recorded in {burst['record_ms']}ms, encoded in {burst['encode_ms']}ms")
+    assert burst['state'] == 'saved', burst.get('error')
+    assert burst['recording_id'] == 7 and linked == [burst]
+
+    sequences = [f['sequence'] for f in burst['frames']]
+    assert sequences == list(range(sequences[0], sequences[0] + 12))
+    assert burst['missed_frames'] == 0
+
+    values = [int(cv2.imread(str(tmp_path / f['filename'])).mean()) for f in burst['frames']]
+    expected = [(s * 8) % 256 for s in sequences]
+    assert np.allclose(values, expected, atol=2)
+    assert not list(tmp_path.glob(".*"))  # no temp files left behind
+
+def test_time_lapse_to_mp4(tmp_path):
+    burst = run_burst(tmp_path, 5, "mp4", interval=0.05)
+    assert burst['state'] == 'saved', burst.get('error')
+    sequences = [f['sequence'] for f in burst['frames']]
+    assert min(np.diff(sequences)) >= 3  # ~5 camera frames per 50ms step
+
+    video = cv2.VideoCapture(str(tmp_path / burst['video']['filename']))
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == 5
+    video.release()
+
+def test_burst_history_is_bounded(tmp_path):
+    reader = CameraReader(CAMERA, capture_factory=CountingCapture)
+    reader.start()
+
+    async def run():
+        service = BurstService({**CONFIG, 'BURST_HISTORY': 2}, reader, tmp_path)
+        try:
+            bursts = []
+            for _ in range(3):
+                bursts.append(await service.start(1))
+                await service._task
+            return service, bursts
+        finally:
+            await service.close()
+
+    try:
+        service, bursts = asyncio.run(run())
+    finally:
+        reader.stop()
+    assert service.get(bursts[0]['burst_id']) is None
+    assert [service.get(burst['burst_id']) for burst in bursts[1:]] == bursts[1:]
+
+def test_validation(tmp_path):
+    service = BurstService(CONFIG, camera_reader=None, output_dir=tmp_path)
+    for frames, interval, output in ((0, 0, "jpeg"), (21, 0, "jpeg"), (5, 0, "gif"), (5, 1000, "mp4")):
+        with pytest.raises(ValueError):
+            service.validate(frames, interval, output)
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_jpeg_burst_keeps_every_frame, test_time_lapse_to_mp4, test_burst_history_is_bounded,
+                 test_validation):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Burst tests passed!")
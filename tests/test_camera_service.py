@@ -0,0 +1,77 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.services.camera_service import CameraReader
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'FRAME_WIDTH': 64, 'FRAME_HEIGHT': 48, 'FPS': 200, 'FRAME_BUFFERS': 3}
+
+class FakeCapture:
+    """Writes an incrementing value into the caller's buffer at a fixed rate."""
+    def __init__(self, config):
+        self.count = 0
+        self.interval = 1.0 / config['FPS']
+
+    def read(self, image=None):
+        time.sleep(self.interval)
+        self.count += 1
+        image[:] = self.count % 256
+        return True, image
+
+    def release(self):
+        pass
+
+def test_frames_are_shared_views():
+    reader = CameraReader(CONFIG, capture_factory=FakeCapture)
+    assert reader.start()
+    try:
+        first = reader.wait_for_frame(0, timeout=1.0)
+        assert first is not None
+        assert not first.image.flags.writeable
+
+        second = reader.wait_for_frame(first.sequence, timeout=1.0)
+        assert second.sequence > first.sequence
+        assert second.timestamp >= first.timestamp
+    finally:
+        reader.stop()
+
+def test_pinned_frame_is_not_overwritten():
+    reader = CameraReader(CONFIG, capture_factory=FakeCapture)
+    reader.start()
+    try:
+        reader.wait_for_frame(0, timeout=1.0)
+        with reader.acquire() as frame:
+            value = frame.image[0, 0, 0]
+            time.sleep(0.1)  # ~20 more frames arrive meanwhile
+            assert (frame.image == value).all()
+            assert reader.sequence > frame.sequence
+        stats = reader.stats()
+        logger.info(f"Camera stats: {stats}")
+        assert stats['frames_read'] >= stats['sequence']
+    finally:
+        reader.stop()
+
+def test_unavailable_camera():
+    def broken(config):
+        raise RuntimeError("Could not open camera")
+
+    reader = CameraReader(CONFIG, capture_factory=broken)
+    assert not reader.start()
+    assert not reader.available
+    with reader.acquire(timeout=0) as frame:
+        assert frame is None
+
+if __name__ == "__main__":
+    test_frames_are_shared_views()
+    test_pinned_frame_is_not_overwritten()
+    test_unavailable_camera()
+    print("Camera service tests passed!")
@@ -0,0 +1,71 @@
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import cv2
+import numpy as np
+import pytest
+from backend.services.capture_service import CaptureQueueFull, CaptureService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'IMAGE_QUALITY': 90, 'CAPTURE_WORKERS': 2, 'CAPTURE_QUEUE_SIZE': 4, 'CAPTURE_FSYNC': True}
+
+def make_image(value: int) -> np.ndarray:
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+def test_burst_captures_are_unique_and_durable(tmp_path):
+    service = CaptureService({**CONFIG, 'CAPTURE_QUEUE_SIZE': 64}, tmp_path)
+    records = [service.submit(make_image(i * 10), frequency=440.0) for i in range(20)]
+    service.drain()
+
+    assert len({r['filename'] for r in records}) == 20
+    assert all(service.get(r['capture_id'])['state'] == 'saved' for r in records)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(r['filename'] for r in records)
+
+    image = cv2.imread(str(tmp_path / records[5]['filename']))
+    assert abs(int(image.mean()) - 50) <= 2
+    logger.info(f"Capture stats: {service.stats()}, last write {records[-1]['write_ms']}ms")
+
+def test_submit_copies_frame(tmp_path):
+    service = CaptureService(CONFIG, tmp_path)
+    image = make_image(200)
+    record = service.submit(image)
+    image[:] = 0  # the camera buffer is reused right after submit
+    service.drain()
+    assert int(cv2.imread(str(tmp_path / record['filename'])).mean()) > 190
+
+def test_full_queue_is_refused_and_wait_reports_saved(tmp_path):
+    service = CaptureService({**CONFIG, 'CAPTURE_WORKERS': 1, 'CAPTURE_QUEUE_SIZE': 2}, tmp_path)
+    gate = threading.Event()
+    service._executor.submit(gate.wait)  # hold the only worker
+
+    first = service.submit(make_image(1))
+    service.submit(make_image(2))
+    with pytest.raises(CaptureQueueFull):
+        service.submit(make_image(3))
+    assert service.get(first['capture_id'])['state'] == 'queued'
+
+    async def wait():
+        pending = await service.wait(first['capture_id'], timeout=0.05)
+        assert pending['state'] == 'queued'
+        gate.set()
+        return await service.wait(first['capture_id'], timeout=5)
+
+    assert asyncio.run(wait())['state'] == 'saved'
+    assert service.stats()['rejected'] == 1
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_burst_captures_are_unique_and_durable, test_submit_copies_frame,
+                 test_full_queue_is_refused_and_wait_reports_saved):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Capture service tests passed!")
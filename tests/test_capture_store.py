@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import cv2
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import CaptureBlob, CaptureName, Pattern, Recording
+from backend.services.capture_service import CaptureService
+from backend.services.capture_store import CaptureStore
+from backend.services.db_writer import DatabaseWriter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'CAPTURE_FSYNC': False, 'CAPTURE_DEDUP_DISTANCE': 3, 'CAPTURE_GC_GRACE': 0}
+
+def pattern(seed: int, noise: int = 0) -> np.ndarray:
+    """A smooth figure (like a cymatic pattern), optionally with sensor noise"""
+    rng = np.random.default_rng(seed)
+    x, y = np.meshgrid(np.linspace(-3, 3, 320), np.linspace(-3, 3, 240))
+    n, m = rng.uniform(1, 4, 2)
+    image = (127 + 120 * np.cos(n * x) * np.cos(m * y)).astype(np.int16)
+    if noise:
+        image += rng.integers(-noise, noise + 1, image.shape, dtype=np.int16)
+    return cv2.cvtColor(np.clip(image, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+def encode(image: np.ndarray) -> bytes:
+    return cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+def make_store(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    writer = DatabaseWriter({'DB_FLUSH_INTERVAL': 0.01}, session_factory)
+    return CaptureStore(CONFIG, tmp_path / "store", writer.submit), writer, session_factory
+
+def test_files_are_sharded_and_duplicates_shared(tmp_path):
+    store, writer, session_factory = make_store(tmp_path)
+    base = pattern(1)
+
+    first = store.put("a.jpg", encode(base), base)
+    assert first['kind'] == 'stored'
+    digest = first['digest']
+    assert first['path'] == tmp_path / "store" / digest[:2] / digest[2:4] / f"{digest}.jpg"
+    assert first['path'].read_bytes() == encode(base)
+
+    assert store.put("b.jpg", encode(base), base)['kind'] == 'duplicate'
+    noisy = pattern(1, noise=6)
+    assert encode(noisy) != encode(base)
+    assert store.put("c.jpg", encode(noisy), noisy)['kind'] == 'near_duplicate'
+    other = pattern(2)
+    assert store.put("d.jpg", encode(other), other)['kind'] == 'stored'
+    # Without the decoded frame (frames of a series) only exact copies are shared
+    assert store.put("b2.jpg", encode(base), None)['kind'] == 'duplicate'
+    assert store.put("f.jpg", encode(pattern(1, noise=5)), None)['kind'] == 'stored'
+    burst_frame = tmp_path / "burst_0001.jpg"
+    burst_frame.write_bytes(encode(pattern(1, noise=3)))
+    assert store.adopt("burst_0001.jpg", burst_frame)['kind'] == 'stored' and not burst_frame.exists()
+
+    assert store.resolve("a.jpg") == store.resolve("b.jpg") == store.resolve("c.jpg") == first['path']
+    assert store.resolve("d.jpg") != first['path']
+    assert store.resolve_url("/static/captures/c.jpg") == first['path']
+    assert store.resolve("missing.jpg") is None
+    assert len(list((tmp_path / "store").rglob("*.jpg"))) == 4
+    writer.close()
+
+    # The index survives a restart
+    restarted = CaptureStore(CONFIG, tmp_path / "store", writer.submit)
+    restarted.load(session_factory)
+    assert restarted.resolve("c.jpg") == first['path']
+    assert restarted.stats()['files'] == 4 and restarted.stats()['captures'] == 7
+    again = pattern(1, noise=4)
+    assert restarted.put("e.jpg", encode(again), again)['kind'] in ('duplicate', 'near_duplicate')
+    writer.close()
+
+def test_rows_count_references_and_unreferenced_files_are_collected(tmp_path):
+    store, writer, session_factory = make_store(tmp_path)
+    kept, dropped = pattern(3), pattern(4)
+    kept_path = store.put("kept.jpg", encode(kept), kept)['path']
+    dropped_path = store.put("dropped.jpg", encode(dropped), dropped)['path']
+    store.put("kept_again.jpg", encode(kept), kept)
+
+    recording_id = writer.add(Recording(frequency=440.0, image_path="/static/captures/kept.jpg")).result(5)
+    writer.add(Pattern(recording_id=recording_id, image_path="/static/captures/kept_again.jpg")).result(5)
+    writer.add(Recording(frequency=441.0, image_path="/static/captures/dropped.jpg")).result(5)
+
+    def refcounts():
+        db = session_factory()
+        try:
+            return {blob.digest: blob.refcount for blob in db.query(CaptureBlob)}
+        finally:
+            db.close()
+
+    counts = refcounts()
+    assert counts[store.digest("kept.jpg")] == 2
+    assert counts[store.digest("dropped.jpg")] == 1
+
+    def delete_dropped(session):
+        session.delete(session.query(Recording).filter_by(image_path="/static/captures/dropped.jpg").one())
+    writer.submit(delete_dropped).result(5)
+    assert refcounts()[store.digest("dropped.jpg")] == 0
+
+    assert store.collect().result(5) == 1
+    assert not dropped_path.exists() and kept_path.exists()
+    assert store.resolve("dropped.jpg") is None
+    db = session_factory()
+    assert {name.name for name in db.query(CaptureName)} == {"kept.jpg", "kept_again.jpg"}
+    db.close()
+    writer.close()
+
+def test_capture_service_writes_through_the_store(tmp_path):
+    store, writer, _ = make_store(tmp_path)
+    service = CaptureService({'CAPTURE_FSYNC': False}, tmp_path / "flat", store=store)
+    (tmp_path / "flat").mkdir()
+    frame = pattern(5)
+    records = [service.submit(frame, frequency=440.0) for _ in range(5)]
+    service.drain()
+
+    assert all(record['state'] == 'saved' for record in records)
+    assert {record['digest'] for record in records} == {records[0]['digest']}
+    assert not list((tmp_path / "flat").iterdir())
+    assert all(store.resolve(record['filename']).exists() for record in records)
+    logger.info(f"Store stats: {store.stats()}")
+    assert store.stats()['files'] == 1 and store.stats()['bytes_saved'] > 0
+    writer.close()
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_files_are_sharded_and_duplicates_shared,
+                 test_rows_count_references_and_unreferenced_files_are_collected,
+                 test_capture_service_writes_through_the_store):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Capture store tests passed!")
@@ -0,0 +1,116 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import os
+from datetime import datetime, timedelta
+import cv2
+import numpy as np
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import Recording
+from backend.services.collection_service import decode_cursor, encode_cursor, page_items, page_statement, static_path
+from backend.services.thumbnail_cache import ThumbnailCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'THUMBNAIL_WIDTH': 160, 'THUMBNAIL_QUALITY': 80}
+
+def write_capture(path: Path, seed: int, width: int = 640, height: int = 360) -> Path:
+    image = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return path
+
+def test_thumbnail_generated_once_and_keyed_by_content(tmp_path):
+    source = write_capture(tmp_path / "capture.jpg", seed=1)
+    cache = ThumbnailCache(CONFIG, tmp_path / "thumbs")
+
+    path, etag = cache.get(source)
+    thumbnail = cv2.imread(str(path))
+    assert thumbnail.shape[:2] == (90, 160)
+    assert cache.get(source) == (path, etag)
+    assert cache.etag(source) == etag
+    assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 1
+
+    # New content, new thumbnail and ETag
+    write_capture(source, seed=2)
+    os.utime(source, ns=(0, source.stat().st_mtime_ns + 1000))
+    new_path, new_etag = cache.get(source)
+    assert new_etag != etag and new_path != path
+
+    # A restarted cache finds thumbnails from the previous run
+    restarted = ThumbnailCache(CONFIG, tmp_path / "thumbs")
+    assert restarted.get(source) == (new_path, new_etag)
+    assert restarted.stats()['hits'] == 1
+
+def test_thumbnail_cache_evicts_least_recently_used(tmp_path):
+    sources = [write_capture(tmp_path / f"capture_{i}.jpg", seed=i) for i in range(5)]
+    probe = ThumbnailCache(CONFIG, tmp_path / "probe")
+    size = probe.get(sources[0])[0].stat().st_size
+    cache = ThumbnailCache({**CONFIG, 'THUMBNAIL_CACHE_BYTES': int(size * 3.5)}, tmp_path / "thumbs")
+
+    first, _ = cache.get(sources[0])
+    second, _ = cache.get(sources[1])
+    cache.get(sources[2])
+    cache.get(sources[0])  # most recently used again
+    cache.get(sources[3])
+    cache.get(sources[4])
+
+    stats = cache.stats()
+    logger.info(f"Thumbnail cache stats: {stats}")
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['evictions'] == 2
+    assert first.exists() and not second.exists()
+    assert len(list((tmp_path / "thumbs").glob("*.jpg"))) == stats['entries']
+
+def test_keyset_pages_cover_every_capture_once(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    start = datetime(2024, 1, 1)
+    db = session_factory()
+    # Pairs of recordings share a timestamp; every fifth has no image
+    db.add_all(Recording(timestamp=start + timedelta(seconds=i // 2), frequency=100.0 + i,
+                         image_path=None if i % 5 == 0 else f"/static/captures/{i}.jpg")
+               for i in range(103))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        recordings = db.execute(page_statement(10, cursor)).scalars().all()
+        items, cursor = page_items(recordings, 10)
+        seen.extend(item['id'] for item in items)
+        if cursor is None:
+            break
+    db.close()
+
+    expected = [i + 1 for i in reversed(range(103)) if i % 5]
+    assert seen == expected
+
+    plan = engine.execute(f"EXPLAIN QUERY PLAN {page_statement(10).compile(compile_kwargs={'literal_binds': True})}")
+    assert any("ix_recordings_timestamp" in str(row) for row in plan)
+
+def test_cursor_and_static_path_validation(tmp_path):
+    timestamp = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+    assert static_path("/static/captures/a.jpg", tmp_path) == (tmp_path / "captures" / "a.jpg").resolve()
+    assert static_path("/static/../secret.txt", tmp_path) is None
+    assert static_path("/elsewhere/a.jpg", tmp_path) is None
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_thumbnail_generated_once_and_keyed_by_content, test_thumbnail_cache_evicts_least_recently_used,
+                 test_keyset_pages_cover_every_capture_once, test_cursor_and_static_path_validation):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Collection tests passed!")
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import Experiment, Recording
+from backend.services.db_writer import DatabaseWriter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'DB_BATCH_SIZE': 50, 'DB_FLUSH_INTERVAL': 0.05}
+
+def make_writer(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine, session_factory, DatabaseWriter(CONFIG, session_factory)
+
+def test_sqlite_pragmas(tmp_path):
+    engine, _, _ = make_writer(tmp_path)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+def test_writes_are_batched(tmp_path):
+    _, session_factory, writer = make_writer(tmp_path)
+    futures = [writer.add(Recording(frequency=100.0 + i, waveform="sine")) for i in range(200)]
+    ids = [future.result(timeout=5) for future in futures]
+    writer.close()
+
+    stats = writer.stats()
+    logger.info(f"Writer stats: {stats}")
+    assert len(set(ids)) == 200
+    assert stats['jobs_written'] == 200
+    assert stats['batches'] <= 200 // CONFIG['DB_BATCH_SIZE'] + 2
+
+    db = session_factory()
+    assert db.query(Recording).count() == 200
+    db.close()
+
+def test_failed_write_only_fails_its_own_job(tmp_path):
+    _, session_factory, writer = make_writer(tmp_path)
+    first = writer.add(Experiment(session_id="a", frequency=440.0))
+    duplicate = writer.add(Experiment(session_id="a", frequency=441.0))  # unique violation
+    other = writer.add(Experiment(session_id="b", frequency=442.0))
+    update = writer.submit(
+        lambda session: session.query(Experiment).filter_by(session_id="b").update({'opt_in': True})
+    )
+
+    assert first.result(timeout=5)
+    with pytest.raises(Exception):
+        duplicate.result(timeout=5)
+    assert other.result(timeout=5)
+    assert update.result(timeout=5) == 1
+    writer.close()
+    assert writer.stats()['jobs_failed'] == 1
+
+    db = session_factory()
+    assert sorted(e.session_id for e in db.query(Experiment)) == ["a", "b"]
+    assert db.query(Experiment).filter_by(session_id="b").one().opt_in
+    db.close()
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_sqlite_pragmas, test_writes_are_batched, test_failed_write_only_fails_its_own_job):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Database writer tests passed!")
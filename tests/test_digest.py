@@ -0,0 +1,122 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import threading
+import cv2
+import numpy as np
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import OutboxMessage
+from backend.services.db_writer import DatabaseWriter
+from backend.services.digest import ContactSheets, contact_sheet
+from backend.services.notification_service import NotificationService
+from backend.services.outbox import Outbox
+from backend.services.thumbnail_cache import ThumbnailCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLORS = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255), (255, 0, 255)]
+
+def wait_until(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+def test_contact_sheet_tiles_row_by_row():
+    images = [np.full((30, 40, 3), color, dtype=np.uint8) for color in COLORS]
+    images[4] = np.full((60, 80, 3), COLORS[4], dtype=np.uint8)  # resized to the first tile's size
+    sheet = contact_sheet(images, columns=2, gap=4)
+    assert sheet.shape == (3 * 34 - 4, 2 * 44 - 4, 3)
+    for index, color in enumerate(COLORS):
+        row, column = divmod(index, 2)
+        assert tuple(sheet[row * 34 + 15, column * 44 + 20]) == color
+    assert tuple(sheet[2 * 34 + 15, 44 + 20]) == (255, 255, 255)  # the empty slot
+    assert contact_sheet(images[:1], columns=4).shape == (30, 40, 3)
+    with pytest.raises(ValueError):
+        contact_sheet([], columns=4)
+
+def test_a_recipients_rows_are_delivered_as_one_message(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    writer = DatabaseWriter({'DB_FLUSH_INTERVAL': 0.01}, session_factory)
+    delivered, lock = [], threading.Lock()
+    def deliver(message):
+        with lock:
+            delivered.append(message)
+    outbox = Outbox({'POLL_INTERVAL': 0.05}, session_factory, writer.submit,
+                    {'email': deliver, 'digest': deliver}, coalesce=['digest'])
+    outbox.start()
+    try:
+        futures = [outbox.enqueue('digest', 'a@example.com', f"- Frequency: {f}Hz", subject=f"{f}Hz",
+                                  delay=0.5) for f in (220, 330, 440)]
+        futures.append(outbox.enqueue('digest', 'b@example.com', "- Frequency: 550Hz", delay=0.5))
+        futures.append(outbox.enqueue('email', 'a@example.com', "Not part of the digest"))
+        for future in futures:
+            future.result(5)
+        wait_until(lambda: len(delivered) == 1)
+        assert delivered[0]['body'] == "Not part of the digest"  # the window is still open
+        wait_until(lambda: outbox.stats()['sent'] == 3 and not outbox.stats()['in_flight'])
+    finally:
+        outbox.close()
+        writer.close()
+
+    digest = next(message for message in delivered if message['recipient'] == 'a@example.com'
+                  and 'parts' in message)
+    assert [part['subject'] for part in digest['parts']] == ["220Hz", "330Hz", "440Hz"]
+    single = next(message for message in delivered if message['recipient'] == 'b@example.com')
+    assert 'parts' not in single
+    assert outbox.stats()['coalesced'] == 2
+    db = session_factory()
+    try:
+        assert {row.state for row in db.query(OutboxMessage)} == {'sent'}
+    finally:
+        db.close()
+
+def test_digest_email_has_a_contact_sheet(tmp_path):
+    captures = []
+    for index, color in enumerate(COLORS[:3]):
+        path = tmp_path / f"capture_{index}.jpg"
+        cv2.imwrite(str(path), np.full((720, 1280, 3), color, dtype=np.uint8))
+        captures.append(path)
+    thumbnails = ThumbnailCache({'THUMBNAIL_WIDTH': 160}, tmp_path / "thumbnails")
+    sheets = ContactSheets({'DIGEST_COLUMNS': 4}, tmp_path / "sheets", thumbnails)
+    service = NotificationService({'DIGEST_MINUTES': 5}, {'ENABLED': False}, smtp_pool=object(),
+                                  contact_sheets=sheets)
+
+    parts = [{'subject': f"{f}Hz", 'body': service.email.recording_details(f), 'attachments': [[str(path), path.name]]}
+             for f, path in zip((220, 330, 440), captures)]
+    message = {'recipient': 'a@example.com', 'subject': parts[0]['subject'], 'body': parts[0]['body'],
+               'attachments': parts[0]['attachments'], 'parts': parts}
+    digest = service.digest_message(message)
+    assert digest['subject'] == "Your 3 Cymatics Recordings"
+    assert "Recording 3:\n- Frequency: 440Hz" in digest['body']
+    sheet_path, filename = digest['attachments'][0]
+    assert filename == "contact_sheet.jpg" and len(digest['attachments']) == 4
+    sheet = cv2.imread(sheet_path)
+    assert sheet.shape[1] == 3 * 160 + 2 * 4  # three tiles in one row
+
+    # A retry reuses the sheet; a window with one recording reads like a normal email
+    assert service.digest_message(message)['attachments'][0][0] == sheet_path
+    assert sheets.stats()['built'] == 1 and sheets.stats()['reused'] == 1
+    single = service.digest_message({key: value for key, value in message.items() if key != 'parts'})
+    assert single['subject'] == "220Hz" and single['body'].startswith("Thank you")
+    assert single['attachments'] == parts[0]['attachments']
+
+if __name__ == "__main__":
+    test_contact_sheet_tiles_row_by_row()
+    for test in (test_a_recipients_rows_are_delivered_as_one_message, test_digest_email_has_a_contact_sheet):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
+    print("Digest tests passed!")
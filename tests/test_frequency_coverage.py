@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.services.frequency_coverage import FrequencyCoverage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'MIN_FREQUENCY': 20, 'MAX_FREQUENCY': 2000, 'COVERAGE_RESOLUTION': 0.1}
+
+def largest_gap_naive(used, low, high, resolution):
+    """Reference: scan every gap between sorted bins."""
+    bins = sorted({int(round((f - low) / resolution)) for f in used})
+    edges = [-1, *bins, int(round((high - low) / resolution)) + 1]
+    width, start = max((b - a, -a) for a, b in zip(edges, edges[1:]))
+    start = -start
+    return low + (start + 1) * resolution, low + (start + width - 1) * resolution
+
+def test_empty_range_suggests_centre():
+    coverage = FrequencyCoverage(CONFIG)
+    assert coverage.used() == []
+    assert coverage.largest_gap() == (20.0, 2000.0)
+    assert coverage.suggest() == 1010.0
+
+def test_incremental_updates_match_full_scan():
+    coverage = FrequencyCoverage(CONFIG)
+    coverage.load([440.0, 432.0, 440.0, None])
+    assert coverage.used() == [432.0, 440.0]
+    assert coverage.is_used(440.04) and not coverage.is_used(441.0)
+
+    rng = np.random.default_rng(1)
+    used = [432.0, 440.0]
+    for frequency in rng.uniform(20, 2000, 2000).round(1):
+        coverage.add(float(frequency))
+        used.append(float(frequency))
+        if len(used) % 250 == 0:
+            expected = largest_gap_naive(used, 20, 2000, 0.1)
+            assert np.allclose(coverage.largest_gap(), expected)
+    assert coverage.used() == sorted(set(round(f, 1) for f in used))
+    assert not coverage.add(440.0)
+    logger.info(f"Coverage stats: {coverage.stats()}")
+
+def test_suggestion_lands_in_widest_gap():
+    coverage = FrequencyCoverage(CONFIG)
+    coverage.load([20.0, 500.0, 600.0, 2000.0])
+    suggestion = coverage.suggest()
+    assert 1299.0 <= suggestion <= 1301.0
+    coverage.add(suggestion)
+    assert coverage.suggest() == 950.0  # 600-1300 (ties with 1300-2000, lower first)
+    coverage.add(950.0)
+    coverage.add(1650.0)
+    assert coverage.suggest() == 260.0  # 20-500 is now the widest gap
+
+def test_full_coverage_has_no_suggestion():
+    coverage = FrequencyCoverage({'MIN_FREQUENCY': 20, 'MAX_FREQUENCY': 30, 'COVERAGE_RESOLUTION': 1})
+    coverage.load(range(20, 31))
+    assert coverage.suggest() is None
+
+if __name__ == "__main__":
+    test_empty_range_suggests_centre()
+    test_incremental_updates_match_full_scan()
+    test_suggestion_lands_in_widest_gap()
+    test_full_coverage_has_no_suggestion()
+    print("Frequency coverage tests passed!")
@@ -0,0 +1,92 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import cv2
+import numpy as np
+from backend.services.email_service import compose_email
+from backend.services.notification_media import NotificationMedia
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'MAX_FILE_SIZE': 100 * 1024 * 1024, 'PUBLIC_URL': 'https://cymatics.example.org/',
+          'EMAIL_INLINE_BYTES': 512 * 1024, 'EMAIL_IMAGE_WIDTH': 640, 'EMAIL_CLIP_SECONDS': 1,
+          'EMAIL_CLIP_WIDTH': 320, 'VIDEO_CODEC': 'mp4v'}
+
+def write_still(path: Path, width: int, height: int) -> Path:
+    noise = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    cv2.imwrite(str(path), noise, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return path
+
+def write_video(path: Path, seconds: int = 3, fps: int = 10) -> Path:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (1280, 720))
+    for i in range(seconds * fps):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        cv2.circle(frame, (640, 360), 20 + 10 * i, (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+def test_large_still_is_resized_once_for_every_recipient(tmp_path):
+    media = NotificationMedia(CONFIG, tmp_path / "media")
+    small = write_still(tmp_path / "small.jpg", 160, 120)
+    large = write_still(tmp_path / "capture_440.jpg", 1920, 1080)
+    assert large.stat().st_size > CONFIG['EMAIL_INLINE_BYTES']
+
+    prepared = [media.prepare({'recipient': f"visitor{i}@example.com", 'subject': 'Pattern', 'body': 'Hi',
+                               'attachments': [str(small), [str(large), "capture_440.jpg"]]})
+                for i in range(3)]
+    first = prepared[0]
+    assert first['attachments'][0] == [str(small), "small.jpg"]  # small files go unchanged
+    rendition = Path(first['attachments'][1][0])
+    assert rendition != large and rendition.stat().st_size < large.stat().st_size
+    assert cv2.imread(str(rendition)).shape[1] == CONFIG['EMAIL_IMAGE_WIDTH']
+    assert "https://cymatics.example.org/static/captures/capture_440.jpg" in first['body']
+    assert all(message['attachments'] == first['attachments'] for message in prepared)
+
+    stats = media.stats()
+    logger.info(f"Notification media: {stats}")
+    assert stats['images']['misses'] == 1 and stats['images']['hits'] == 2
+    assert stats['links'] == 3
+
+def test_video_is_attached_as_a_short_clip(tmp_path):
+    media = NotificationMedia(CONFIG, tmp_path / "media")
+    video = write_video(tmp_path / "session_1.mp4")
+    message = {'recipient': "visitor@example.com", 'subject': 'Session', 'body': 'Hi',
+               'attachments': [[str(video), "session_1.mp4"]]}
+    prepared = media.prepare(message)
+    assert media.prepare(message) == prepared and media.stats()['clips_built'] == 1
+
+    clip_path, filename = prepared['attachments'][0]
+    assert filename == "session_1_clip.mp4"
+    clip = cv2.VideoCapture(clip_path)
+    assert int(clip.get(cv2.CAP_PROP_FRAME_WIDTH)) == CONFIG['EMAIL_CLIP_WIDTH']
+    assert int(clip.get(cv2.CAP_PROP_FRAME_COUNT)) == 10  # one second at 10 fps
+    clip.release()
+    assert "static/captures/session_1.mp4" in prepared['body']
+
+    email = compose_email("lab@example.com", "visitor@example.com", "Session", prepared['body'],
+                          prepared['attachments'])
+    part = next(email.iter_attachments())
+    assert part.get_content_type() == "video/mp4"
+
+def test_attachments_over_the_budget_become_links(tmp_path):
+    still = write_still(tmp_path / "capture.jpg", 400, 300)
+    media = NotificationMedia({**CONFIG, 'PUBLIC_URL': '', 'EMAIL_ATTACHMENT_BYTES': 1024}, tmp_path / "media")
+    prepared = media.prepare({'recipient': "visitor@example.com", 'subject': None, 'body': 'Hi',
+                              'attachments': [str(still)]})
+    assert prepared['attachments'] == []
+    assert "capture.jpg (too large to attach" in prepared['body']
+
+if __name__ == "__main__":
+    for test in (test_large_still_is_resized_once_for_every_recipient, test_video_is_attached_as_a_short_clip,
+                 test_attachments_over_the_budget_become_links):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
+    print("Notification media tests passed!")
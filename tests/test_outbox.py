@@ -0,0 +1,184 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import email
+import logging
+import smtplib
+import socket
+import pytest
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import OutboxMessage
+from backend.services.db_writer import DatabaseWriter
+from backend.services.email_service import SmtpPool
+from backend.services.outbox import Outbox, PermanentFailure
+
+controller = pytest.importorskip("aiosmtpd.controller")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FAST = {'WORKERS': 2, 'POLL_INTERVAL': 0.05, 'MAX_ATTEMPTS': 3, 'RETRY_BASE': 0.05, 'RETRY_MAX': 0.2}
+
+class Inbox:
+    """aiosmtpd handler keeping every message it receives"""
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(email.message_from_bytes(envelope.content))
+        return '250 OK'
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def smtp_server():
+    inbox = Inbox()
+    server = controller.Controller(inbox, hostname='127.0.0.1', port=free_port())
+    server.start()
+    config = {'SMTP_SERVER': '127.0.0.1', 'SMTP_PORT': server.port, 'FROM_EMAIL': 'lab@example.com',
+              'USE_TLS': False, 'SMTP_POOL_SIZE': 2, 'SMTP_TIMEOUT': 5}
+    return server, inbox, config
+
+def make_outbox(tmp_path, transports, config=FAST):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    writer = DatabaseWriter({'DB_FLUSH_INTERVAL': 0.01}, session_factory)
+    return Outbox(config, session_factory, writer.submit, transports), writer, session_factory
+
+def rows(session_factory) -> dict:
+    db = session_factory()
+    try:
+        return {row.recipient: (row.state, row.attempts, row.last_error) for row in db.query(OutboxMessage)}
+    finally:
+        db.close()
+
+def wait_until(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+def test_pool_reuses_one_connection(tmp_path):
+    server, inbox, config = smtp_server()
+    connects = []
+    def factory(*args, **kwargs):
+        connects.append(args)
+        return smtplib.SMTP(*args, **kwargs)
+    pool = SmtpPool(config, smtp_factory=factory)
+    video = tmp_path / "abc123.mp4"
+    video.write_bytes(b"\x00\x00\x00\x18ftypmp42")
+    try:
+        for i in range(10):
+            pool.deliver({'recipient': f'visitor{i}@example.com', 'subject': 'Your pattern',
+                          'body': 'Thanks!', 'attachments': [[str(video), 'cymatics.mp4']]})
+        assert len(connects) == 1 and pool.stats()['reused'] == 9
+
+        # A pooled connection the server dropped is replaced transparently
+        pool._idle[0].smtp.close()
+        pool.deliver({'recipient': 'late@example.com', 'subject': 'Hi', 'body': 'Again'})
+        assert len(connects) == 2
+    finally:
+        pool.close()
+        server.stop()
+
+    assert len(inbox.messages) == 11
+    attachment = next(part for part in inbox.messages[0].walk() if part.get_filename())
+    assert attachment.get_filename() == 'cymatics.mp4'
+    assert attachment.get_content_type() == 'video/mp4'
+    assert attachment.get_payload(decode=True) == video.read_bytes()
+
+def test_queued_emails_are_delivered_over_pooled_connections(tmp_path):
+    server, inbox, config = smtp_server()
+    pool = SmtpPool(config)
+    outbox, writer, session_factory = make_outbox(tmp_path, {'email': pool.deliver})
+    try:
+        # Queued before the worker runs: nothing is sent on the caller's thread
+        futures = [outbox.enqueue('email', f'visitor{i}@example.com', 'Thanks!', subject='Your pattern')
+                   for i in range(20)]
+        assert all(isinstance(f.result(5), int) for f in futures)
+        assert not inbox.messages
+        outbox.start()
+        wait_until(lambda: outbox.stats()['sent'] == 20 and not outbox.stats()['in_flight'])
+    finally:
+        outbox.close()
+        writer.close()
+        pool.close()
+        server.stop()
+
+    assert len(inbox.messages) == 20
+    assert {state for state, _, _ in rows(session_factory).values()} == {'sent'}
+    logger.info(f"Outbox: {outbox.stats()}, SMTP: {pool.stats()}")
+    assert pool.stats()['opened'] <= config['SMTP_POOL_SIZE']
+    assert outbox.stats()['sent_last_minute'] == 20
+
+def test_failures_are_retried_with_backoff_then_given_up(tmp_path):
+    calls = {}
+    def flaky(message):
+        recipient = message['recipient']
+        calls.setdefault(recipient, []).append(time.monotonic())
+        if recipient == 'refused@example.com':
+            raise PermanentFailure("550 no such user")
+        if recipient == 'down@example.com' or len(calls[recipient]) < 3:
+            raise ConnectionError("connection refused")
+
+    outbox, writer, session_factory = make_outbox(tmp_path, {'email': flaky})
+    with pytest.raises(ValueError):
+        outbox.enqueue('fax', '555-0100', 'Hello')
+    for recipient in ('flaky@example.com', 'refused@example.com', 'down@example.com'):
+        outbox.enqueue('email', recipient, 'Hello').result(5)
+    outbox.start()
+    try:
+        wait_until(lambda: outbox.stats()['sent'] + outbox.stats()['failed'] == 3
+                   and not outbox.stats()['in_flight'])
+    finally:
+        outbox.close()
+        writer.close()
+
+    states = rows(session_factory)
+    assert states['flaky@example.com'][:2] == ('sent', 3)
+    assert states['refused@example.com'][:2] == ('failed', 1)
+    assert states['down@example.com'][0] == 'failed' and states['down@example.com'][1] == FAST['MAX_ATTEMPTS']
+    assert 'connection refused' in states['down@example.com'][2]
+    # Retries waited at least half the backoff (jitter is 50-100%)
+    first, second, third = calls['flaky@example.com']
+    assert second - first >= FAST['RETRY_BASE'] * 0.5
+    assert third - second >= FAST['RETRY_BASE'] * 2 * 0.5
+    assert outbox.stats()['retried'] == 4
+
+def test_pending_messages_survive_a_restart(tmp_path):
+    sent = []
+    outbox, writer, session_factory = make_outbox(tmp_path, {'email': sent.append})
+    outbox.enqueue('email', 'visitor@example.com', 'Hello').result(5)
+    outbox.close()
+    writer.close()
+    assert not sent
+
+    restarted = Outbox(FAST, session_factory, writer.submit, {'email': sent.append})
+    restarted.start()
+    try:
+        wait_until(lambda: restarted.stats()['sent'] == 1 and not restarted.stats()['in_flight'])
+    finally:
+        restarted.close()
+        writer.close()
+    assert [message['recipient'] for message in sent] == ['visitor@example.com']
+    assert rows(session_factory)['visitor@example.com'][0] == 'sent'
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_pool_reuses_one_connection,
+                 test_queued_emails_are_delivered_over_pooled_connections,
+                 test_failures_are_retried_with_backoff_then_given_up,
+                 test_pending_messages_survive_a_restart):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Outbox tests passed!")
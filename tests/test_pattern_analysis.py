@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import cv2
+import numpy as np
+from backend.services.pattern_analysis import (
+    EMBEDDING_SIZE, PatternAnalyzer, analyze_batch, analyze_files, summarize
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SIZE = 128
+
+def rosette(order: int, size: int = SIZE) -> np.ndarray:
+    """Sand on the lines of an ``order``-fold symmetric figure"""
+    y, x = np.mgrid[0:size, 0:size] - (size - 1) / 2
+    theta, r = np.arctan2(y, x), np.hypot(x, y)
+    return np.where(np.cos(order * theta) * np.cos(r / 4) > 0.3, 220, 20).astype(np.uint8)
+
+def stripes(period: int, size: int = SIZE) -> np.ndarray:
+    x = np.arange(size)[None, :].repeat(size, axis=0)
+    return np.where(np.sin(2 * np.pi * x / period) > 0, 220, 20).astype(np.uint8)
+
+def test_metrics_match_known_figures():
+    results = analyze_batch(np.stack([rosette(3), rosette(4), rosette(6), stripes(8), stripes(4)]))
+    assert [r['symmetry_order'] for r in results[:3]] == [3, 4, 6]
+    assert all(r['symmetry_strength'] > 0.5 for r in results[:3])
+    assert results[3]['dominant_frequency'] == SIZE // 8
+    assert results[4]['dominant_frequency'] == SIZE // 4
+    # Finer stripes: more lines per scan line and more edge energy
+    assert results[4]['nodal_line_density'] > results[3]['nodal_line_density']
+    assert results[4]['edge_energy'] > results[3]['edge_energy']
+    for result in results:
+        assert len(result['embedding']) == EMBEDDING_SIZE
+        assert abs(np.linalg.norm(result['embedding']) - 1) < 1e-3
+
+def test_batching_does_not_change_results():
+    frames = np.stack([rosette(n) for n in range(2, 10)])
+    together = analyze_batch(frames)
+    alone = [analyze_batch(frame[None])[0] for frame in frames]
+    assert together == alone
+
+def test_files_are_analyzed_in_worker_processes(tmp_path):
+    paths = []
+    for i, order in enumerate((3, 4, 5, 6, 7)):
+        # 16:9 captures; the analysis uses the centre square
+        image = np.full((360, 640), 20, dtype=np.uint8)
+        image[:, 140:500] = cv2.resize(rosette(order, 360), (360, 360))
+        path = tmp_path / f"capture_{i}.jpg"
+        cv2.imwrite(str(path), cv2.cvtColor(image, cv2.COLOR_GRAY2BGR))
+        paths.append(str(path))
+
+    direct = analyze_files(paths + [str(tmp_path / "missing.jpg")], SIZE)
+    assert direct[-1] is None
+    assert [r['symmetry_order'] for r in direct[:-1]] == [3, 4, 5, 6, 7]
+
+    analyzer = PatternAnalyzer({'SIZE': SIZE, 'BATCH_SIZE': 2, 'WORKERS': 2})
+    try:
+        items = list(enumerate(paths, start=1)) + [(99, str(tmp_path / "missing.jpg"))]
+        results = analyzer.submit(items).result(timeout=60)
+    finally:
+        analyzer.close()
+    stats = analyzer.stats()
+    logger.info(f"Analyzer stats: {stats}")
+    assert [item_id for item_id, _ in results] == [1, 2, 3, 4, 5]
+    assert [metrics for _, metrics in results] == direct[:-1]
+    assert stats['analyzed'] == 5 and stats['failed'] == 1 and stats['batches'] == 3
+
+    summary = summarize([metrics for _, metrics in results])
+    assert summary['patterns'] == 5
+    assert summary['symmetry_order']['min'] == 3 and summary['symmetry_order']['max'] == 7
+
+if __name__ == "__main__":
+    import tempfile
+    test_metrics_match_known_figures()
+    test_batching_does_not_change_results()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_files_are_analyzed_in_worker_processes(Path(tmp))
+    print("Pattern analysis tests passed!")
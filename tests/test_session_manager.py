@@ -0,0 +1,118 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import threading
+import pytest
+from backend.services.session_manager import SessionManager, SessionNotFound, SessionStateError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_concurrent_starts_get_unique_ids():
+    manager = SessionManager({'MAX_SESSIONS': 10000})
+    ids, lock = [], threading.Lock()
+    def start_many():
+        started = [manager.start(440.0)['session_id'] for _ in range(200)]
+        with lock:
+            ids.extend(started)
+    threads = [threading.Thread(target=start_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(ids)) == 1600 == manager.stats()['open']
+
+def test_lifecycle_hooks_and_timings():
+    events = []
+    hooks = {f"on_{event}": (lambda event: lambda session: events.append((event, session['state'])))(event)
+             for event in ('start', 'record', 'stop', 'save', 'expire')}
+    manager = SessionManager({}, **hooks)
+    session = manager.start(432.0, waveform='sine')
+    time.sleep(0.02)
+    manager.record(session['session_id'], duration=20)
+    time.sleep(0.05)
+    manager.stop(session['session_id'], image_path="/static/captures/a.jpg")
+    saved = manager.save(session['session_id'], email="visitor@example.com")
+
+    assert events == [('start', 'started'), ('record', 'recording'), ('stop', 'stopped'), ('save', 'saved')]
+    assert saved['image_path'] == "/static/captures/a.jpg" and saved['waveform'] == 'sine'
+    timings = saved['timings']
+    assert timings['setup_s'] >= 0.02 and timings['recording_s'] >= 0.05
+    assert timings['total_s'] >= timings['setup_s'] + timings['recording_s']
+    stats = manager.stats()
+    logger.info(f"Sessions: {stats}")
+    assert stats['finished'] == 1 and stats['mean']['recording_s'] == timings['recording_s']
+    with pytest.raises(SessionNotFound):
+        manager.stop("no-such-session")
+
+def test_sessions_are_saved_once_after_stopping():
+    saved = []
+    manager = SessionManager({}, on_save=saved.append)
+    session_id = manager.start(440.0)['session_id']
+    with pytest.raises(SessionStateError):
+        manager.save(session_id, email="visitor@example.com")  # nothing recorded yet
+    manager.record(session_id)
+    manager.stop(session_id, image_path="/static/captures/a.jpg")
+    manager.save(session_id, email="visitor@example.com")
+    with pytest.raises(SessionStateError):
+        manager.save(session_id, email="someone.else@example.com")
+    assert [session['email'] for session in saved] == ["visitor@example.com"]
+    assert manager.get(session_id)['email'] == "visitor@example.com"
+
+def test_sessions_expire_after_their_last_event():
+    expired = []
+    manager = SessionManager({'SESSION_TTL': 0.2}, on_expire=expired.append)
+    manager.start_expiry()
+    try:
+        idle = manager.start(100.0)
+        busy = manager.start(200.0)
+        for _ in range(3):
+            time.sleep(0.1)
+            manager.record(busy['session_id'])  # each event pushes the deadline back
+        assert manager.get(idle['session_id']) is None  # past its deadline, even if not yet removed
+        wait_until(lambda: len(expired) == 1)
+        assert expired[0]['session_id'] == idle['session_id']
+        assert manager.get(busy['session_id']) is not None
+        wait_until(lambda: len(expired) == 2)
+        with pytest.raises(SessionNotFound):
+            manager.stop(busy['session_id'])
+        assert manager.stats()['open'] == 0 and manager.stats()['expired'] == 2
+    finally:
+        manager.close()
+
+def test_capacity_expires_the_stalest_session():
+    expired = []
+    manager = SessionManager({'MAX_SESSIONS': 3}, on_expire=expired.append)
+    first, second, third = (manager.start(f) for f in (100.0, 200.0, 300.0))
+    manager.record(first['session_id'])  # now the most recently active
+    manager.start(400.0)
+    manager.start(500.0)
+    assert [session['session_id'] for session in expired] == [second['session_id'], third['session_id']]
+    assert manager.get(first['session_id']) is not None
+    stats = manager.stats()
+    assert stats['open'] == 3 and stats['evicted'] == 2
+
+    # Repeated events keep the deadline heap proportional to the open sessions
+    for _ in range(1000):
+        manager.record(first['session_id'])
+    assert len(manager._deadlines) <= 4 * 3 + 64 + 1
+
+if __name__ == "__main__":
+    test_concurrent_starts_get_unique_ids()
+    test_lifecycle_hooks_and_timings()
+    test_sessions_are_saved_once_after_stopping()
+    test_sessions_expire_after_their_last_event()
+    test_capacity_expires_the_stalest_session()
+    print("Session manager tests passed!")
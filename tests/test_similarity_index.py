@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+from backend.database.base import Base
+from backend.database.database import create_db_engine
+from backend.database.models import Pattern
+from backend.services.pattern_analysis import ANALYSIS_VERSION
+from backend.services.similarity_index import SimilarityIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIM = 32
+
+def embeddings(count: int, seed: int = 0) -> np.ndarray:
+    """Non-negative unit vectors, like the pattern analysis produces"""
+    vectors = np.random.default_rng(seed).gamma(2.0, size=(count, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def exact_top(vectors: np.ndarray, query: np.ndarray, k: int) -> list:
+    return list(np.argsort(-(vectors @ query), kind='stable')[:k])
+
+def test_appends_persist_and_search_matches_brute_force(tmp_path):
+    vectors = embeddings(500)
+    index = SimilarityIndex({}, tmp_path / "index")
+    index.open()
+    assert index.add((i + 1, vector) for i, vector in enumerate(vectors[:300])) == 300
+    assert index.add((i + 1, vector) for i, vector in enumerate(vectors[300:], start=300)) == 200
+
+    query = vectors[42]
+    results = index.search(query, k=10)
+    assert [pattern_id - 1 for pattern_id, _ in results] == exact_top(vectors, query, 10)
+    assert results[0] == (43, 1.0)
+    similar = index.similar(43, k=5)
+    assert 43 not in [pattern_id for pattern_id, _ in similar] and len(similar) == 5
+    index.close()
+
+    # Reopened from disk; a re-analyzed pattern is overwritten in place, not appended
+    reopened = SimilarityIndex({}, tmp_path / "index")
+    reopened.open()
+    assert reopened.count == 500
+    assert reopened.search(query, k=10) == results
+    assert reopened.add([(43, vectors[7])]) == 0
+    assert reopened.count == 500 and reopened.stats()['updated'] == 1
+    assert np.allclose(reopened.vector(43), vectors[7], atol=1e-6)
+    assert reopened.similar(999) is None
+
+def test_torn_rows_are_dropped_and_layout_changes_rebuild(tmp_path):
+    index = SimilarityIndex({}, tmp_path / "index")
+    index.open()
+    index.add(enumerate(embeddings(10), start=1))
+    # A crash after writing a vector but before its id
+    with open(tmp_path / "index" / "vectors.f32", "ab") as f:
+        f.write(embeddings(1, seed=1).tobytes())
+    reopened = SimilarityIndex({}, tmp_path / "index")
+    reopened.open()
+    assert reopened.count == 10
+    assert reopened.add([(11, embeddings(1, seed=2)[0])]) == 1
+    assert reopened.search(embeddings(1, seed=2)[0], k=1)[0][0] == 11
+
+    quantized = SimilarityIndex({'QUANTIZE': 'int8'}, tmp_path / "index")
+    quantized.open()
+    assert quantized.count == 0
+    assert not (tmp_path / "index" / "vectors.f32").exists()
+
+def test_int8_quantization_keeps_rankings(tmp_path):
+    vectors = embeddings(2000, seed=3)
+    index = SimilarityIndex({'QUANTIZE': 'int8'}, tmp_path / "index")
+    index.open()
+    index.add(enumerate(vectors))
+    assert index.stats()['bytes'] == 2000 * (8 + DIM + 4)
+
+    recall = []
+    for query in embeddings(20, seed=4):
+        found = [pattern_id for pattern_id, _ in index.search(query, k=10)]
+        recall.append(len(set(found) & set(exact_top(vectors, query, 10))) / 10)
+        best_id, best_score = index.search(query, k=1)[0]
+        assert abs(best_score - float(vectors[best_id] @ query)) < 0.01
+    logger.info(f"int8 recall@10: {np.mean(recall):.3f}")
+    assert np.mean(recall) >= 0.9
+
+def test_sync_indexes_analyzed_patterns_missing_from_the_files(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    vectors = embeddings(6, seed=5)
+    db = session_factory()
+    db.add_all([
+        *(Pattern(id=i + 1, analysis_data={'version': ANALYSIS_VERSION, 'embedding': vector.tolist()})
+          for i, vector in enumerate(vectors[:4])),
+        Pattern(id=5, analysis_data={'version': ANALYSIS_VERSION - 1, 'embedding': vectors[4].tolist()}),
+        Pattern(id=6)
+    ])
+    db.commit()
+    db.close()
+
+    index = SimilarityIndex({}, tmp_path / "index")
+    index.open()
+    index.add([(1, vectors[0])])
+    assert index.sync(session_factory, batch_size=2) == 3
+    assert index.count == 4
+    assert index.sync(session_factory) == 0
+    assert index.search(vectors[3], k=1)[0][0] == 4
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_appends_persist_and_search_matches_brute_force,
+                 test_torn_rows_are_dropped_and_layout_changes_rebuild,
+                 test_int8_quantization_keeps_rankings,
+                 test_sync_indexes_analyzed_patterns_missing_from_the_files):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Similarity index tests passed!")
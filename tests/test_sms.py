@@ -0,0 +1,127 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import pytest
+from backend.services.notification_service import NotificationService
+from backend.services.outbox import PermanentFailure
+from backend.services.sms_service import (
+    FakeSmsTransport, RateLimiter, SmsDispatcher, SmsQueueFull, create_sms_dispatcher, sms_transport_factory
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {'ENABLED': True, 'TRANSPORT': 'fake', 'FAKE_LATENCY': 0.05, 'SMS_CONCURRENCY': 4,
+          'SMS_RATE': None, 'SMS_BURST': 1, 'SMS_QUEUE_SIZE': 100}
+
+def test_concurrency_is_bounded_and_rate_is_limited():
+    transport = FakeSmsTransport(CONFIG)
+    dispatcher = SmsDispatcher(CONFIG, transport)
+    start = time.perf_counter()
+    futures = [dispatcher.submit(f"+1555000{i:04d}", "Your pattern is ready") for i in range(20)]
+    assert all(f.result(10).startswith("SMfake") for f in futures)
+    elapsed = time.perf_counter() - start
+    dispatcher.close()
+    # 20 sends of 50ms, 4 at a time: about 5 rounds, not 20
+    assert transport.max_active == 4
+    assert elapsed < 20 * CONFIG['FAKE_LATENCY'] / 2
+
+    transport = FakeSmsTransport(CONFIG)
+    limited = SmsDispatcher({**CONFIG, 'SMS_RATE': 50.0, 'SMS_BURST': 5}, transport)
+    futures = [limited.submit(f"+1555000{i:04d}", "Hi") for i in range(30)]
+    for future in futures:
+        future.result(10)
+    limited.close()
+    starts = sorted(message['sent_at'] - CONFIG['FAKE_LATENCY'] for message in transport.messages)
+    # The first 5 go at once; the other 25 are spaced 20ms apart
+    assert starts[-1] - starts[0] >= 25 / 50.0 * 0.9
+    stats = limited.stats()
+    logger.info(f"Rate-limited dispatcher: {stats}")
+    assert stats['sent'] == 30 and stats['throttled_ms'] > 0
+
+def test_rate_limiter_allows_bursts_then_spaces_sends():
+    limiter = RateLimiter(rate=100.0, burst=3)
+    waits = [limiter.acquire() for _ in range(6)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(0 < wait <= 0.011 for wait in waits[3:])
+    assert RateLimiter(rate=None).acquire() == 0.0
+
+def test_queue_is_bounded_and_failures_reach_the_caller():
+    class Failing(FakeSmsTransport):
+        def send(self, to_number, body):
+            if to_number == "+15550000000":
+                raise PermanentFailure("invalid number")
+            return super().send(to_number, body)
+
+    dispatcher = SmsDispatcher({**CONFIG, 'SMS_CONCURRENCY': 1, 'SMS_QUEUE_SIZE': 3}, Failing(CONFIG))
+    futures = [dispatcher.submit("+15550000001", "Hi"), dispatcher.submit("+15550000002", "Hi"),
+               dispatcher.submit("+15550000000", "Hi")]
+    with pytest.raises(SmsQueueFull):
+        dispatcher.submit("+15550000003", "Hi")
+    assert futures[1].result(5)
+    with pytest.raises(PermanentFailure):
+        futures[2].result(5)
+    dispatcher.close()
+    stats = dispatcher.stats()
+    assert stats['failed'] == 1 and stats['sent'] == 2 and stats['rejected'] == 1
+
+def test_transport_selection():
+    assert sms_transport_factory({'TRANSPORT': 'fake'}) is FakeSmsTransport
+    with pytest.raises(ValueError):
+        sms_transport_factory({'TRANSPORT': 'pigeon'})
+    assert create_sms_dispatcher({**CONFIG, 'ENABLED': False}) is None
+    # Twilio without credentials disables SMS instead of failing startup
+    assert create_sms_dispatcher({**CONFIG, 'TRANSPORT': 'twilio', 'ACCOUNT_SID': '', 'AUTH_TOKEN': ''}) is None
+
+def test_email_and_sms_for_a_recording_are_sent_concurrently():
+    class SlowSmtp:
+        """Stands in for an SMTP pool whose server takes 0.3s per message"""
+        def __init__(self):
+            self.sent = []
+        def send(self, message):
+            time.sleep(0.3)
+            self.sent.append(message)
+        def close(self):
+            pass
+
+    smtp = SlowSmtp()
+    transport = FakeSmsTransport({'FAKE_LATENCY': 0.3})
+    service = NotificationService({'FROM_EMAIL': 'lab@example.com'}, CONFIG, smtp_pool=smtp,
+                                  sms=SmsDispatcher(CONFIG, transport))
+
+    async def send():
+        start = time.perf_counter()
+        ok = await service.send_cymatics_recording("visitor@example.com", 440.0, phone_number="+15550001111")
+        return ok, time.perf_counter() - start
+
+    ok, elapsed = asyncio.run(send())
+    service.close()
+    assert ok
+    assert len(smtp.sent) == 1 and smtp.sent[0]['To'] == "visitor@example.com"
+    assert transport.messages[0]['to'] == "+15550001111"
+    assert "visitor@example.com" in transport.messages[0]['body']
+    assert elapsed < 0.5  # one round trip, not two
+
+def test_queueing_without_an_outbox_fails_clearly():
+    service = NotificationService({'FROM_EMAIL': 'lab@example.com'}, CONFIG, smtp_pool=object(), sms=None)
+    with pytest.raises(RuntimeError, match="outbox"):
+        service.queue_recording("visitor@example.com", 440.0)
+    with pytest.raises(RuntimeError, match="outbox"):
+        service.email.queue_recording("visitor@example.com", 440.0)
+    service.sms.close()
+
+if __name__ == "__main__":
+    test_concurrency_is_bounded_and_rate_is_limited()
+    test_rate_limiter_allows_bursts_then_spaces_sends()
+    test_queue_is_bounded_and_failures_reach_the_caller()
+    test_transport_selection()
+    test_email_and_sms_for_a_recording_are_sent_concurrently()
+    test_queueing_without_an_outbox_fails_clearly()
+    print("SMS tests passed!")
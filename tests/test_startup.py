@@ -0,0 +1,69 @@
+import sys
+import json
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Runs in a fresh interpreter so settings pick up the headless environment;
+# argv[1] is the first request sent before the app has started up
+SCRIPT = """
+import json, sys, tempfile, time
+start = time.perf_counter()
+import backend.main as main
+import_ms = (time.perf_counter() - start) * 1000
+opened_on_import = main.camera_reader.available or 'pygame' in sys.modules
+main.capture_service.captures_dir = main.Path(tempfile.mkdtemp())
+main.capture_store.root_dir = main.capture_service.captures_dir
+
+from fastapi.testclient import TestClient
+method, path = sys.argv[1].split()
+first = TestClient(main.app).request(method, path).json()
+with TestClient(main.app) as client:
+    deadline = time.perf_counter() + 5
+    while main.STARTUP_CONFIG['EAGER_DEVICES'] and not client.get("/").json()["ready"] \\
+            and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    after = client.get("/").json()
+print(json.dumps({"import_ms": import_ms, "opened_on_import": opened_on_import,
+                  "first": first, "after": after}))
+"""
+
+def run_headless(first_request: str, **env) -> dict:
+    # The app's lifespan creates tables and caches, so keep it off the repo's data directory
+    with tempfile.TemporaryDirectory() as data_dir:
+        environment = {**os.environ, "CAMERA_SOURCE": "synthetic", "AUDIO_SINK": "null",
+                       "DATA_DIR": data_dir, "DATABASE_URL": f"sqlite:///{data_dir}/cymatics.db", **env}
+        output = subprocess.run([sys.executable, "-c", SCRIPT, first_request], cwd=project_root,
+                                env=environment, capture_output=True, text=True, timeout=60,
+                                check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_import_opens_no_devices():
+    result = run_headless("GET /")
+    logger.info(f"Import took {result['import_ms']:.0f}ms, devices after startup: "
+                f"{result['after']['devices']}")
+    assert not result['opened_on_import']
+    assert result['first']['ready'] is False
+    assert result['first']['devices']['camera']['status'] == 'pending'
+    assert result['after']['ready'] is True
+    assert result['after']['camera_available'] is True
+
+def test_devices_open_on_first_use():
+    result = run_headless("POST /api/capture", EAGER_DEVICES="false")
+    assert result['first']['status'] == 'success'  # the capture opened the camera itself
+    assert result['after']['devices']['camera']['status'] == 'ready'
+
+if __name__ == "__main__":
+    test_import_opens_no_devices()
+    test_devices_open_on_first_use()
+    print("Startup tests passed!")
@@ -0,0 +1,130 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import cv2
+import numpy as np
+from backend.services.streaming_service import StreamingService, FRAME_HEADER, MESSAGE_FRAME
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'QUALITY_LEVELS': [70, 50, 35],
+    'CLIENT_QUEUE_SIZE': 2,
+    'MIN_FPS': 2,
+    'MAX_FPS': 1000,
+    'SLOW_SEND_MS': 20,
+    'FAST_SEND_MS': 5,
+    'ADAPT_INTERVAL': 0.05
+}
+
+class FakeMediaService:
+    frames = None
+    current_session = None
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.json = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.json.append(data)
+
+    async def send_bytes(self, data):
+        if self.fail:
+            raise ConnectionError("client went away")
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+def _frame():
+    return np.full((48, 64, 3), 128, dtype=np.uint8)
+
+def test_frame_encoded_once_for_all_clients():
+    service = StreamingService(FakeMediaService(), CONFIG, frequency_source=lambda: 432.0)
+    encodes = []
+    encode = service._encode
+    service._encode = lambda frame, quality: encodes.append(quality) or encode(frame, quality)
+
+    clients = [FakeWebSocket() for _ in range(20)]
+    broken = FakeWebSocket(fail=True)
+
+    async def run():
+        for ws in clients + [broken]:
+            await service.connect(ws)
+        await service.broadcast_frame(_frame(), sequence=7, timestamp=1700000000.5)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert encodes == [70]
+    assert broken not in service.active_connections
+    assert len(service.active_connections) == 20
+
+    payload = clients[0].sent[0]
+    assert all(ws.sent[0] is payload for ws in clients)
+    kind, sequence, timestamp, frequency = FRAME_HEADER.unpack_from(payload)
+    assert (kind, sequence, timestamp, frequency) == (MESSAGE_FRAME, 7, 1700000000.5, 432.0)
+
+    image = cv2.imdecode(np.frombuffer(payload[FRAME_HEADER.size:], np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (48, 64, 3)
+
+def test_slow_client_does_not_hold_back_fast_client():
+    service = StreamingService(FakeMediaService(), CONFIG)
+    fast = FakeWebSocket()
+    slow = FakeWebSocket(delay=0.05)
+
+    async def run():
+        await service.connect(fast)
+        await service.connect(slow)
+        for sequence in range(1, 61):
+            await service.broadcast_frame(_frame(), sequence=sequence)
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    stats = {c['client_id']: c for c in service.stats()['clients']}
+    logger.info(f"Client stats: {stats}")
+    fast_stats, slow_stats = stats[1], stats[2]
+    assert fast_stats['frames_sent'] == 60
+    assert fast_stats['frames_dropped'] == 0
+    assert slow_stats['frames_sent'] < 20
+    assert slow_stats['quality'] < fast_stats['quality'] or slow_stats['fps'] < fast_stats['fps']
+
+def test_tiers_encoded_only_when_subscribed():
+    config = dict(CONFIG, TIERS={'thumb': 12, '480p': 24, 'full': None}, DEFAULT_TIER='full')
+    service = StreamingService(FakeMediaService(), config)
+    heights = []
+    encode = service._encode
+    service._encode = lambda frame, quality: heights.append(frame.shape[0]) or encode(frame, quality)
+
+    thumb, full = FakeWebSocket(), FakeWebSocket()
+
+    async def run():
+        await service.connect(thumb)
+        await service.connect(full)
+        await service.handle_client_message(thumb, {'type': 'subscribe', 'tier': 'thumb'})
+        await service.broadcast_frame(_frame(), sequence=1)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert thumb.json[0]['tier'] == 'thumb'
+    assert sorted(heights) == [12, 48]  # the 480p tier had no subscriber
+
+    decoded = cv2.imdecode(np.frombuffer(thumb.sent[0][FRAME_HEADER.size:], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (12, 16, 3)
+
+if __name__ == "__main__":
+    test_frame_encoded_once_for_all_clients()
+    test_slow_client_does_not_hold_back_fast_client()
+    test_tiers_encoded_only_when_subscribed()
+    print("Streaming tests passed!")
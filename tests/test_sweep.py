@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import asyncio
+import logging
+import threading
+import numpy as np
+import pytest
+from backend.services.sweep_service import SweepPlan, SweepService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'MAX_DURATION': 60,
+    'SWEEP_CAPTURE_INTERVAL': 0.1,
+    'SWEEP_RETUNE_INTERVAL': 0.05,
+    'SWEEP_SETTLE_FRACTION': 0.8
+}
+
+def test_plan_frequencies():
+    linear = SweepPlan("linear", 100, 200, duration=10)
+    assert np.allclose(linear.frequency_at([0, 5, 10, 20]), [100, 150, 200, 200])
+
+    log = SweepPlan("log", 100, 400, duration=10)
+    assert np.isclose(log.frequency_at(5), 200)
+
+    stepped = SweepPlan("stepped", frequencies=[100, 200, 300], dwell=[1, 2, 1])
+    assert stepped.duration == 4
+    assert np.allclose(stepped.frequency_at([0.5, 1.5, 2.9, 3.5]), [100, 200, 200, 300])
+    assert np.allclose(stepped.capture_times(0.5, 0.8), [0.8, 2.6, 3.8])
+
+def test_plan_validation():
+    service = SweepService(CONFIG, play_tone=None, capture_frame=None, frequency_range=(20, 2000))
+    with pytest.raises(ValueError):
+        service.validate(SweepPlan("linear", 20, 2000, duration=120))
+    with pytest.raises(ValueError):
+        service.validate(SweepPlan("stepped", frequencies=[10, 100], dwell=1))
+    with pytest.raises(ValueError):
+        SweepPlan("stepped", frequencies=[100])
+
+def test_sweep_schedules_tones_and_tagged_captures():
+    tones = []
+    captures = []
+
+    def play_tone(frequency, waveform, volume):
+        tones.append(frequency)
+
+    async def capture_frame(frequency, sweep_id, index):
+        captures.append(frequency)
+        return {"filename": f"{sweep_id}_{index}.jpg"}
+
+    async def run():
+        service = SweepService(CONFIG, play_tone=play_tone, capture_frame=capture_frame)
+        sweep = await service.start(SweepPlan("stepped", frequencies=[100, 200, 300], dwell=0.1))
+        await asyncio.sleep(0.5)
+        return sweep
+
+    sweep = asyncio.run(run())
+    logger.info(f"Sweep finished: {sweep['status']}, captures at {captures}")
+    assert sweep['status'] == 'completed'
+    assert tones == [100, 200, 300]
+    assert captures == [100, 200, 300]
+    assert [c['frequency'] for c in sweep['captures']] == [100, 200, 300]
+
+def test_looped_chirp_retunes_in_steps_off_the_event_loop():
+    tones = []
+    captures = []
+
+    def play_tone(frequency, waveform, volume):
+        tones.append((frequency, threading.current_thread() is threading.main_thread()))
+
+    async def capture_frame(frequency, sweep_id, index):
+        captures.append(frequency)
+        return {}
+
+    async def run():
+        config = {**CONFIG, 'SWEEP_RETUNE_INTERVAL': 0.1, 'SWEEP_CAPTURE_INTERVAL': 0.05}
+        service = SweepService(config, play_tone=play_tone, capture_frame=capture_frame)
+        sweep = await service.start(SweepPlan("linear", 100, 200, duration=0.4))
+        await asyncio.sleep(0.7)
+        return sweep
+
+    sweep = asyncio.run(run())
+    assert sweep['status'] == 'completed'
+    # One held tone per step, none of them synthesized on the event loop's thread
+    assert [frequency for frequency, _ in tones] == pytest.approx([100, 125, 150, 175])
+    assert not any(on_loop for _, on_loop in tones)
+    # Captures carry the tone actually playing, two per step
+    assert captures[:8] == pytest.approx([100, 100, 125, 125, 150, 150, 175, 175])
+
+def test_sweep_history_is_bounded():
+    async def capture_frame(frequency, sweep_id, index):
+        return {}
+
+    async def run():
+        service = SweepService({**CONFIG, 'SWEEP_HISTORY': 2}, play_tone=lambda *args: None,
+                               capture_frame=capture_frame)
+        sweeps = [await service.start(SweepPlan("stepped", frequencies=[100], dwell=0.01)) for _ in range(3)]
+        await service.stop_all()
+        return service, sweeps
+
+    service, sweeps = asyncio.run(run())
+    assert service.get(sweeps[0]['sweep_id']) is None
+    assert [service.get(sweep['sweep_id']) for sweep in sweeps[1:]] == sweeps[1:]
+
+if __name__ == "__main__":
+    test_plan_frequencies()
+    test_plan_validation()
+    test_sweep_schedules_tones_and_tagged_captures()
+    test_looped_chirp_retunes_in_steps_off_the_event_loop()
+    test_sweep_history_is_bounded()
+    print("Sweep tests passed!")
@@ -0,0 +1,84 @@
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import cv2
+import pytest
+from backend.services.camera_service import CameraReader
+from backend.services.video_recorder import RecorderBusy, VideoRecorder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAMERA = {'FRAME_WIDTH': 64, 'FRAME_HEIGHT': 48, 'FPS': 60, 'FRAME_BUFFERS': 3}
+CONFIG = {'VIDEO_CODEC': 'mp4v', 'VIDEO_FPS': 20, 'RECORD_QUEUE_SIZE': 4}
+
+class CountingCapture:
+    """Fills each frame with its frame number, like a camera at a fixed rate."""
+    def __init__(self, config):
+        self.count = 0
+        self.interval = 1.0 / config['FPS']
+
+    def read(self, image=None):
+        time.sleep(self.interval)
+        self.count += 1
+        image[:] = (self.count * 4) % 256
+        return True, image
+
+    def release(self):
+        pass
+
+def frame_count(path: Path) -> int:
+    video = cv2.VideoCapture(str(path))
+    count = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    video.release()
+    return count
+
+def test_session_stops_after_duration(tmp_path):
+    reader = CameraReader(CAMERA, capture_factory=CountingCapture)
+    reader.start()
+    try:
+        reader.wait_for_frame(0, timeout=1.0)
+        recorder = VideoRecorder(CONFIG, reader, tmp_path)
+        record = recorder.start(session_id="s1", duration=0.5)
+        with pytest.raises(RecorderBusy):
+            recorder.start(session_id="s2")
+        time.sleep(0.8)
+        assert not recorder.recording
+    finally:
+        reader.stop()
+
+    logger.info(f"Recording: {record}")
+    assert record['state'] == 'saved'
+    assert 8 <= record['frames_written'] <= 12  # 0.5s at 20fps
+    assert frame_count(tmp_path / record['filename']) == record['frames_written']
+    assert not list(tmp_path.glob(".*"))
+
+def test_stop_finalizes_quickly(tmp_path):
+    reader = CameraReader(CAMERA, capture_factory=CountingCapture)
+    reader.start()
+    try:
+        reader.wait_for_frame(0, timeout=1.0)
+        recorder = VideoRecorder(CONFIG, reader, tmp_path)
+        record = recorder.start(session_id="s1", duration=20)
+        time.sleep(0.3)
+        recorder.stop()
+    finally:
+        reader.stop()
+
+    assert record['state'] == 'saved'
+    assert record['finalize_ms'] < 1000
+    assert record['frames_dropped'] == 0
+    assert (tmp_path / record['filename']).exists()
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_session_stops_after_duration, test_stop_finalizes_quickly):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Video recorder tests passed!")
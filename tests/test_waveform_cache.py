@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent)
+sys.path.insert(0, project_root)
+
+import logging
+import numpy as np
+from backend.services.waveform_cache import WaveformCache, loop_length
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONFIG = {
+    'SAMPLE_RATE': 44100,
+    'CHANNELS': 2,
+    'BUFFER': 512,
+    'LOOP_MAX_SECONDS': 2.0,
+    'LOOP_TOLERANCE_HZ': 0.01,
+    'CACHE_MAX_BYTES': 1024 * 1024
+}
+
+def test_loop_length_whole_cycles():
+    # 440Hz fits exactly 22 cycles into 2205 samples
+    assert loop_length(440.0, 44100, min_samples=512) == (2205, 22)
+
+    n_samples, n_cycles = loop_length(432.5, 44100, min_samples=512, max_samples=88200)
+    assert abs(n_cycles * 44100 / n_samples - 432.5) <= 0.01
+    logger.info("Loop length valid")
+
+def test_loop_is_seamless():
+    cache = WaveformCache(CONFIG)
+    samples = cache.get(440.0, "sine", 1.0)
+    assert samples.dtype == np.int16
+    assert samples.shape[1] == 2
+
+    # Wrapping from the last sample to the first is a normal single-sample step
+    left = samples[:, 0].astype(np.int32)
+    max_step = np.abs(np.diff(left)).max()
+    assert abs(left[0] - left[-1]) <= max_step
+
+def test_hits_misses_and_eviction():
+    cache = WaveformCache(dict(CONFIG, CACHE_MAX_BYTES=64 * 1024))
+    cache.get(440.0, "sine", 0.9)
+    cache.get(440.0, "sine", 0.9)
+    cache.get(440.0, "square", 0.9)
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+
+    # Fill well past the memory cap
+    for freq in range(100, 400, 7):
+        cache.get(float(freq), "triangle", 0.5)
+    stats = cache.stats()
+    assert stats['bytes'] <= 64 * 1024
+    assert stats['evictions'] > 0
+    logger.info(f"Cache stats: {stats}")
+
+if __name__ == "__main__":
+    test_loop_length_whole_cycles()
+    test_loop_is_seamless()
+    test_hits_misses_and_eviction()
+    print("Waveform cache tests passed!")